@@ -1,10 +1,42 @@
-from flask import Flask, render_template, request, redirect, flash, url_for
-import mysql.connector
-from mysql.connector import Error
-import json
+from flask import Flask, render_template, request, redirect, flash, url_for, jsonify, Response, g, has_request_context
+from markupsafe import Markup
+from flask import before_render_template, template_rendered
+from mysql.connector import Error, errorcode
+from db_pool import ConnectionPool, PoolTimeoutError
+import sqlite_backend
+from reference_cache import ReferenceCache
+from data_versions import read_versions
+from fragment_cache import FragmentCache
+from events import EventBroker
+from order_items import insert_order_items, fetch_order_items
+from reports import REPORTS, PERIOD_FORMATS, SETTLE_SECONDS, RollupRefresher, retract_order
+from exports import export_chunks, FORMATS as EXPORT_FORMATS
+from profiling import profiler, ProfiledCursor, server_timing
+from dashboard_loader import DashboardLoader
+from kitchen import (create_tickets, record_order_status, void_open_tickets, fetch_queue, ticket_to_dict,
+                     advance_ticket, prep_latency_report, all_stations, TICKET_STATUSES)
+from reservations import (AvailabilityIndex, book_table, change_reservation_status, fetch_reservation,
+                          fetch_reservations, reservation_to_dict, seated_reservation, upcoming_booking,
+                          seat_order, release_table, DEFAULT_DURATION_MINUTES, RESERVATION_STATUSES)
+from archive import fetch_archived_order_items
+from repository import (load_menu, load_menu_prices, load_tables, lock_table, decode_order_cursor, fetch_orders,
+                        fetch_order, fetch_order_state, insert_order, set_order_status, remove_order,
+                        fetch_customers, search_customers, find_customer_id, insert_customer,
+                        customer_has_orders, remove_customer)
+from idempotency import (IdempotencyStore, IdempotencyConflict, IdempotencyInProgress, KeyAlreadyClaimed,
+                         request_fingerprint, valid_key, MAX_KEY_LENGTH)
+from menu_import import import_sheet, read_rows, format_for as import_format_for, KINDS as IMPORT_KINDS
+from dashboard_stats import (read_dashboard_counters, record_order_created,
+                             record_status_change, record_order_deleted)
+import csv
+import io
 import os
+import uuid
 from dotenv import load_dotenv
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from migrations import SchemaInitializer, applied_version, LATEST_VERSION
 
 try:
     from db_initializer import initialize_database
@@ -36,10 +68,90 @@ DB_CONFIG = {
 
 DB_NAME = os.getenv('DB_NAME', 'restaurant_db')
 
+# Storage backend: 'mysql', or 'sqlite' for an embedded database file (local runs, tests, benchmarks)
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'restaurant.db')
+SQLITE_STATEMENT_CACHE = int(os.getenv('SQLITE_STATEMENT_CACHE', sqlite_backend.STATEMENT_CACHE_SIZE))
+
+# Connection pool configuration
+POOL_CONFIG = {
+    'size': int(os.getenv('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.getenv('DB_POOL_MAX_OVERFLOW', 10)),
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 30)),
+    'pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+    'recycle': int(os.getenv('DB_POOL_RECYCLE', 3600)),
+}
+
+# Reference data (menu, tables) cache
+REFERENCE_CACHE_TTL = int(os.getenv('REFERENCE_CACHE_TTL', 300))
+MENU_CACHE_KEYS = ('menu', 'menu_prices')
+TABLES_CACHE_KEY = 'tables'
+# DataVersions counter -> cache keys holding that data
+DATA_VERSION_KEYS = {'menu': MENU_CACHE_KEYS, 'tables': (TABLES_CACHE_KEY,)}
+
+# Rendered index.html fragments (menu grid, table options, customer rows)
+FRAGMENT_CACHE_ENABLED = os.getenv('FRAGMENT_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+FRAGMENT_CACHE_SIZE = int(os.getenv('FRAGMENT_CACHE_SIZE', 64))
+
+# Report routes refresh the rollups at most this often per process (cron covers the rest)
+ROLLUP_REFRESH_SECONDS = int(os.getenv('ROLLUP_REFRESH_SECONDS', SETTLE_SECONDS))
+
+# Query profiling
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+PROFILER_TOOLBAR = os.getenv('PROFILER_TOOLBAR', 'false').lower() in ('1', 'true', 'yes')
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 5))
+
+# Largest quantity of a single item accepted on one order
+MAX_ITEM_QUANTITY = 99
+
+# Dashboard order list pagination
+ORDERS_PAGE_SIZE = int(os.getenv('ORDERS_PAGE_SIZE', 50))
+ORDERS_MAX_PAGE_SIZE = 200
+CUSTOMERS_PAGE_SIZE = int(os.getenv('CUSTOMERS_PAGE_SIZE', 50))
+CUSTOMER_SEARCH_LIMIT = 10
+
+# Upcoming reservations kept in memory; reloaded after this many seconds
+RESERVATION_INDEX_TTL = int(os.getenv('RESERVATION_INDEX_TTL', 60))
+MAX_PARTY_SIZE = 20
+
+# Idempotency keys for order creation: results kept this many seconds, the most recent
+# IDEMPOTENCY_CACHE_SIZE in memory and (with IDEMPOTENCY_DB) all of them in the database
+IDEMPOTENCY_TTL = int(os.getenv('IDEMPOTENCY_TTL', 24 * 3600))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv('IDEMPOTENCY_CACHE_SIZE', 1000))
+IDEMPOTENCY_DB = os.getenv('IDEMPOTENCY_DB', 'true').lower() in ('1', 'true', 'yes')
+
+# Schema check on startup: 'background' serves requests while it runs, 'blocking' makes the
+# first requests wait for it, 'off' skips it (run `python migrations.py` on deploy instead)
+SCHEMA_CHECK = os.getenv('SCHEMA_CHECK', 'background').lower()
+SCHEMA_CHECK_TIMEOUT = float(os.getenv('SCHEMA_CHECK_TIMEOUT', 30))
+
+# Dashboard reads run concurrently on up to this many pooled connections (1 = serial).
+# Size the pool for it: DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW >= request threads * (1 + this)
+DASHBOARD_CONCURRENCY = int(os.getenv('DASHBOARD_CONCURRENCY', 3))
+DASHBOARD_QUERY_TIMEOUT = float(os.getenv('DASHBOARD_QUERY_TIMEOUT', 5))
+
 if not ENV_MISSING and os.getenv('SECRET_KEY'):
     app.secret_key = os.getenv('SECRET_KEY')
 
 DB_CONNECTION_ERROR = None
+db_pool = None
+reference_cache = ReferenceCache(ttl=REFERENCE_CACHE_TTL)
+fragment_cache = FragmentCache(max_entries=FRAGMENT_CACHE_SIZE, ttl=REFERENCE_CACHE_TTL,
+                               enabled=FRAGMENT_CACHE_ENABLED)
+event_broker = EventBroker()
+availability_index = AvailabilityIndex(ttl=RESERVATION_INDEX_TTL)
+dashboard_loader = DashboardLoader(lambda timeout: get_pool().get_connection(timeout),
+                                   max_workers=DASHBOARD_CONCURRENCY, timeout=DASHBOARD_QUERY_TIMEOUT,
+                                   available=lambda: get_pool().available())
+idempotency_store = IdempotencyStore(max_entries=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_TTL,
+                                     use_db=IDEMPOTENCY_DB)
+rollup_refresher = RollupRefresher(interval=ROLLUP_REFRESH_SECONDS)
+schema_initializer = SchemaInitializer(lambda initializer: check_schema(initializer))
+
+profiler.slow_query_seconds = SLOW_QUERY_MS / 1000
+profiler.n_plus_one_threshold = N_PLUS_ONE_THRESHOLD
+profiler.logger = app.logger
 
 
 def render_error(error_msg):
@@ -52,51 +164,71 @@ def render_error(error_msg):
                          db_name=DB_NAME)
 
 
-def check_and_initialize_database():
-    """Check if database exists, initialize if needed"""
-    if ENV_MISSING or not DB_INITIALIZER_AVAILABLE:
-        return False
-    
+def check_schema(initializer):
+    """Bring the database up to the latest schema version; returns the version.
+
+    Runs once per process on a background thread (see SchemaInitializer). When
+    the schema is current this costs one query on a pooled connection, which
+    the first request then reuses.
+    """
     try:
-        config = DB_CONFIG.copy()
-        config['database'] = DB_NAME
-        connection = mysql.connector.connect(**config)
-        
-        cursor = connection.cursor()
-        required_tables = ['Customers', 'Menu', 'Tables', 'Orders']
-        cursor.execute("SHOW TABLES")
-        existing_tables = [table[0] for table in cursor.fetchall()]
-        cursor.close()
-        connection.close()
-        
-        if all(table in existing_tables for table in required_tables):
-            print("✓ Database ready")
-            return True
-        else:
-            return initialize_database()
-            
+        connection = get_pool().get_connection()
     except Error as e:
-        if "Unknown database" in str(e):
-            return initialize_database()
+        if e.errno != errorcode.ER_BAD_DB_ERROR or not DB_INITIALIZER_AVAILABLE:
+            raise
+        version = 0
+    else:
+        cursor = connection.cursor()
+        try:
+            version = applied_version(cursor)
+        finally:
+            cursor.close()
+            connection.close()
+
+    if version >= LATEST_VERSION:
+        return version
+    if not DB_INITIALIZER_AVAILABLE:
+        raise Error(msg=f"Database schema is at version {version}, expected {LATEST_VERSION}. "
+                        "Run 'python migrations.py'.")
+
+    initializer.mark_migrating()
+    if not initialize_database():
+        raise Error(msg="Database initialization failed. Run 'python db_initializer.py' for details.")
+    return LATEST_VERSION
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global db_pool
+    if db_pool is None:
+        if DB_BACKEND == 'sqlite':
+            config = {'path': SQLITE_PATH, 'statement_cache': SQLITE_STATEMENT_CACHE}
+            connect = sqlite_backend.connect
         else:
-            print(f"Database error: {e}")
-            return False
+            config = DB_CONFIG.copy()
+            config['database'] = DB_NAME
+            connect = None
+        db_pool = ConnectionPool(config, cursor_wrapper=ProfiledCursor if PROFILING_ENABLED else None,
+                                 connect=connect, **POOL_CONFIG)
+    return db_pool
 
 
 def get_db_connection():
-    """Create and return a database connection"""
+    """Borrow a database connection from the pool (close() returns it)"""
     global DB_CONNECTION_ERROR
     
     try:
-        config = DB_CONFIG.copy()
-        config['database'] = DB_NAME
-        connection = mysql.connector.connect(**config)
+        connection = get_pool().get_connection()
         DB_CONNECTION_ERROR = None
         return connection
     except Error as e:
         error_msg = str(e)
         
-        if "Unknown database" in error_msg:
+        if isinstance(e, PoolTimeoutError):
+            DB_CONNECTION_ERROR = f"{error_msg}. Increase DB_POOL_SIZE or DB_POOL_MAX_OVERFLOW in .env file."
+        elif "unable to open database file" in error_msg:
+            DB_CONNECTION_ERROR = f"Can't open the SQLite database at {SQLITE_PATH}. Check SQLITE_PATH in .env file."
+        elif "Unknown database" in error_msg:
             DB_CONNECTION_ERROR = f"Database '{DB_NAME}' does not exist. Run 'python db_initializer.py' to create it."
         elif "Access denied" in error_msg:
             DB_CONNECTION_ERROR = f"Access denied for user '{DB_CONFIG['user']}'@'{DB_CONFIG['host']}'. Check your DB_USER and DB_PASSWORD in .env file."
@@ -110,6 +242,75 @@ def get_db_connection():
         return None
 
 
+def sync_data_versions(cursor):
+    """Read the stored data versions (once per request) and drop cached data any process has changed"""
+    if has_request_context() and 'data_versions' in g:
+        return g.data_versions
+    versions = read_versions(cursor)
+    for source, keys in DATA_VERSION_KEYS.items():
+        reference_cache.sync(source, versions.get(source, 0), *keys)
+    if has_request_context():
+        g.data_versions = versions
+    return versions
+
+
+def get_menu(cursor):
+    """Available menu items for the order form (cached)"""
+    sync_data_versions(cursor)
+    return reference_cache.get('menu', lambda: load_menu(cursor))
+
+
+def get_menu_prices(cursor):
+    """Map of item_id -> (item_name, price) for pricing orders (cached)"""
+    sync_data_versions(cursor)
+    return reference_cache.get('menu_prices', lambda: load_menu_prices(cursor))
+
+
+def get_tables(cursor):
+    """All restaurant tables with their current status (cached)"""
+    sync_data_versions(cursor)
+    return reference_cache.get(TABLES_CACHE_KEY, lambda: load_tables(cursor))
+
+
+def read_quantities(form):
+    """Selected item ids from the order form mapped to their quantities"""
+    quantities = {}
+    for item_id in form.getlist('items'):
+        if not item_id.isdigit():
+            continue
+        try:
+            quantity = int(form.get(f'qty_{item_id}', 1))
+        except ValueError:
+            quantity = 1
+        quantity = max(1, min(quantity, MAX_ITEM_QUANTITY))
+        quantities[int(item_id)] = min(quantities.get(int(item_id), 0) + quantity, MAX_ITEM_QUANTITY)
+    return quantities
+
+
+def price_items(cursor, quantities):
+    """Price the selected items; returns (lines, total) with lines as (item_id, item_name, unit_price, quantity).
+
+    Prices come from the cached menu; ids missing from the cache (e.g. items
+    added since it was loaded) are fetched with a single IN (...) query.
+    """
+    menu_prices = get_menu_prices(cursor)
+
+    missing = [item_id for item_id in quantities if item_id not in menu_prices]
+    if missing:
+        menu_prices = dict(menu_prices)
+        menu_prices.update(load_menu_prices(cursor, missing))
+
+    lines = []
+    total = 0.0
+    for item_id, quantity in quantities.items():
+        item = menu_prices.get(item_id)
+        if item:
+            price = float(item[1])
+            lines.append((item_id, item[0], price, quantity))
+            total += price * quantity
+    return lines, total
+
+
 def format_datetime(dt):
     """Convert datetime to '31 Oct 8:27 pm' format"""
     if not dt:
@@ -117,6 +318,165 @@ def format_datetime(dt):
     return dt.strftime("%d %b %I:%M %p").lstrip("0").replace(" 0", " ").lower()
 
 
+def get_page_size():
+    """Read the page_size query parameter, clamped to a sane range"""
+    try:
+        page_size = int(request.args.get('page_size', ORDERS_PAGE_SIZE))
+    except ValueError:
+        page_size = ORDERS_PAGE_SIZE
+    return max(1, min(page_size, ORDERS_MAX_PAGE_SIZE))
+
+
+def include_archive_arg():
+    return request.args.get('include_archive', '').lower() in ('1', 'true', 'yes')
+
+
+def order_row(o):
+    """Order row as the tuple rendered by index.html"""
+    return (o[0], o[1], format_datetime(o[2]), o[3], o[4], o[5], o[6], o[7] or '-', o[8] or '-')
+
+
+def order_to_dict(o, items=None):
+    """Order row as a JSON-serializable dict, optionally with its line items"""
+    order = {
+        'order_id': o[0],
+        'customer_name': o[1],
+        'order_date': o[2].isoformat() if o[2] else None,
+        'order_date_display': format_datetime(o[2]),
+        'total_amount': float(o[3]),
+        'payment_method': o[4],
+        'order_status': o[5],
+        'order_type': o[6],
+        'table_number': o[7],
+        'items_summary': o[8] or '',
+    }
+    if items is not None:
+        order['items'] = [
+            {'item_id': i[0], 'item_name': i[1], 'unit_price': float(i[2]), 'quantity': i[3]}
+            for i in items
+        ]
+    return order
+
+
+def apply_status_change(connection, cursor, order_id, status):
+    """Move an order to a new status and update its table.
+
+    Returns the updated order as a dict, or None if the order doesn't exist.
+    """
+    order_info = fetch_order_state(cursor, order_id)
+
+    if not order_info:
+        return None
+
+    table_number, order_type, current_status = order_info[:3]
+
+    set_order_status(cursor, order_id, status)
+    record_status_change(cursor, current_status, status)
+    if status != current_status:
+        record_order_status(cursor, order_id, status)
+        if status == 'Completed':
+            void_open_tickets(cursor, order_id)
+
+    # Handle table status
+    new_table_status = None
+    completed_reservation = None
+    if order_type == 'Dine-in' and table_number:
+        if status == 'Completed' and current_status != 'Completed':
+            if release_table(cursor, table_number, order_id):
+                new_table_status = 'Available'
+                # The party has left, so its booking stops holding the rest of the slot
+                reservation_id = seated_reservation(cursor, table_number)
+                if reservation_id:
+                    completed_reservation = change_reservation_status(cursor, reservation_id, 'Completed')
+        elif current_status == 'Completed' and status in ['Pending', 'Preparing']:
+            if seat_order(cursor, table_number, order_id):
+                new_table_status = 'Occupied'
+
+    connection.commit()
+
+    if new_table_status:
+        reference_cache.invalidate(TABLES_CACHE_KEY)
+        event_broker.publish('table-status', {'table_number': table_number, 'status': new_table_status})
+    if completed_reservation:
+        availability_index.update(completed_reservation)
+        event_broker.publish('reservation-changed', {'reservation': reservation_to_dict(completed_reservation)})
+
+    order = order_to_dict(fetch_order(cursor, order_id))
+    event_broker.publish('status-changed', {'order': order, 'stats': stats_to_dict(cursor)})
+    return order
+
+
+def get_dashboard_stats(cursor):
+    """Sidebar figures: (pending_orders, available_tables, today_sales)"""
+    tables = get_tables(cursor)
+    available_tables = sum(1 for t in tables if t[3] == 'Available')
+    pending_orders, today_sales = read_dashboard_counters(cursor)
+    return pending_orders, available_tables, today_sales
+
+
+def stats_to_dict(cursor):
+    pending_orders, available_tables, today_sales = get_dashboard_stats(cursor)
+    return {
+        'pending_orders': pending_orders,
+        'available_tables': available_tables,
+        'today_sales': float(today_sales),
+    }
+
+
+def customer_page_url(customer_cursor):
+    """Current dashboard URL pointing at another page of the customers tab"""
+    if customer_cursor is None and 'customer_cursor' not in request.args:
+        return None
+    args = request.args.to_dict()
+    args.pop('customer_cursor', None)
+    if customer_cursor is not None:
+        args['customer_cursor'] = customer_cursor
+    return url_for('index', **args) + '#customers'
+
+
+def render_fragment(template, **context):
+    """Render templates/fragments/<template> to a string"""
+    # Rendered directly through Jinja so the profiler's render signals aren't nested
+    return app.jinja_env.get_template(f'fragments/{template}').render(**context)
+
+
+@app.template_global()
+def cached_fragment(template, version, **context):
+    """Render templates/fragments/<template>, reusing the HTML while `version` is unchanged"""
+    return Markup(fragment_cache.render((template, version), lambda: render_fragment(template, **context)))
+
+
+def fragment_versions(cursor, customer_cursor=None):
+    """Data versions the cached index.html fragments are keyed on"""
+    versions = sync_data_versions(cursor)
+    return {
+        'menu': reference_cache.generation('menu'),
+        'tables': reference_cache.generation(TABLES_CACHE_KEY),
+        # Customers aren't held in reference_cache, so key on the stored counter directly
+        'customers': (versions.get('customers', 0), customer_cursor),
+    }
+
+
+def dashboard_tasks(status_filter='All', order_type_filter='All', page_cursor=None,
+                    page_size=ORDERS_PAGE_SIZE, customer_cursor=None, include_customers=True):
+    """Independent dashboard reads as (concurrent_tasks, inline_tasks) for DashboardLoader.load.
+
+    The uncached reads run concurrently on their own connections; the cached
+    menu/tables lookups run on the request's connection meanwhile. The customers
+    page is skipped when its rendered rows are already cached.
+    """
+    tasks = {
+        'orders': lambda c: fetch_orders(c, status_filter, order_type_filter, page_cursor, page_size),
+        'counters': read_dashboard_counters,
+    }
+    if include_customers:
+        tasks['customers'] = lambda c: fetch_customers(c, customer_cursor, CUSTOMERS_PAGE_SIZE)
+    return tasks, {
+        'menu': get_menu,
+        'tables': get_tables,
+    }
+
+
 @app.route('/')
 def index():
     if ENV_MISSING:
@@ -131,66 +491,48 @@ def index():
     try:
         status_filter = request.args.get('status', 'All')
         order_type_filter = request.args.get('order_type', 'All')
-
-        query = """
-            SELECT o.order_id, c.name, o.order_date, o.total_amount, o.payment_method, 
-                   o.order_status, o.order_type, o.table_number, o.items
-            FROM Orders o
-            JOIN Customers c ON o.customer_id = c.customer_id
-            WHERE 1=1
-        """
-        params = []
-        if status_filter != 'All':
-            query += " AND o.order_status = %s"
-            params.append(status_filter)
-        if order_type_filter != 'All':
-            query += " AND o.order_type = %s"
-            params.append(order_type_filter)
-
-        query += " ORDER BY o.order_date DESC"
-        cursor.execute(query, params)
-        orders_raw = cursor.fetchall()
-
-        orders = []
-        for o in orders_raw:
-            items_json = o[8] or '[]'
-            try:
-                items = json.loads(items_json)
-                items_str = ", ".join([f"{item['item']} (₹{item['price']})" for item in items])
-            except:
-                items_str = "Invalid items"
-            orders.append((
-                o[0], o[1], format_datetime(o[2]), o[3], o[4], o[5], o[6], o[7] or '-', items_str
-            ))
-
-        cursor.execute("SELECT item_id, item_name, category, price FROM Menu WHERE is_available = TRUE ORDER BY category, item_name")
-        menu = cursor.fetchall()
-
-        cursor.execute("SELECT customer_id, name, phone, email, address, joined_on FROM Customers ORDER BY joined_on DESC")
-        customers = cursor.fetchall()
-
-        cursor.execute("SELECT table_id, table_number, capacity, status FROM Tables ORDER BY table_number")
-        tables = cursor.fetchall()
-
-        cursor.execute("SELECT COUNT(*) FROM Orders WHERE order_status = 'Pending'")
-        pending_orders = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM Tables WHERE status = 'Available'")
-        available_tables = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COALESCE(SUM(total_amount), 0) FROM Orders WHERE DATE(order_date) = CURDATE()")
-        today_sales = cursor.fetchone()[0]
+        page_size = get_page_size()
+        cursor_value = request.args.get('cursor')
+        page_cursor = decode_order_cursor(cursor_value) if cursor_value else None
+        customer_cursor = request.args.get('customer_cursor', type=int)
+        # Read before loading: a change that lands mid-load then re-renders on the next hit
+        versions = fragment_versions(cursor, customer_cursor)
+        customers_key = ('customer_rows.html', versions['customers'])
+        cached_customers = fragment_cache.get(customers_key)
+
+        data = dashboard_loader.load(connection, *dashboard_tasks(
+            status_filter, order_type_filter, page_cursor, page_size, customer_cursor,
+            include_customers=cached_customers is None))
+
+        orders_raw, next_cursor = data['orders']
+        orders = [order_row(o) for o in orders_raw]
+        if cached_customers is None:
+            customers, next_customer_cursor = data['customers']
+            customer_rows = Markup(render_fragment('customer_rows.html', customers=customers))
+            fragment_cache.put(customers_key, (customer_rows, next_customer_cursor))
+        else:
+            customer_rows, next_customer_cursor = cached_customers
+        tables = data['tables']
+        available_tables = sum(1 for t in tables if t[3] == 'Available')
+        pending_orders, today_sales = data['counters']
 
         return render_template('index.html',
                                orders=orders,
-                               menu=menu,
-                               customers=customers,
+                               menu=data['menu'],
+                               customer_rows=customer_rows,
                                tables=tables,
                                pending_orders=pending_orders,
                                available_tables=available_tables,
                                today_sales=today_sales,
                                status_filter=status_filter,
-                               order_type_filter=order_type_filter)
+                               order_type_filter=order_type_filter,
+                               page_size=page_size,
+                               next_cursor=next_cursor,
+                               is_first_page=page_cursor is None,
+                               customer_page_url=customer_page_url(next_customer_cursor),
+                               customers_first_page_url=customer_page_url(None) if customer_cursor else None,
+                               fragment_versions=versions,
+                               idempotency_key=uuid.uuid4().hex)
 
     except Error as e:
         error_msg = f"Database query error: {str(e)}"
@@ -202,11 +544,354 @@ def index():
         connection.close()
 
 
+@app.before_request
+def ensure_schema():
+    """Start the once-per-process schema check; hold requests off only while a migration runs"""
+    if ENV_MISSING or SCHEMA_CHECK == 'off' or request.endpoint in ('static', 'health'):
+        return None
+    schema_initializer.start()
+    if SCHEMA_CHECK == 'blocking':
+        schema_initializer.wait(SCHEMA_CHECK_TIMEOUT)
+    if schema_initializer.state != 'migrating':
+        return None
+
+    message = "The database is being upgraded. Please retry in a few seconds."
+    if request.path.startswith('/api/'):
+        response = app.make_response(api_error(message, 503))
+    else:
+        response = app.make_response((render_error(message), 503))
+    response.headers['Retry-After'] = '5'
+    return response
+
+
+@app.before_request
+def start_request_profile():
+    if PROFILING_ENABLED:
+        g.profile, g.profile_token = profiler.start_request(request.endpoint)
+
+
+@app.after_request
+def finish_request_profile(response):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+
+    repeated = profiler.finish_request(profile, response.status_code)
+    response.headers['Server-Timing'] = server_timing(profile)
+
+    if PROFILER_TOOLBAR and response.mimetype == 'text/html' and not response.is_streamed:
+        toolbar = render_template('profiler_toolbar.html', profile=profile, repeated=repeated,
+                                  slow_ms=SLOW_QUERY_MS)
+        body = response.get_data(as_text=True)
+        if '</body>' in body:
+            response.set_data(body.replace('</body>', toolbar + '</body>', 1))
+    return response
+
+
+@app.teardown_request
+def end_request_profile(exc):
+    token = g.pop('profile_token', None)
+    if token is not None:
+        profiler.end_request(token)
+
+
+def _template_render_started(sender, template, context, **extra):
+    profile = profiler.current()
+    if profile is not None:
+        profile.start_render()
+
+
+def _template_render_finished(sender, template, context, **extra):
+    profile = profiler.current()
+    if profile is not None:
+        profile.end_render()
+
+
+before_render_template.connect(_template_render_started, app)
+template_rendered.connect(_template_render_finished, app)
+
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics"""
+    gauges = []
+    if db_pool is not None:
+        pool = db_pool.stats()
+        gauges += [
+            ('rms_db_pool_in_use', 'Pooled connections checked out', pool['in_use']),
+            ('rms_db_pool_idle', 'Pooled connections idle', pool['idle']),
+            ('rms_db_pool_connections_created', 'Connections opened since start', pool['connections_created']),
+            ('rms_db_pool_wait_seconds_total', 'Time spent waiting for a connection', pool['wait_time_total']),
+        ]
+    cache = reference_cache.stats()['keys']
+    gauges += [
+        ('rms_reference_cache_hits', 'Reference cache hits', sum(k['hits'] for k in cache.values())),
+        ('rms_reference_cache_misses', 'Reference cache misses', sum(k['misses'] for k in cache.values())),
+        ('rms_event_subscribers', 'Connected live-update subscribers', event_broker.stats()['subscribers']),
+        ('rms_dashboard_query_timeouts', 'Dashboard loads that hit the per-query timeout',
+         dashboard_loader.stats()['timeouts']),
+        ('rms_schema_ready', 'Schema check passed in this process', int(schema_initializer.ready)),
+    ]
+    return Response(profiler.prometheus(gauges), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/pool_stats')
+def pool_stats():
+    if ENV_MISSING:
+        return jsonify({'error': ENV_ERROR}), 503
+    return jsonify(get_pool().stats())
+
+
+@app.route('/events')
+def event_stream():
+    """Server-Sent Events feed of order and table changes"""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    return Response(event_broker.stream(last_event_id),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/health')
+def health():
+    """Readiness: 200 once the schema check has passed, 503 before that (never touches the database)"""
+    stats = schema_initializer.stats()
+    if not ENV_MISSING and SCHEMA_CHECK != 'off':
+        schema_initializer.start()
+    ready = schema_initializer.ready or SCHEMA_CHECK == 'off'
+    return jsonify({'status': 'ok' if ready else stats['state'], 'schema': stats}), 200 if ready else 503
+
+
+@app.route('/event_stats')
+def event_stats():
+    return jsonify(event_broker.stats())
+
+
+@app.route('/cache_stats')
+def cache_stats():
+    return jsonify({**reference_cache.stats(), 'fragments': fragment_cache.stats(),
+                    'reservations': availability_index.stats(), 'idempotency': idempotency_store.stats()})
+
+
+class OrderRejected(Exception):
+    """An order that fails validation; nothing was written"""
+
+    def __init__(self, message, category='warning', status_code=400):
+        super().__init__(message)
+        self.category = category
+        self.status_code = status_code
+
+
+def order_details_from_form(form):
+    """The order form's fields as the dict place_order() takes"""
+    try:
+        discount = float(form.get('discount') or 0)
+    except ValueError:
+        raise OrderRejected('Invalid discount')
+    reservation_id = form.get('reservation_id', '').strip()
+    if reservation_id and not reservation_id.isdigit():
+        raise OrderRejected('Invalid reservation')
+    return {
+        'customer_id': form.get('customer_id'),
+        'name': form.get('name', '').strip(),
+        'phone': form.get('phone', '').strip(),
+        'email': form.get('email', '').strip(),
+        'address': form.get('address', '').strip(),
+        'payment_method': form.get('payment_method'),
+        'order_type': form.get('order_type'),
+        'table_number': form.get('table_number'),
+        'reservation_id': int(reservation_id) if reservation_id else None,
+        'discount': discount,
+        'quantities': read_quantities(form),
+    }
+
+
+def order_details_from_json(payload):
+    """A POST /api/orders body as the dict place_order() takes"""
+    quantities = {}
+    for item in payload.get('items') or []:
+        item_id = item.get('item_id') if isinstance(item, dict) else None
+        quantity = item.get('qty', 1) if isinstance(item, dict) else None
+        if not isinstance(item_id, int) or not isinstance(quantity, int) or quantity < 1:
+            raise OrderRejected('items must be a list of {"item_id", "qty"} with whole-number values')
+        quantities[item_id] = min(quantities.get(item_id, 0) + quantity, MAX_ITEM_QUANTITY)
+    discount = payload.get('discount') or 0
+    if not isinstance(discount, (int, float)):
+        raise OrderRejected('Invalid discount')
+    customer_id = payload.get('customer_id')
+    reservation_id = payload.get('reservation_id')
+    if reservation_id is not None and not isinstance(reservation_id, int):
+        raise OrderRejected('Invalid reservation')
+    return {
+        'customer_id': str(customer_id) if customer_id else None,
+        'name': (payload.get('name') or '').strip(),
+        'phone': (payload.get('phone') or '').strip(),
+        'email': (payload.get('email') or '').strip(),
+        'address': (payload.get('address') or '').strip(),
+        'payment_method': payload.get('payment_method'),
+        'order_type': payload.get('order_type'),
+        'table_number': str(payload['table_number']) if payload.get('table_number') else None,
+        'reservation_id': reservation_id,
+        'discount': float(discount),
+        'quantities': quantities,
+    }
+
+
+def place_order(connection, cursor, details, idempotency_key=None, fingerprint=None):
+    """Validate and place an order in one transaction; returns the new order as a dict.
+
+    Raises OrderRejected for invalid input and KeyAlreadyClaimed when another
+    request already used idempotency_key (the caller looks its result up).
+    With a reservation_id the order seats that booking on its table, in the
+    same transaction.
+    """
+    customer_id = details['customer_id']
+    name, phone = details['name'], details['phone']
+    order_type, table_number = details['order_type'], details['table_number']
+    reservation_id = details.get('reservation_id')
+    quantities = details['quantities']
+
+    if not quantities:
+        raise OrderRejected('Please select at least one item')
+    if reservation_id and order_type != 'Dine-in':
+        raise OrderRejected('Only a dine-in order can seat a reservation')
+
+    # Validate everything before touching the database
+    if customer_id and customer_id != 'new' and customer_id.strip():
+        try:
+            customer_id = int(customer_id)
+        except ValueError:
+            raise OrderRejected('Invalid customer')
+    else:
+        customer_id = None
+        if not phone or not name:
+            raise OrderRejected('Phone number and name are required for new customers')
+
+    # Everything below runs as one transaction with a single commit. The key goes
+    # first, so a concurrent duplicate waits here instead of pricing the order again.
+    if idempotency_key:
+        idempotency_store.claim(cursor, idempotency_key, fingerprint)
+
+    lines, total = price_items(cursor, quantities)
+
+    if total == 0:
+        raise OrderRejected('Invalid items selected', 'error')
+
+    total_after_discount = total - (total * details['discount'] / 100)
+    if reservation_id:
+        reservation = fetch_reservation(cursor, reservation_id)
+        if not reservation:
+            raise OrderRejected('Reservation not found', status_code=404)
+        table_number = table_number or reservation[1]
+        if table_number != reservation[1]:
+            raise OrderRejected(f"Reservation {reservation_id} is for table {reservation[1]}", status_code=409)
+    claims_table = order_type == 'Dine-in' and table_number
+
+    seated = None
+    if claims_table:
+        # Lock the table row so two concurrent orders can't both claim it
+        if lock_table(cursor, table_number) == 'Occupied':
+            raise OrderRejected('Selected table is already occupied', status_code=409)
+        if reservation_id:
+            # The booking already holds this slot, so there is no upcoming booking to run into
+            try:
+                seated = change_reservation_status(cursor, reservation_id, 'Seated')
+            except ValueError as e:
+                raise OrderRejected(str(e), status_code=409)
+        else:
+            booking = upcoming_booking(cursor, table_number)
+            if booking:
+                raise OrderRejected(f"Table {table_number} is reserved at {booking[1].strftime('%H:%M')}",
+                                    status_code=409)
+
+    if customer_id is None:
+        customer_id = find_customer_id(cursor, phone)
+        if customer_id is None:
+            customer_id = insert_customer(cursor, name, phone, details['email'], details['address'])
+
+    order_id = insert_order(cursor, customer_id, lines, total_after_discount, details['payment_method'],
+                            order_type, table_number, details['discount'])
+    insert_order_items(cursor, order_id, lines)
+    create_tickets(cursor, order_id)
+    record_order_status(cursor, order_id, 'Pending')
+
+    if claims_table:
+        seat_order(cursor, table_number, order_id)
+
+    record_order_created(cursor, total_after_discount)
+    order = order_to_dict(fetch_order(cursor, order_id))
+    if idempotency_key:
+        idempotency_store.complete(cursor, idempotency_key, order_id, {'order': order})
+    connection.commit()
+
+    if claims_table:
+        reference_cache.invalidate(TABLES_CACHE_KEY)
+        event_broker.publish('table-status', {'table_number': table_number, 'status': 'Occupied'})
+    if seated:
+        availability_index.update(seated)
+        event_broker.publish('reservation-changed', {'reservation': reservation_to_dict(seated)})
+    event_broker.publish('order-created', {'order': order, 'stats': stats_to_dict(cursor)})
+    return order
+
+
+def place_order_once(connection, cursor, details, idempotency_key):
+    """place_order() guarded by an idempotency key; returns (result, replayed).
+
+    A key seen before returns its stored result without placing the order again.
+    Raises IdempotencyConflict if the key was used for a different order, and
+    IdempotencyInProgress if the first request with the key hasn't finished.
+    """
+    if not idempotency_key:
+        return {'order': place_order(connection, cursor, details)}, False
+
+    fingerprint = request_fingerprint(details)
+    stored = idempotency_store.lookup(cursor, idempotency_key, fingerprint)
+    if stored:
+        return stored, True
+    if not idempotency_store.begin(idempotency_key):
+        # Another request in this process had the key; it has finished or timed out by now
+        stored = idempotency_store.lookup(cursor, idempotency_key, fingerprint)
+        if stored:
+            return stored, True
+        raise IdempotencyInProgress(idempotency_key)
+
+    try:
+        try:
+            order = place_order(connection, cursor, details, idempotency_key, fingerprint)
+        except KeyAlreadyClaimed:
+            # Another worker committed this key while we waited on its row
+            connection.rollback()
+            stored = idempotency_store.lookup(cursor, idempotency_key, fingerprint)
+            if stored:
+                return stored, True
+            raise IdempotencyInProgress(idempotency_key)
+        result = {'order': order}
+        idempotency_store.remember(idempotency_key, fingerprint, result)
+        return result, False
+    finally:
+        idempotency_store.end(idempotency_key)
+
+
+def request_idempotency_key():
+    """The Idempotency-Key header or idempotency_key form field, or None"""
+    key = (request.headers.get('Idempotency-Key') or request.form.get('idempotency_key') or '').strip()
+    return key or None
+
+
 @app.route('/add', methods=['POST'])
 def add_order():
     if ENV_MISSING:
         return render_error(ENV_ERROR)
-    
+
+    idempotency_key = request_idempotency_key()
+    if idempotency_key and not valid_key(idempotency_key):
+        flash('Invalid idempotency key', 'error')
+        return redirect('/')
+
     connection = get_db_connection()
     if not connection:
         return render_error(DB_CONNECTION_ERROR)
@@ -214,82 +899,24 @@ def add_order():
     cursor = connection.cursor()
 
     try:
-        customer_id = request.form.get('customer_id')
-        name = request.form.get('name', '').strip()
-        phone = request.form.get('phone', '').strip()
-        email = request.form.get('email', '').strip()
-        address = request.form.get('address', '').strip()
-        payment_method = request.form.get('payment_method')
-        order_type = request.form.get('order_type')
-        table_number = request.form.get('table_number')
-        discount = float(request.form.get('discount', 0))
-        selected_items = request.form.getlist('items')
-
-        if not selected_items:
-            flash('Please select at least one item', 'warning')
-            return redirect('/')
-
-        # Handle customer
-        if customer_id and customer_id != 'new' and customer_id.strip():
-            customer_id = int(customer_id)
+        details = order_details_from_form(request.form)
+        result, replayed = place_order_once(connection, cursor, details, idempotency_key)
+        if replayed:
+            flash(f"Order #{result['order']['order_id']} was already placed", 'warning')
         else:
-            if not phone or not name:
-                flash('Phone number and name are required for new customers', 'warning')
-                return redirect('/')
-
-            cursor.execute("SELECT customer_id FROM Customers WHERE phone = %s", (phone,))
-            existing = cursor.fetchone()
-            if existing:
-                customer_id = existing[0]
-            else:
-                cursor.execute(
-                    "INSERT INTO Customers (name, phone, email, address) VALUES (%s, %s, %s, %s)",
-                    (name, phone, email or None, address or None)
-                )
-                connection.commit()
-                customer_id = cursor.lastrowid
-
-        # Build items detail
-        items_detail = []
-        total = 0.0
-        for item_id in selected_items:
-            cursor.execute("SELECT item_name, price FROM Menu WHERE item_id = %s", (item_id,))
-            item = cursor.fetchone()
-            if item:
-                price = float(item[1])
-                items_detail.append({"item": item[0], "price": price})
-                total += price
-
-        if total == 0:
-            flash('Invalid items selected', 'error')
-            return redirect('/')
-
-        total_after_discount = total - (total * discount / 100)
-
-        # Validate table
-        if order_type == 'Dine-in' and table_number:
-            cursor.execute("SELECT status FROM Tables WHERE table_number = %s", (table_number,))
-            table_status = cursor.fetchone()
-            if table_status and table_status[0] == 'Occupied':
-                flash('Selected table is already occupied', 'warning')
-                return redirect('/')
-
-        # Insert order
-        cursor.execute("""
-            INSERT INTO Orders (customer_id, items, total_amount, payment_method, order_type, table_number, discount)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-        """, (customer_id, json.dumps(items_detail), total_after_discount, payment_method, order_type,
-              table_number if table_number else None, discount))
-        connection.commit()
-
-        # Update table status
-        if order_type == 'Dine-in' and table_number:
-            cursor.execute("UPDATE Tables SET status = 'Occupied' WHERE table_number = %s", (table_number,))
-            connection.commit()
-
-        flash('Order placed successfully', 'success')
+            flash('Order placed successfully', 'success')
         return redirect('/')
 
+    except OrderRejected as e:
+        connection.rollback()
+        flash(str(e), e.category)
+        return redirect('/')
+    except IdempotencyConflict as e:
+        flash(str(e), 'error')
+        return redirect('/')
+    except IdempotencyInProgress:
+        flash('This order is still being placed; check the order list before submitting again', 'warning')
+        return redirect('/')
     except Error as e:
         connection.rollback()
         error_msg = f"Failed to place order: {str(e)}"
@@ -322,27 +949,10 @@ def update_status(order_id, status):
             flash('Invalid status', 'error')
             return redirect('/')
 
-        cursor.execute("SELECT table_number, order_type, order_status FROM Orders WHERE order_id = %s", (order_id,))
-        order_info = cursor.fetchone()
-
-        if not order_info:
+        if not apply_status_change(connection, cursor, order_id, status):
             flash('Order not found', 'error')
             return redirect('/')
 
-        table_number, order_type, current_status = order_info
-
-        cursor.execute("UPDATE Orders SET order_status = %s WHERE order_id = %s", (status, order_id))
-        connection.commit()
-
-        # Handle table status
-        if order_type == 'Dine-in' and table_number:
-            if status == 'Completed':
-                cursor.execute("UPDATE Tables SET status = 'Available' WHERE table_number = %s", (table_number,))
-                connection.commit()
-            elif current_status == 'Completed' and status in ['Pending', 'Preparing']:
-                cursor.execute("UPDATE Tables SET status = 'Occupied' WHERE table_number = %s", (table_number,))
-                connection.commit()
-
         flash(f'Order status updated to {status}', 'success')
         return redirect('/')
 
@@ -369,29 +979,29 @@ def delete_order(order_id):
     cursor = connection.cursor()
 
     try:
-        cursor.execute("SELECT table_number, order_type FROM Orders WHERE order_id = %s", (order_id,))
-        result = cursor.fetchone()
+        result = fetch_order_state(cursor, order_id)
 
         if not result:
             flash('Order not found', 'error')
             return redirect('/')
 
-        table_number, order_type = result
+        table_number, order_type, order_status, order_date, total_amount = result
+
+        retract_order(cursor, order_id)
+        remove_order(cursor, order_id)
+        record_order_deleted(cursor, order_date, total_amount, order_status)
+
+        # Free the table if this order was the one sitting at it
+        table_freed = False
+        if order_type == 'Dine-in' and table_number and order_status in ('Pending', 'Preparing'):
+            table_freed = release_table(cursor, table_number, order_id)
 
-        cursor.execute("DELETE FROM Orders WHERE order_id = %s", (order_id,))
         connection.commit()
 
-        # Free table if no active orders
-        if order_type == 'Dine-in' and table_number:
-            cursor.execute("""
-                SELECT COUNT(*) FROM Orders 
-                WHERE table_number = %s AND order_type = 'Dine-in' 
-                AND order_status IN ('Pending', 'Preparing')
-            """, (table_number,))
-            active_count = cursor.fetchone()[0]
-            if active_count == 0:
-                cursor.execute("UPDATE Tables SET status = 'Available' WHERE table_number = %s", (table_number,))
-                connection.commit()
+        if table_freed:
+            reference_cache.invalidate(TABLES_CACHE_KEY)
+            event_broker.publish('table-status', {'table_number': table_number, 'status': 'Available'})
+        event_broker.publish('order-deleted', {'order_id': order_id, 'stats': stats_to_dict(cursor)})
 
         flash('Order deleted successfully', 'success')
         return redirect('/')
@@ -419,14 +1029,11 @@ def delete_customer(customer_id):
     cursor = connection.cursor()
 
     try:
-        cursor.execute("SELECT COUNT(*) FROM Orders WHERE customer_id = %s", (customer_id,))
-        order_count = cursor.fetchone()[0]
-
-        if order_count > 0:
+        if customer_has_orders(cursor, customer_id):
             flash('Cannot delete customer with existing orders', 'warning')
             return redirect('/')
 
-        cursor.execute("DELETE FROM Customers WHERE customer_id = %s", (customer_id,))
+        remove_customer(cursor, customer_id)
         connection.commit()
 
         flash('Customer deleted successfully', 'success')
@@ -445,8 +1052,518 @@ def delete_customer(customer_id):
         connection.close()
 
 
+# JSON API
+
+def api_error(message, status_code):
+    return jsonify({'error': message}), status_code
+
+
+def conditional_json(data):
+    """JSON response with an ETag; returns 304 when it matches If-None-Match"""
+    response = jsonify(data)
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def run_api(handler):
+    """Run handler(connection, cursor) on a pooled connection, mapping failures to JSON errors"""
+    if ENV_MISSING:
+        return api_error(ENV_ERROR, 503)
+
+    connection = get_db_connection()
+    if not connection:
+        return api_error(DB_CONNECTION_ERROR, 503)
+
+    cursor = connection.cursor()
+
+    try:
+        return handler(connection, cursor)
+    except Error as e:
+        connection.rollback()
+        return api_error(f"Database query error: {str(e)}", 500)
+    finally:
+        cursor.close()
+        connection.close()
+
+
+@app.route('/api/orders')
+def api_orders():
+    def handler(connection, cursor):
+        cursor_value = request.args.get('cursor')
+        page_cursor = decode_order_cursor(cursor_value) if cursor_value else None
+        rows, next_cursor = fetch_orders(cursor,
+                                         request.args.get('status', 'All'),
+                                         request.args.get('order_type', 'All'),
+                                         page_cursor,
+                                         get_page_size(),
+                                         include_archive_arg())
+        return conditional_json({
+            'orders': [order_to_dict(o) for o in rows],
+            'next_cursor': next_cursor,
+        })
+    return run_api(handler)
+
+
+@app.route('/api/orders', methods=['POST'])
+def api_create_order():
+    """Place an order; send an Idempotency-Key header to make retries safe"""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return api_error('Expected a JSON object', 400)
+    idempotency_key = request_idempotency_key()
+    if idempotency_key and not valid_key(idempotency_key):
+        return api_error(f'Idempotency-Key must be 1-{MAX_KEY_LENGTH} printable characters', 400)
+    try:
+        details = order_details_from_json(payload)
+    except OrderRejected as e:
+        return api_error(str(e), e.status_code)
+
+    def handler(connection, cursor):
+        try:
+            result, replayed = place_order_once(connection, cursor, details, idempotency_key)
+        except OrderRejected as e:
+            connection.rollback()
+            return api_error(str(e), e.status_code)
+        except IdempotencyConflict as e:
+            return api_error(str(e), 422)
+        except IdempotencyInProgress:
+            response = app.make_response(api_error('A request with this Idempotency-Key is still in progress', 409))
+            response.headers['Retry-After'] = '1'
+            return response
+        response = app.make_response((jsonify(result), 201))
+        if replayed:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    return run_api(handler)
+
+
+@app.route('/api/orders/<int:order_id>')
+def api_order(order_id):
+    def handler(connection, cursor):
+        include_archive = include_archive_arg()
+        order = fetch_order(cursor, order_id, include_archive)
+        if not order:
+            return api_error('Order not found', 404)
+        items = fetch_order_items(cursor, order_id)
+        if not items and include_archive:
+            items = fetch_archived_order_items(cursor, order_id)
+        return conditional_json(order_to_dict(order, items))
+    return run_api(handler)
+
+
+@app.route('/api/orders/<int:order_id>/status', methods=['POST'])
+def api_update_status(order_id):
+    payload = request.get_json(silent=True) or {}
+    status = payload.get('status') or request.form.get('status')
+    if status not in ['Pending', 'Preparing', 'Completed']:
+        return api_error('Invalid status', 400)
+
+    def handler(connection, cursor):
+        order = apply_status_change(connection, cursor, order_id, status)
+        if not order:
+            return api_error('Order not found', 404)
+        return jsonify({
+            'order': order,
+            'stats': stats_to_dict(cursor),
+        })
+    return run_api(handler)
+
+
+def parse_slot(at, duration):
+    """(starts_at, ends_at) from an ISO start time and a duration in minutes, or None if invalid"""
+    try:
+        starts_at = datetime.fromisoformat(at).replace(second=0, microsecond=0, tzinfo=None)
+        duration = int(duration)
+    except (TypeError, ValueError):
+        return None
+    if not 15 <= duration <= 360:
+        return None
+    return starts_at, starts_at + timedelta(minutes=duration)
+
+
+@app.route('/api/tables/availability')
+def api_table_availability():
+    """Table states for a time window, e.g. ?at=2026-10-18T20:00&party_size=4"""
+    slot = parse_slot(request.args.get('at', datetime.now().isoformat()),
+                      request.args.get('duration', DEFAULT_DURATION_MINUTES))
+    if not slot:
+        return api_error('Invalid at or duration', 400)
+    party_size = request.args.get('party_size', 1, type=int)
+    starts_at, ends_at = slot
+
+    def handler(connection, cursor):
+        availability_index.ensure_loaded(cursor)
+        tables = get_tables(cursor)
+        states = availability_index.table_states(tables, starts_at, ends_at)
+        return jsonify({
+            'starts_at': starts_at.isoformat(timespec='minutes'),
+            'ends_at': ends_at.isoformat(timespec='minutes'),
+            'best_fit': availability_index.best_fit(tables, party_size, starts_at, ends_at),
+            'tables': [{'table_number': t, 'capacity': c, 'state': state}
+                       for t, c, state in states if c >= party_size],
+        })
+    return run_api(handler)
+
+
+@app.route('/api/reservations')
+def api_reservations():
+    day = request.args.get('date', datetime.now().strftime('%Y-%m-%d'))
+    try:
+        day = datetime.strptime(day, '%Y-%m-%d').date()
+    except ValueError:
+        return api_error('Invalid date', 400)
+
+    def handler(connection, cursor):
+        return conditional_json([reservation_to_dict(r) for r in fetch_reservations(cursor, day)])
+    return run_api(handler)
+
+
+@app.route('/api/reservations', methods=['POST'])
+def api_create_reservation():
+    """Book a table; without table_number the smallest free table that fits is chosen"""
+    payload = request.get_json(silent=True) or {}
+    guest_name = (payload.get('name') or '').strip()
+    phone = (payload.get('phone') or '').strip() or None
+    party_size = payload.get('party_size')
+    table_number = payload.get('table_number')
+    slot = parse_slot(payload.get('at'), payload.get('duration', DEFAULT_DURATION_MINUTES))
+
+    if not guest_name:
+        return api_error('Name is required', 400)
+    if not isinstance(party_size, int) or not 1 <= party_size <= MAX_PARTY_SIZE:
+        return api_error(f'party_size must be between 1 and {MAX_PARTY_SIZE}', 400)
+    if not slot:
+        return api_error('Invalid at or duration', 400)
+    starts_at, ends_at = slot
+    if ends_at <= datetime.now():
+        return api_error('Reservation is in the past', 400)
+
+    def handler(connection, cursor):
+        availability_index.ensure_loaded(cursor)
+        tables = get_tables(cursor)
+        if table_number:
+            candidates = [str(table_number)]
+        else:
+            candidates = availability_index.best_fit(tables, party_size, starts_at, ends_at)
+        customer_id = find_customer_id(cursor, phone) if phone else None
+
+        booked = book_table(cursor, candidates, guest_name, phone, party_size, starts_at, ends_at, customer_id)
+        if not booked:
+            connection.rollback()
+            return api_error('No table available for that party size and time', 409)
+        connection.commit()
+
+        reservation_id, booked_table = booked
+        availability_index.add(booked_table, starts_at, ends_at, reservation_id)
+        reservation = {
+            'reservation_id': reservation_id, 'table_number': booked_table, 'guest_name': guest_name,
+            'phone': phone, 'party_size': party_size, 'starts_at': starts_at.isoformat(timespec='minutes'),
+            'ends_at': ends_at.isoformat(timespec='minutes'), 'status': 'Booked', 'customer_id': customer_id,
+        }
+        event_broker.publish('reservation-changed', {'reservation': reservation})
+        return jsonify({'reservation': reservation}), 201
+    return run_api(handler)
+
+
+@app.route('/api/reservations/<int:reservation_id>/status', methods=['POST'])
+def api_reservation_status(reservation_id):
+    payload = request.get_json(silent=True) or {}
+    status = payload.get('status') or request.form.get('status')
+    if status not in RESERVATION_STATUSES:
+        return api_error('Invalid status', 400)
+
+    def handler(connection, cursor):
+        try:
+            row = change_reservation_status(cursor, reservation_id, status)
+        except ValueError as e:
+            connection.rollback()
+            return api_error(str(e), 409)
+        if not row:
+            return api_error('Reservation not found', 404)
+        connection.commit()
+
+        availability_index.update(row)
+        reservation = reservation_to_dict(row)
+        event_broker.publish('reservation-changed', {'reservation': reservation})
+        return jsonify({'reservation': reservation})
+    return run_api(handler)
+
+
+@app.route('/kitchen')
+@app.route('/kitchen/<station>')
+def kitchen_display(station=None):
+    """Kitchen display: open tickets per station, oldest first"""
+    if ENV_MISSING:
+        return render_error(ENV_ERROR)
+    if station and station not in all_stations():
+        return render_error(f"Unknown kitchen station '{station}'")
+
+    connection = get_db_connection()
+    if not connection:
+        return render_error(DB_CONNECTION_ERROR)
+
+    cursor = connection.cursor()
+
+    try:
+        tickets = [ticket_to_dict(t) for t in fetch_queue(cursor, station)]
+        return render_template('kitchen.html', tickets=tickets, station=station, stations=all_stations())
+    except Error as e:
+        error_msg = f"Failed to load the kitchen queue: {str(e)}"
+        if "doesn't exist" in str(e).lower():
+            error_msg = f"Kitchen tables are missing: {str(e)}. Run 'python db_initializer.py' to create them."
+        return render_error(error_msg)
+    finally:
+        cursor.close()
+        connection.close()
+
+
+@app.route('/api/kitchen/queue')
+def api_kitchen_queue():
+    station = request.args.get('station')
+
+    def handler(connection, cursor):
+        return conditional_json([ticket_to_dict(t) for t in fetch_queue(cursor, station)])
+    return run_api(handler)
+
+
+@app.route('/api/kitchen/tickets/<int:ticket_id>/status', methods=['POST'])
+def api_ticket_status(ticket_id):
+    payload = request.get_json(silent=True) or {}
+    status = payload.get('status') or request.form.get('status')
+    if status not in TICKET_STATUSES:
+        return api_error('Invalid status', 400)
+
+    def handler(connection, cursor):
+        try:
+            result = advance_ticket(cursor, ticket_id, status)
+        except ValueError as e:
+            connection.rollback()
+            return api_error(str(e), 409)
+        if not result:
+            return api_error('Ticket not found', 404)
+        order_id, order_ready = result
+
+        if status == 'Preparing' and fetch_order_state(cursor, order_id)[2] == 'Pending':
+            # First ticket started: the order is now being prepared (commits both changes)
+            apply_status_change(connection, cursor, order_id, 'Preparing')
+        else:
+            connection.commit()
+
+        event_broker.publish('kitchen-ticket', {'ticket_id': ticket_id, 'order_id': order_id,
+                                                'status': status, 'order_ready': order_ready})
+        return jsonify({'ticket_id': ticket_id, 'order_id': order_id, 'status': status,
+                        'order_ready': order_ready})
+    return run_api(handler)
+
+
+@app.route('/api/kitchen/latency')
+def api_kitchen_latency():
+    """Prep latency per station and item, from the status history"""
+    start, end, _ = parse_report_args()
+
+    def handler(connection, cursor):
+        columns, rows = prep_latency_report(cursor, start, end + timedelta(days=1))
+        rows = [tuple(float(v) if isinstance(v, Decimal) else v for v in row) for row in rows]
+        return conditional_json({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'rows': [dict(zip(columns, row)) for row in rows],
+        })
+    return run_api(handler)
+
+
+@app.route('/api/customers/search')
+def api_customer_search():
+    term = request.args.get('q', '').strip()
+    if len(term) < 2:
+        return jsonify([])
+    limit = max(1, min(request.args.get('limit', CUSTOMER_SEARCH_LIMIT, type=int), 25))
+
+    def handler(connection, cursor):
+        return conditional_json([
+            {'customer_id': c[0], 'name': c[1], 'phone': c[2]}
+            for c in search_customers(cursor, term, limit)
+        ])
+    return run_api(handler)
+
+
+@app.route('/api/menu')
+def api_menu():
+    def handler(connection, cursor):
+        return conditional_json([
+            {'item_id': m[0], 'item_name': m[1], 'category': m[2], 'price': float(m[3])}
+            for m in get_menu(cursor)
+        ])
+    return run_api(handler)
+
+
+@app.route('/api/tables')
+def api_tables():
+    def handler(connection, cursor):
+        return conditional_json([
+            {'table_id': t[0], 'table_number': t[1], 'capacity': t[2], 'status': t[3]}
+            for t in get_tables(cursor)
+        ])
+    return run_api(handler)
+
+
+@app.route('/api/import/<kind>', methods=['POST'])
+def api_import(kind):
+    """Bulk-update the menu or tables from an uploaded CSV, JSON or NDJSON sheet"""
+    if kind not in IMPORT_KINDS:
+        return api_error(f"Unknown import '{kind}'", 404)
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return api_error('A file upload is required', 400)
+    dry_run = request.values.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    disable_missing = request.values.get('disable_missing', '').lower() in ('1', 'true', 'yes')
+
+    def handler(connection, cursor):
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        rows = read_rows(stream, request.values.get('format') or import_format_for(upload.filename))
+        report = import_sheet(connection, cursor, kind, rows, dry_run, disable_missing)
+        if report['errors']:
+            return jsonify(report), 422
+        if report['applied']:
+            if kind == 'menu':
+                for key in MENU_CACHE_KEYS:
+                    reference_cache.invalidate(key)
+            else:
+                reference_cache.invalidate(TABLES_CACHE_KEY)
+                availability_index.invalidate()
+        return jsonify(report)
+    return run_api(handler)
+
+
+@app.route('/api/stats')
+def api_stats():
+    def handler(connection, cursor):
+        return conditional_json(stats_to_dict(cursor))
+    return run_api(handler)
+
+
+
+# Reports
+
+def parse_report_args():
+    """Report date range (default: last 30 days) and period from the query string"""
+    today = datetime.now().date()
+    try:
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        end = today
+    try:
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        start = end - timedelta(days=29)
+    period = request.args.get('period', 'daily')
+    if period not in PERIOD_FORMATS:
+        period = 'daily'
+    return start, end, period
+
+
+def run_report(connection, cursor, report_name):
+    """Run a report, refreshing stale rollups first; returns (columns, rows, start, end)"""
+    start, end, period = parse_report_args()
+    rollup_refresher.maybe_refresh(connection)
+    columns, rows = REPORTS[report_name](cursor, start, end, period)
+    rows = [tuple(float(v) if isinstance(v, Decimal) else v for v in row) for row in rows]
+    return columns, rows, start, end
+
+
+@app.route('/api/reports/<report_name>')
+def api_report(report_name):
+    if report_name not in REPORTS:
+        return api_error('Unknown report', 404)
+
+    def handler(connection, cursor):
+        columns, rows, start, end = run_report(connection, cursor, report_name)
+        return conditional_json({
+            'report': report_name,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'rows': [dict(zip(columns, row)) for row in rows],
+        })
+    return run_api(handler)
+
+
+@app.route('/reports/<report_name>.csv')
+def report_csv(report_name):
+    if report_name not in REPORTS:
+        return api_error('Unknown report', 404)
+
+    def handler(connection, cursor):
+        columns, rows, start, end = run_report(connection, cursor, report_name)
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(columns)
+        writer.writerows(rows)
+        filename = f"{report_name}_{start.isoformat()}_{end.isoformat()}.csv"
+        return Response(output.getvalue(), mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+    return run_api(handler)
+
+
+
+# Exports
+
+def parse_date_arg(name):
+    """Optional YYYY-MM-DD query parameter as a date"""
+    try:
+        return datetime.strptime(request.args[name], '%Y-%m-%d').date()
+    except (KeyError, ValueError):
+        return None
+
+
+def stream_export(dataset):
+    """Stream a CSV/NDJSON export; the pooled connection is held until the last chunk"""
+    if ENV_MISSING:
+        return render_error(ENV_ERROR)
+
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        fmt = 'csv'
+    start = parse_date_arg('start')
+    end = parse_date_arg('end')
+    status = request.args.get('status')
+    include_archive = include_archive_arg()
+
+    connection = get_db_connection()
+    if not connection:
+        return render_error(DB_CONNECTION_ERROR)
+
+    def generate():
+        finished = False
+        try:
+            yield from export_chunks(connection, dataset, fmt, start, end, status, include_archive)
+            finished = True
+        finally:
+            if finished:
+                connection.close()
+            else:
+                # Client went away (or the query failed) mid-stream: returning the connection
+                # would read the rest of the result first, so drop it instead
+                connection.discard()
+
+    extension = 'ndjson' if fmt == 'ndjson' else 'csv'
+    mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'text/csv'
+    filename = f"{dataset}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return Response(generate(), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+
+@app.route('/export/orders')
+def export_orders():
+    return stream_export('orders')
+
+
+@app.route('/export/customers')
+def export_customers():
+    return stream_export('customers')
+
+
 if __name__ == '__main__':
-    if not ENV_MISSING:
-        check_and_initialize_database()
-    
+    if not ENV_MISSING and SCHEMA_CHECK != 'off':
+        schema_initializer.start()
+
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""Moves old Completed orders out of Orders into OrdersArchive.
+
+The dashboard, the counters and the order API read only Orders, so keeping
+it to recent and open orders keeps those queries fast. Orders are moved
+oldest first, in small batches. Each batch copies its orders and their line
+items into the archive tables and deletes them from Orders in one short
+transaction. Progress is saved with every batch, so an interrupted run picks
+up where it stopped. History reads (order API, exports, rollup rebuilds) can
+union both tables when asked.
+
+Usage: python archive.py --days 90 --batch-size 500
+"""
+import time
+from datetime import datetime, timedelta
+
+from mysql.connector import Error
+
+ARCHIVE_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 500
+# Seconds to wait between batches so order writes get the locks in between
+ARCHIVE_PAUSE = 0.05
+
+ORDER_FIELDS = ("order_id, customer_id, items, total_amount, discount, payment_method, "
+                "order_status, order_type, table_number, order_date")
+ORDER_ITEM_FIELDS = "order_item_id, order_id, item_id, item_name, unit_price, quantity"
+
+# Drop-in replacements for "Orders" / "OrderItems" in a FROM clause that read both tables
+ORDERS_WITH_ARCHIVE = (f"(SELECT {ORDER_FIELDS} FROM Orders "
+                       f"UNION ALL SELECT {ORDER_FIELDS} FROM OrdersArchive)")
+ORDER_ITEMS_WITH_ARCHIVE = (f"(SELECT {ORDER_ITEM_FIELDS} FROM OrderItems "
+                            f"UNION ALL SELECT {ORDER_ITEM_FIELDS} FROM OrderItemsArchive)")
+
+
+def orders_with_archive(where, params, order_by=None, limit=None):
+    """Orders UNION ALL OrdersArchive with the filter applied inside each branch; returns (sql, params).
+
+    A WHERE on the derived union can't use either table's indexes. Here each
+    branch filters (and, given order_by and limit, sorts and cuts) through its
+    own indexes, and only the surviving rows are combined. where and order_by
+    refer to the table as o.
+    """
+    tail = f" ORDER BY {order_by} LIMIT %s" if order_by else ""
+    branches = [f"SELECT * FROM (SELECT {ORDER_FIELDS} FROM {table} o WHERE {where}{tail}) {alias}"
+                for table, alias in (('Orders', 'live'), ('OrdersArchive', 'archived'))]
+    branch_params = list(params) + ([limit] if order_by else [])
+    return f"({' UNION ALL '.join(branches)})", branch_params * 2
+
+
+def order_sources(include_archive=False):
+    """(orders, order_items) table expressions for a FROM clause"""
+    if include_archive:
+        return ORDERS_WITH_ARCHIVE, ORDER_ITEMS_WITH_ARCHIVE
+    return 'Orders', 'OrderItems'
+
+
+def create_archive_tables(cursor):
+    """Create the archive tables and the job's progress row if they don't exist"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS OrdersArchive (
+            order_id INT PRIMARY KEY,
+            customer_id INT NOT NULL,
+            items JSON NOT NULL,
+            total_amount DECIMAL(10, 2) NOT NULL,
+            discount DECIMAL(5, 2) DEFAULT 0,
+            payment_method ENUM('Cash', 'Card', 'UPI', 'Other') NOT NULL,
+            order_status ENUM('Pending', 'Preparing', 'Completed') NOT NULL,
+            order_type ENUM('Dine-in', 'Takeaway', 'Delivery') NOT NULL,
+            table_number VARCHAR(10),
+            order_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES Customers(customer_id),
+            INDEX idx_orders_archive_date (order_date, order_id),
+            INDEX idx_orders_archive_type_date (order_type, order_date, order_id)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS OrderItemsArchive (
+            order_item_id INT PRIMARY KEY,
+            order_id INT NOT NULL,
+            item_id INT,
+            item_name VARCHAR(100) NOT NULL,
+            unit_price DECIMAL(10, 2) NOT NULL,
+            quantity INT NOT NULL DEFAULT 1,
+            INDEX idx_order_items_archive_order (order_id),
+            FOREIGN KEY (order_id) REFERENCES OrdersArchive(order_id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ArchiveState (
+            name VARCHAR(50) PRIMARY KEY,
+            last_order_id INT NOT NULL DEFAULT 0,
+            archived_total BIGINT NOT NULL DEFAULT 0,
+            last_run_orders INT NOT NULL DEFAULT 0,
+            last_run_seconds DECIMAL(10, 2) NULL,
+            last_run_at TIMESTAMP NULL
+        )
+    """)
+
+
+def fetch_archived_order_items(cursor, order_id):
+    """Line items of an archived order as (item_id, item_name, unit_price, quantity)"""
+    cursor.execute("""
+        SELECT item_id, item_name, unit_price, quantity FROM OrderItemsArchive
+        WHERE order_id = %s ORDER BY order_item_id
+    """, (order_id,))
+    return cursor.fetchall()
+
+
+def _archive_batch(cursor, after_id, cutoff, batch_size):
+    """Move one batch (caller commits); returns (archived order_ids, last order_id examined or None)"""
+    # Only orders already folded into the report rollups, so refresh_rollups never misses one,
+    # and never an order that still holds a table. A plain read: FOR UPDATE here would lock
+    # every row the filtered scan passes over, not just the batch.
+    cursor.execute("""
+        SELECT o.order_id FROM Orders o
+        WHERE o.order_id > %s
+          AND o.order_id <= (SELECT COALESCE(MAX(last_order_id), 0) FROM ReportState WHERE name = 'sales')
+          AND o.order_status = 'Completed' AND o.order_date < %s
+          AND NOT EXISTS (SELECT 1 FROM Tables t WHERE t.current_order_id = o.order_id)
+        ORDER BY o.order_id
+        LIMIT %s
+    """, (after_id, cutoff, batch_size))
+    candidates = [row[0] for row in cursor.fetchall()]
+    if not candidates:
+        return [], None
+
+    # Lock only the candidates, by primary key, and re-check them: one may have been
+    # reopened or deleted since the read above
+    placeholders = ', '.join(['%s'] * len(candidates))
+    cursor.execute(f"""
+        SELECT order_id, order_status, order_date FROM Orders
+        WHERE order_id IN ({placeholders})
+        ORDER BY order_id
+        FOR UPDATE
+    """, candidates)
+    order_ids = [order_id for order_id, status, order_date in cursor.fetchall()
+                 if status == 'Completed' and order_date < cutoff]
+    if not order_ids:
+        cursor.execute("UPDATE ArchiveState SET last_order_id = %s WHERE name = 'orders'", (candidates[-1],))
+        return [], candidates[-1]
+
+    placeholders = ', '.join(['%s'] * len(order_ids))
+    cursor.execute(f"""
+        INSERT INTO OrdersArchive ({ORDER_FIELDS})
+        SELECT {ORDER_FIELDS} FROM Orders WHERE order_id IN ({placeholders})
+    """, order_ids)
+    cursor.execute(f"""
+        INSERT INTO OrderItemsArchive ({ORDER_ITEM_FIELDS})
+        SELECT {ORDER_ITEM_FIELDS} FROM OrderItems WHERE order_id IN ({placeholders})
+    """, order_ids)
+    # Cascades to OrderItems and KitchenTickets; OrderStatusHistory is kept
+    cursor.execute(f"DELETE FROM Orders WHERE order_id IN ({placeholders})", order_ids)
+    cursor.execute("""
+        UPDATE ArchiveState SET last_order_id = %s, archived_total = archived_total + %s
+        WHERE name = 'orders'
+    """, (candidates[-1], len(order_ids)))
+    return order_ids, candidates[-1]
+
+
+def archive_orders(connection, days=ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE,
+                   pause=ARCHIVE_PAUSE, max_batches=None, verbose=True):
+    """Archive Completed orders older than `days` days; returns a summary of the run.
+
+    Refresh the report rollups first: orders that haven't been rolled up yet are
+    left in Orders.
+    """
+    cursor = connection.cursor()
+    cutoff = datetime.now() - timedelta(days=days)
+    try:
+        cursor.execute("INSERT IGNORE INTO ArchiveState (name) VALUES ('orders')")
+        cursor.execute("SELECT last_order_id FROM ArchiveState WHERE name = 'orders'")
+        after_id = cursor.fetchone()[0]
+        connection.commit()
+        if after_id and verbose:
+            print(f"  Resuming after order #{after_id}")
+
+        archived = 0
+        batches = 0
+        start = time.monotonic()
+        while max_batches is None or batches < max_batches:
+            try:
+                order_ids, last_id = _archive_batch(cursor, after_id, cutoff, batch_size)
+                connection.commit()
+            except Error:
+                connection.rollback()
+                raise
+            if last_id is None:
+                break
+
+            after_id = last_id
+            archived += len(order_ids)
+            batches += 1
+            elapsed = time.monotonic() - start
+            if verbose:
+                print(f"  {archived} orders archived ({archived / elapsed:.0f}/s)" if elapsed
+                      else f"  {archived} orders archived")
+            if pause:
+                time.sleep(pause)
+
+        elapsed = time.monotonic() - start
+        finished = max_batches is None or batches < max_batches
+        # A finished run starts the next one from the beginning; a stopped one resumes
+        cursor.execute("""
+            UPDATE ArchiveState
+            SET last_order_id = %s, last_run_orders = %s, last_run_seconds = %s, last_run_at = NOW()
+            WHERE name = 'orders'
+        """, (0 if finished else after_id, archived, round(elapsed, 2)))
+        connection.commit()
+        return {
+            'archived': archived,
+            'batches': batches,
+            'seconds': round(elapsed, 2),
+            'orders_per_second': round(archived / elapsed, 1) if elapsed else None,
+            'finished': finished,
+            'cutoff': cutoff.isoformat(timespec='seconds'),
+        }
+    finally:
+        cursor.close()
+
+
+def archive_status(cursor):
+    """Live and archived order counts plus the last run's figures"""
+    cursor.execute("""
+        SELECT (SELECT COUNT(*) FROM Orders), (SELECT COUNT(*) FROM OrdersArchive),
+               s.last_order_id, s.archived_total, s.last_run_orders, s.last_run_seconds, s.last_run_at
+        FROM (SELECT 1) one
+        LEFT JOIN ArchiveState s ON s.name = 'orders'
+    """)
+    live, archived, resume_after, total, run_orders, run_seconds, run_at = cursor.fetchone()
+    return {
+        'live_orders': live,
+        'archived_orders': archived,
+        'resume_after_order_id': resume_after or None,
+        'archived_total': total or 0,
+        'last_run_orders': run_orders or 0,
+        'last_run_seconds': float(run_seconds) if run_seconds is not None else None,
+        'last_run_at': run_at.isoformat(timespec='seconds') if run_at else None,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_initializer import connect
+    from reports import refresh_rollups
+
+    parser = argparse.ArgumentParser(description="Move old Completed orders into OrdersArchive")
+    parser.add_argument('--days', type=float, default=ARCHIVE_AFTER_DAYS,
+                        help="archive orders placed more than this many days ago")
+    parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+    parser.add_argument('--pause', type=float, default=ARCHIVE_PAUSE, help="seconds to wait between batches")
+    parser.add_argument('--max-batches', type=int, help="stop after this many batches (the next run resumes)")
+    parser.add_argument('--status', action='store_true', help="show table sizes and the last run, then exit")
+    args = parser.parse_args()
+
+    try:
+        connection = connect()
+        if args.status:
+            cursor = connection.cursor()
+            for key, value in archive_status(cursor).items():
+                print(f"{key:<24}{value}")
+            cursor.close()
+        else:
+            refresh_rollups(connection)
+            summary = archive_orders(connection, args.days, args.batch_size, args.pause, args.max_batches)
+            rate = f", {summary['orders_per_second']}/s" if summary['orders_per_second'] else ""
+            state = "" if summary['finished'] else "; stopped early, run again to continue"
+            print(f"✓ Archived {summary['archived']} orders placed before {summary['cutoff']} "
+                  f"in {summary['batches']} batches ({summary['seconds']}s{rate}){state}")
+        connection.close()
+    except Error as e:
+        print(f"✗ Archiving failed: {e}")
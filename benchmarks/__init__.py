@@ -0,0 +1,6 @@
+"""Benchmark tools: data seeder, load driver and latency reports.
+
+    python -m benchmarks.seed --customers 2000 --orders 100000
+    python -m benchmarks.load --duration 30 --concurrency 8 --save baseline.json
+    python -m benchmarks.report compare baseline.json candidate.json
+"""
@@ -0,0 +1,103 @@
+"""Time-to-first-response of a freshly started app process.
+
+Each run starts `flask run` in a new process (as a serverless cold start
+would), polls until the server answers, and records:
+
+- first response: any HTTP response from the path (the server is up)
+- first 200: the path answered successfully (schema checked, data served)
+
+Runs are repeated for each SCHEMA_CHECK mode, so 'background' can be compared
+with 'blocking' (the first request waits for the check, as before).
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.report import describe
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def get_status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, ConnectionError, socket.timeout):
+        return None
+
+
+def cold_start(mode, path, timeout):
+    """Start one server process; returns (seconds to first response, seconds to first 200 or None)"""
+    port = free_port()
+    env = {**os.environ, 'SCHEMA_CHECK': mode}
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port)],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}{path}"
+    first_response = first_ok = None
+    try:
+        while time.perf_counter() - start < timeout:
+            status = get_status(url)
+            if status is not None and first_response is None:
+                first_response = time.perf_counter() - start
+            if status == 200:
+                first_ok = time.perf_counter() - start
+                break
+            time.sleep(0.01)
+    finally:
+        process.terminate()
+        process.wait()
+    return first_response, first_ok
+
+
+def run(runs=10, modes=('background', 'blocking'), path='/', timeout=30.0):
+    results = {}
+    for mode in modes:
+        firsts, oks, failures = [], [], 0
+        for _ in range(runs):
+            first_response, first_ok = cold_start(mode, path, timeout)
+            if first_response is None:
+                failures += 1
+                continue
+            firsts.append(first_response)
+            if first_ok is not None:
+                oks.append(first_ok)
+        results[mode] = {
+            'first_response': describe(firsts, sum(firsts)),
+            'first_ok': describe(oks, sum(oks)),
+            'failures': failures,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold-start time to first response")
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--path', default='/', help="path to request, e.g. / or /health")
+    parser.add_argument('--modes', nargs='+', default=['background', 'blocking'],
+                        choices=['background', 'blocking', 'off'])
+    parser.add_argument('--timeout', type=float, default=30.0, help="give up on a run after this many seconds")
+    args = parser.parse_args()
+
+    results = run(args.runs, args.modes, args.path, args.timeout)
+    print(f"{'mode':<12}{'metric':<16}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for mode, r in results.items():
+        for metric in ('first_response', 'first_ok'):
+            m = r[metric]
+            print(f"{mode:<12}{metric:<16}{m['count']:>8}{m['mean_ms']:>10}{m['p50_ms']:>10}"
+                  f"{m['p95_ms']:>10}{m['max_ms']:>10}")
+        if r['failures']:
+            print(f"✗ {mode}: {r['failures']} runs never answered")
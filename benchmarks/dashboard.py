@@ -0,0 +1,64 @@
+"""Compare serial and concurrent loading of the dashboard's reads.
+
+Runs the same dashboard_tasks() used by index() through a serial loader and a
+concurrent one, against the configured database, and prints wall-clock latency
+for each. Pass --cold to clear the reference cache before every load so the
+menu/tables queries are included too.
+"""
+import argparse
+import time
+
+from benchmarks.report import describe
+from dashboard_loader import DashboardLoader
+
+
+def time_loads(loader, connection_factory, tasks_factory, iterations, cold, cache):
+    latencies = []
+    for _ in range(iterations):
+        if cold:
+            cache.clear()
+        connection = connection_factory()
+        try:
+            start = time.perf_counter()
+            loader.load(connection, *tasks_factory())
+            latencies.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+    return latencies
+
+
+def run(iterations=200, concurrency=3, timeout=5.0, cold=False):
+    import app
+
+    get_connection = app.get_pool().get_connection
+    loaders = [
+        ('serial', DashboardLoader(get_connection, max_workers=1, timeout=timeout)),
+        (f'concurrent x{concurrency}', DashboardLoader(get_connection, max_workers=concurrency, timeout=timeout)),
+    ]
+    # Warm up the pool and caches so the first measured load is not paying for connects
+    for _, loader in loaders:
+        time_loads(loader, get_connection, app.dashboard_tasks, 5, cold, app.reference_cache)
+
+    results = {}
+    for name, loader in loaders:
+        latencies = time_loads(loader, get_connection, app.dashboard_tasks, iterations, cold, app.reference_cache)
+        results[name] = describe(latencies, sum(latencies))
+        loader.shutdown()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark serial vs concurrent dashboard loading")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--cold', action='store_true', help="clear the reference cache before every load")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.concurrency, args.timeout, args.cold)
+    print(f"{'loader':<18}{'count':>8}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<18}{r['count']:>8}{r['mean_ms']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}")
+    serial, concurrent = list(results.values())
+    if concurrent['mean_ms']:
+        print(f"✓ Concurrent loading is {serial['mean_ms'] / concurrent['mean_ms']:.2f}x the speed of serial (mean)")
@@ -0,0 +1,114 @@
+"""Compare per-query cost between storage backends.
+
+Runs the repository and dashboard queries the routes use, one at a time on a
+single connection, against each backend, and prints latency per query side by
+side. Seed every backend the same way first, e.g.:
+
+    DB_BACKEND=mysql python -m benchmarks.seed
+    DB_BACKEND=sqlite python -m benchmarks.seed
+    python -m benchmarks.engines --backends mysql sqlite
+
+The order insert is rolled back after every run, so the data is unchanged.
+"""
+import argparse
+import time
+from datetime import date, timedelta
+
+from mysql.connector import Error
+
+import repository
+import sqlite_backend
+from benchmarks.report import describe
+from dashboard_stats import read_dashboard_counters
+from db_initializer import connect
+from kitchen import fetch_queue
+from reports import sales_report
+
+
+def query_cases(cursor):
+    """(name, run(connection, cursor)) for each query, using ids from the seeded data"""
+    cursor.execute("SELECT MAX(order_id), MIN(customer_id) FROM Orders")
+    order_id, customer_id = cursor.fetchone()
+    item_id, (item_name, price) = next(iter(repository.load_menu_prices(cursor).items()))
+    price = float(price)
+    end = date.today()
+    start = end - timedelta(days=29)
+
+    def insert_order(connection, cursor):
+        repository.insert_order(cursor, customer_id, [(item_id, item_name, price, 2)], price * 2,
+                                'Cash', 'Takeaway', None, 0)
+        connection.rollback()
+
+    return [
+        ('fetch_orders', lambda _, c: repository.fetch_orders(c, 'All', 'All', None, 50)),
+        ('fetch_order', lambda _, c: repository.fetch_order(c, order_id)),
+        ('fetch_customers', lambda _, c: repository.fetch_customers(c, None, 50)),
+        ('search_name', lambda _, c: repository.search_customers(c, 'Aa', 10)),
+        ('search_phone', lambda _, c: repository.search_customers(c, '9000', 10)),
+        ('load_menu', lambda _, c: repository.load_menu(c)),
+        ('load_tables', lambda _, c: repository.load_tables(c)),
+        ('dashboard_counters', lambda _, c: read_dashboard_counters(c)),
+        ('kitchen_queue', lambda _, c: fetch_queue(c)),
+        ('sales_report', lambda _, c: sales_report(c, start, end)),
+        ('insert_order', insert_order),
+    ]
+
+
+def time_backend(backend, iterations, warmup=5):
+    """{query name: latency summary} for one backend"""
+    connection = connect(backend)
+    cursor = connection.cursor()
+    results = {}
+    try:
+        cursor.execute("SELECT COUNT(*) FROM Orders")
+        if not cursor.fetchone()[0]:
+            raise Error(msg=f"No orders on {backend}; seed it first with DB_BACKEND={backend} python -m benchmarks.seed")
+        for name, run_query in query_cases(cursor):
+            for _ in range(warmup):
+                run_query(connection, cursor)
+            latencies = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                run_query(connection, cursor)
+                latencies.append(time.perf_counter() - start)
+            results[name] = describe(latencies, sum(latencies))
+    finally:
+        connection.rollback()
+        cursor.close()
+        connection.close()
+    return results
+
+
+def run(backends=('mysql', 'sqlite'), iterations=500):
+    results = {}
+    for backend in backends:
+        try:
+            results[backend] = time_backend(backend, iterations)
+        except Error as e:
+            print(f"✗ Skipping {backend}: {e}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-query latency between storage backends")
+    parser.add_argument('--backends', nargs='+', default=['mysql', 'sqlite'], choices=['mysql', 'sqlite'])
+    parser.add_argument('--iterations', type=int, default=500)
+    args = parser.parse_args()
+
+    results = run(args.backends, args.iterations)
+    if results:
+        backends = list(results)
+        header = f"{'query':<20}" + "".join(f"{b + ' p50':>14}{b + ' p95':>14}" for b in backends)
+        if len(backends) == 2:
+            header += f"{'p50 ratio':>12}"
+        print(header)
+        for name in results[backends[0]]:
+            line = f"{name:<20}" + "".join(f"{results[b][name]['p50_ms']:>14}{results[b][name]['p95_ms']:>14}"
+                                           for b in backends)
+            if len(backends) == 2:
+                first, second = (results[b][name]['p50_ms'] for b in backends)
+                line += f"{(first / second if second else 0):>11.2f}x"
+            print(line)
+        if 'sqlite' in results:
+            cache = sqlite_backend.statement_stats()
+            print(f"SQLite statement translations: {cache['hits']} cached, {cache['misses']} translated")
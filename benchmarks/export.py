@@ -0,0 +1,131 @@
+"""Peak memory of the streaming orders export versus building the file in memory.
+
+Each mode runs in its own process, because peak RSS (resource.getrusage) only
+ever goes up. The process reports its peak before and after the export:
+
+- streaming: GET /export/orders through the app, reading the chunked body
+- buffered: fetchall() the same query and write the whole CSV to a StringIO,
+  which is what the exports did before they streamed
+
+Seed a large Orders table first (this takes a few minutes):
+
+    python -m benchmarks.seed --customers 5000 --orders 1000000
+    python -m benchmarks.export
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ('streaming', 'buffered')
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def export_streaming(fmt):
+    """Export through the app's route; returns (rows, bytes)"""
+    from app import app
+
+    response = app.test_client().get(f'/export/orders?format={fmt}', buffered=False)
+    if response.status_code != 200 or response.mimetype == 'text/html':
+        raise RuntimeError(f"/export/orders answered {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    rows = size = 0
+    try:
+        for chunk in response.response:
+            size += len(chunk)
+            rows += chunk.count(b'\n' if isinstance(chunk, bytes) else '\n')
+    finally:
+        response.close()
+    return rows - (1 if fmt == 'csv' else 0), size
+
+
+def export_buffered(fmt):
+    """Export by reading every row first and building the whole body in memory; returns (rows, bytes)"""
+    from db_initializer import connect
+    from exports import ORDER_EXPORT_COLUMNS, _plain, order_export_query
+
+    connection = connect()
+    cursor = connection.cursor()
+    try:
+        query, params = order_export_query()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        output = io.StringIO()
+        if fmt == 'csv':
+            writer = csv.writer(output)
+            writer.writerow(ORDER_EXPORT_COLUMNS)
+            writer.writerows([[_plain(v) for v in row] for row in rows])
+        else:
+            for row in rows:
+                output.write(json.dumps(dict(zip(ORDER_EXPORT_COLUMNS, (_plain(v) for v in row)))) + "\n")
+        body = output.getvalue().encode('utf-8')
+        return len(rows), len(body)
+    finally:
+        cursor.close()
+        connection.close()
+
+
+def run_mode(mode, fmt):
+    """Run one export in this process and return its measurements"""
+    import app  # noqa: F401 - so both modes pay for the same imports before the baseline
+
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    rows, size = (export_streaming if mode == 'streaming' else export_buffered)(fmt)
+    seconds = time.perf_counter() - start
+    peak = peak_rss_mb()
+    return {
+        'mode': mode,
+        'rows': rows,
+        'mb': round(size / (1024 * 1024), 1),
+        'seconds': round(seconds, 2),
+        'rows_per_second': round(rows / seconds) if seconds else 0,
+        'baseline_rss_mb': baseline,
+        'peak_rss_mb': peak,
+        'growth_mb': round(peak - baseline, 1),
+    }
+
+
+def run(modes=MODES, fmt='csv'):
+    """Run each mode in a fresh process; returns a list of measurements"""
+    results = []
+    for mode in modes:
+        process = subprocess.run([sys.executable, '-m', 'benchmarks.export', '--mode', mode, '--format', fmt],
+                                 cwd=ROOT, capture_output=True, text=True)
+        if process.returncode != 0:
+            print(f"✗ {mode} export failed:\n{process.stderr.strip()}")
+            continue
+        results.append(json.loads(process.stdout.strip().splitlines()[-1]))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare peak RSS of streaming and buffered order exports")
+    parser.add_argument('--mode', choices=MODES, help="run a single mode in this process and print JSON")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.format)))
+        sys.exit(0)
+
+    results = run(fmt=args.format)
+    print(f"{'mode':<12}{'rows':>10}{'MB out':>9}{'seconds':>9}{'rows/s':>10}"
+          f"{'base RSS':>10}{'peak RSS':>10}{'growth':>9}")
+    for r in results:
+        print(f"{r['mode']:<12}{r['rows']:>10}{r['mb']:>9}{r['seconds']:>9}{r['rows_per_second']:>10}"
+              f"{r['baseline_rss_mb']:>10}{r['peak_rss_mb']:>10}{r['growth_mb']:>9}")
+    if len(results) == 2 and results[0]['growth_mb'] > 0:
+        print(f"✓ Buffered export grew RSS {results[1]['growth_mb'] / results[0]['growth_mb']:.1f}x "
+              f"as much as streaming ({results[0]['growth_mb']} MB vs {results[1]['growth_mb']} MB)")
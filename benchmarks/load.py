@@ -0,0 +1,218 @@
+"""Concurrent load driver replaying a lunch-rush request mix.
+
+By default requests go through the Flask test client in-process; pass --url to
+drive a running server over HTTP instead.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import namedtuple
+
+from benchmarks.report import summarize, print_summary, save_results
+from benchmarks.seed import seed_phone
+
+# (name, weight) - roughly what the floor does during a rush
+LUNCH_RUSH_MIX = [
+    ('index', 45),
+    ('api_orders', 15),
+    ('add_order', 20),
+    ('update_status', 15),
+    ('delete_order', 5),
+]
+
+# HTML routes answer errors with a 200 error page, and /delete redirects either way
+ERROR_PAGE_TITLE = b'<title>Error'
+
+# status, parsed JSON body (or None), Location header and whether the body is the error page
+Reply = namedtuple('Reply', 'status json location error_page')
+
+
+class TestClientTarget:
+    """Sends requests through app.test_client() (one client per thread)"""
+
+    def __init__(self):
+        from app import app
+        self.app = app
+        self._local = threading.local()
+
+    def _client(self):
+        if not hasattr(self._local, 'client'):
+            self._local.client = self.app.test_client()
+        return self._local.client
+
+    @staticmethod
+    def _reply(response):
+        return Reply(response.status_code, response.get_json(silent=True),
+                     response.headers.get('Location'), ERROR_PAGE_TITLE in response.get_data())
+
+    def get(self, path):
+        return self._reply(self._client().get(path))
+
+    def post_json(self, path, payload):
+        return self._reply(self._client().post(path, json=payload))
+
+
+class HttpTarget:
+    """Sends requests to a running server, without following redirects"""
+
+    class _NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(self._NoRedirect)
+
+    def _open(self, request):
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                body, status, headers = response.read(), response.status, response.headers
+        except urllib.error.HTTPError as e:
+            # Redirects land here too, since they are not followed
+            body, status, headers = e.read(), e.code, e.headers
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        return Reply(status, data, headers.get('Location'), ERROR_PAGE_TITLE in body)
+
+    def get(self, path):
+        return self._open(urllib.request.Request(self.base_url + path))
+
+    def post_json(self, path, payload):
+        return self._open(urllib.request.Request(self.base_url + path, data=json.dumps(payload).encode(),
+                                                 headers={'Content-Type': 'application/json'}, method='POST'))
+
+
+def succeeded(name, reply):
+    """Whether a reply is what a working server answers for this kind of request"""
+    if name == 'add_order':
+        return reply.status == 201
+    if name == 'delete_order':
+        # Both success and failure flash a message; only success goes back to the dashboard
+        return reply.status == 302 and urllib.parse.urlsplit(reply.location or '').path == '/'
+    return reply.status == 200 and not reply.error_page
+
+
+class LoadDriver:
+    def __init__(self, target, customers=1000, mix=LUNCH_RUSH_MIX, seed=None):
+        self.target = target
+        self.customers = customers
+        self.mix = mix
+        self.rng = random.Random(seed)
+        self.samples = []
+        self.errors = {}
+        self._lock = threading.Lock()
+        self.menu_ids = []
+        self.order_ids = []
+
+    def prepare(self):
+        reply = self.target.get('/api/menu')
+        if reply.status != 200 or not reply.json:
+            raise RuntimeError(f"Could not load the menu (HTTP {reply.status}); is the database seeded?")
+        self.menu_ids = [m['item_id'] for m in reply.json]
+        reply = self.target.get('/api/orders?page_size=200')
+        self.order_ids = [o['order_id'] for o in (reply.json or {}).get('orders', [])]
+
+    def _pick_order(self, rng):
+        with self._lock:
+            return rng.choice(self.order_ids) if self.order_ids else None
+
+    def _request(self, name, rng):
+        if name == 'index':
+            return self.target.get('/')
+        if name == 'api_orders':
+            return self.target.get('/api/orders?status=' + rng.choice(['All', 'Pending', 'Preparing']))
+        if name == 'add_order':
+            items = rng.sample(self.menu_ids, k=min(len(self.menu_ids), rng.randint(1, 4)))
+            reply = self.target.post_json('/api/orders', {
+                'name': 'Load Test',
+                'phone': seed_phone(rng.randrange(self.customers)),
+                'payment_method': rng.choice(['Cash', 'Card', 'UPI']),
+                'order_type': rng.choice(['Takeaway', 'Delivery', 'Dine-in']),
+                'discount': 0,
+                'items': [{'item_id': i, 'qty': rng.choice([1, 1, 2, 3])} for i in items],
+            })
+            if reply.status == 201:
+                with self._lock:
+                    self.order_ids.append(reply.json['order']['order_id'])
+            return reply
+        if name == 'update_status':
+            order_id = self._pick_order(rng)
+            if order_id is None:
+                return self.target.get('/')
+            status = rng.choice(['Pending', 'Preparing', 'Completed'])
+            return self.target.post_json(f'/api/orders/{order_id}/status', {'status': status})
+        if name == 'delete_order':
+            order_id = self._pick_order(rng)
+            if order_id is None:
+                return self.target.get('/')
+            with self._lock:
+                if order_id in self.order_ids:
+                    self.order_ids.remove(order_id)
+            return self.target.get(f'/delete/{order_id}')
+        raise ValueError(name)
+
+    def _worker(self, deadline, remaining, worker_seed):
+        rng = random.Random(worker_seed)
+        names = [n for n, _ in self.mix]
+        weights = [w for _, w in self.mix]
+        while time.monotonic() < deadline:
+            with self._lock:
+                if remaining[0] is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+            name = rng.choices(names, weights=weights)[0]
+            start = time.perf_counter()
+            try:
+                ok = succeeded(name, self._request(name, rng))
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.samples.append((name, elapsed))
+                if not ok:
+                    self.errors[name] = self.errors.get(name, 0) + 1
+
+    def run(self, duration=30.0, concurrency=8, requests=None):
+        self.prepare()
+        deadline = time.monotonic() + duration
+        remaining = [requests]
+        threads = [threading.Thread(target=self._worker, args=(deadline, remaining, self.rng.random()))
+                   for _ in range(concurrency)]
+        start = time.monotonic()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.monotonic() - start
+        return summarize(self.samples, wall, self.errors, {
+            'concurrency': concurrency,
+            'target': getattr(self.target, 'base_url', 'test_client'),
+        })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a lunch-rush request mix")
+    parser.add_argument('--url', help="base URL of a running server (default: in-process test client)")
+    parser.add_argument('--duration', type=float, default=30.0, help="seconds to run")
+    parser.add_argument('--requests', type=int, help="stop after this many requests")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--customers', type=int, default=1000, help="number of seeded customers to order as")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--save', help="write results to this JSON file")
+    args = parser.parse_args()
+
+    target = HttpTarget(args.url) if args.url else TestClientTarget()
+    driver = LoadDriver(target, customers=args.customers, seed=args.seed)
+    results = driver.run(args.duration, args.concurrency, args.requests)
+    print_summary(results)
+    if args.save:
+        save_results(results, args.save)
+        print(f"✓ Results saved to {args.save}")
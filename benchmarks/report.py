@@ -0,0 +1,95 @@
+"""Latency summaries: percentiles, throughput, and comparison between saved runs."""
+import argparse
+import json
+import platform
+from datetime import datetime
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def describe(latencies, wall):
+    values = sorted(latencies)
+    return {
+        'count': len(values),
+        'rps': round(len(values) / wall, 2) if wall else 0.0,
+        'mean_ms': round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 3),
+        'p95_ms': round(percentile(values, 95) * 1000, 3),
+        'p99_ms': round(percentile(values, 99) * 1000, 3),
+        'max_ms': round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def summarize(samples, wall, errors=None, meta=None):
+    """Build a result dict from (name, seconds) samples collected over `wall` seconds"""
+    by_name = {}
+    for name, elapsed in samples:
+        by_name.setdefault(name, []).append(elapsed)
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'wall_seconds': round(wall, 3),
+            **(meta or {}),
+        },
+        'overall': describe([elapsed for _, elapsed in samples], wall),
+        'routes': {name: describe(values, wall) for name, values in sorted(by_name.items())},
+        'errors': errors or {},
+    }
+
+
+def print_summary(results):
+    print(f"{'route':<16}{'count':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    rows = list(results['routes'].items()) + [('TOTAL', results['overall'])]
+    for name, r in rows:
+        print(f"{name:<16}{r['count']:>8}{r['rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}"
+              f"{r['p99_ms']:>10}{r['max_ms']:>10}")
+    if results.get('errors'):
+        print("errors: " + ", ".join(f"{k}={v}" for k, v in results['errors'].items()))
+
+
+def save_results(results, path):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, candidate):
+    """Print per-route p50/p95/p99 and rps changes from baseline to candidate"""
+    def change(old, new):
+        return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+    print(f"{'route':<16}{'metric':<8}{'baseline':>12}{'candidate':>12}{'change':>10}")
+    names = sorted(set(baseline['routes']) | set(candidate['routes']))
+    for name, old, new in [(n, baseline['routes'].get(n), candidate['routes'].get(n)) for n in names] + \
+            [('TOTAL', baseline['overall'], candidate['overall'])]:
+        if not old or not new:
+            continue
+        for metric in ('rps', 'p50_ms', 'p95_ms', 'p99_ms'):
+            print(f"{name:<16}{metric:<8}{old[metric]:>12}{new[metric]:>12}{change(old[metric], new[metric]):>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or compare saved benchmark results")
+    sub = parser.add_subparsers(dest='command', required=True)
+    show = sub.add_parser('show')
+    show.add_argument('results')
+    cmp_parser = sub.add_parser('compare')
+    cmp_parser.add_argument('baseline')
+    cmp_parser.add_argument('candidate')
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        print_summary(load_results(args.results))
+    else:
+        compare(load_results(args.baseline), load_results(args.candidate))
@@ -0,0 +1,145 @@
+"""Seed the database with synthetic customers and orders for benchmarking."""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from mysql.connector import Error
+
+from db_initializer import connect, initialize_database
+from dashboard_stats import reconcile_stats
+from data_versions import bump_version
+from reports import rebuild_rollups
+
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Diya', 'Ananya', 'Ishaan', 'Kavya', 'Rohan',
+               'Saanvi', 'Arjun', 'Meera', 'Kabir', 'Priya', 'Neha', 'Rahul', 'Sneha']
+LAST_NAMES = ['Sharma', 'Patel', 'Iyer', 'Reddy', 'Gupta', 'Singh', 'Nair', 'Das', 'Mehta', 'Joshi']
+
+PAYMENT_METHODS = ['Cash', 'Card', 'UPI']
+ORDER_TYPES = [('Dine-in', 0.5), ('Takeaway', 0.3), ('Delivery', 0.2)]
+STATUSES = [('Completed', 0.85), ('Preparing', 0.05), ('Pending', 0.10)]
+
+
+def seed_phone(index):
+    """Deterministic phone number for the index-th seeded customer"""
+    return f"9{index:09d}"
+
+
+def weighted(choices, rng):
+    return rng.choices([c for c, _ in choices], weights=[w for _, w in choices])[0]
+
+
+def random_order_time(rng, days):
+    """A timestamp in the last `days` days, weighted towards lunch and dinner (never in the future)"""
+    now = datetime.now()
+    day = now.replace(minute=0, second=0, microsecond=0) - timedelta(days=rng.randrange(days))
+    hour = rng.choice([12, 13, 13, 14, 19, 20, 20, 21, 11, 15, 18, 22])
+    # Today's lunch or dinner may not have happened yet
+    return min(day.replace(hour=hour) + timedelta(minutes=rng.randrange(60), seconds=rng.randrange(60)), now)
+
+
+def seed_customers(connection, count, batch_size, rng):
+    cursor = connection.cursor()
+    for offset in range(0, count, batch_size):
+        rows = []
+        for i in range(offset, min(offset + batch_size, count)):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            rows.append((name, seed_phone(i), f"customer{i}@example.com", None))
+        cursor.executemany(
+            "INSERT IGNORE INTO Customers (name, phone, email, address) VALUES (%s, %s, %s, %s)", rows
+        )
+        connection.commit()
+    # Running dashboards have the old customer list cached
+    bump_version(cursor, 'customers')
+    connection.commit()
+    cursor.execute("SELECT customer_id FROM Customers WHERE phone LIKE '9%' ORDER BY customer_id")
+    customer_ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return customer_ids
+
+
+def seed_orders(connection, count, customer_ids, days, batch_size, rng):
+    cursor = connection.cursor()
+    cursor.execute("SELECT item_id, item_name, price FROM Menu")
+    menu = cursor.fetchall()
+    cursor.execute("SELECT table_number FROM Tables")
+    tables = [row[0] for row in cursor.fetchall()]
+
+    for offset in range(0, count, batch_size):
+        orders = []
+        lines_per_order = []
+        for _ in range(min(batch_size, count - offset)):
+            picked = rng.sample(menu, k=min(len(menu), rng.randint(1, 5)))
+            lines = [(item_id, name, float(price), rng.choice([1, 1, 1, 2, 2, 3, 6]))
+                     for item_id, name, price in picked]
+            total = sum(price * qty for _, _, price, qty in lines)
+            discount = rng.choice([0, 0, 0, 0, 5, 10])
+            order_type = weighted(ORDER_TYPES, rng)
+            orders.append((
+                rng.choice(customer_ids),
+                json.dumps([{"item_id": i, "qty": q, "unit_price": p} for i, _, p, q in lines]),
+                round(total - total * discount / 100, 2),
+                discount,
+                rng.choice(PAYMENT_METHODS),
+                weighted(STATUSES, rng),
+                order_type,
+                rng.choice(tables) if order_type == 'Dine-in' and tables else None,
+                random_order_time(rng, days),
+            ))
+            lines_per_order.append(lines)
+
+        cursor.executemany("""
+            INSERT INTO Orders (customer_id, items, total_amount, discount, payment_method,
+                                order_status, order_type, table_number, order_date)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, orders)
+        # A multi-row INSERT gets consecutive ids starting at lastrowid
+        first_id = cursor.lastrowid
+        item_rows = [(first_id + n, item_id, name, price, qty)
+                     for n, lines in enumerate(lines_per_order)
+                     for item_id, name, price, qty in lines]
+        cursor.executemany(
+            "INSERT INTO OrderItems (order_id, item_id, item_name, unit_price, quantity) VALUES (%s, %s, %s, %s, %s)",
+            item_rows
+        )
+        connection.commit()
+        print(f"  {offset + len(orders)}/{count} orders")
+    cursor.close()
+
+
+def seed_database(customers=1000, orders=10000, days=90, batch_size=1000, seed=42):
+    """Initialize the schema, then add synthetic customers and orders"""
+    if not initialize_database():
+        return False
+
+    rng = random.Random(seed)
+    start = time.monotonic()
+    try:
+        connection = connect()
+        customer_ids = seed_customers(connection, customers, batch_size, rng)
+        seed_orders(connection, orders, customer_ids, days, batch_size, rng)
+
+        cursor = connection.cursor()
+        reconcile_stats(cursor)
+        connection.commit()
+        cursor.close()
+        rebuild_rollups(connection)
+        connection.close()
+    except Error as e:
+        print(f"✗ Seeding failed: {e}")
+        return False
+
+    print(f"✓ Seeded {customers} customers and {orders} orders in {time.monotonic() - start:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed synthetic benchmark data")
+    parser.add_argument('--customers', type=int, default=1000)
+    parser.add_argument('--orders', type=int, default=10000)
+    parser.add_argument('--days', type=int, default=90, help="spread orders over this many past days")
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    seed_database(args.customers, args.orders, args.days, args.batch_size, args.seed)
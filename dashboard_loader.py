@@ -0,0 +1,136 @@
+"""Run the dashboard's independent reads concurrently on separate pooled connections.
+
+Each concurrent task borrows its own connection, so the page waits for the
+slowest query instead of the sum of all of them. Tasks that are usually served
+from memory (cached menu / tables) run inline on the request's own connection
+while the others are in flight.
+
+A load needs up to 1 + max_workers connections at once, so size the pool for
+it: DB_POOL_SIZE + DB_POOL_MAX_OVERFLOW >= request threads * (1 + max_workers).
+When the pool cannot hand out the workers' connections right away the tasks
+run serially on the request's connection instead of queueing for the pool.
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+from mysql.connector import Error
+
+from db_pool import PoolTimeoutError
+
+
+class DashboardTimeoutError(Error):
+    """Raised when a dashboard query does not finish within the per-query timeout"""
+
+
+class DashboardLoader:
+    """Thread pool shared by all requests; max_workers caps concurrent dashboard queries.
+
+    get_connection(timeout) borrows a pooled connection; available(), if given,
+    returns how many the pool can hand out without waiting.
+    """
+
+    def __init__(self, get_connection, max_workers=4, timeout=5.0, available=None):
+        self.get_connection = get_connection
+        self.available = available
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._loads = 0
+        self._timeouts = 0
+        self._serial_fallbacks = 0
+
+    @property
+    def concurrent(self):
+        return self.max_workers > 1
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='dashboard')
+            return self._executor
+
+    def _run_task(self, task, deadline):
+        # Waiting on the pool past the page's own timeout would only start a query nobody reads
+        connection = self.get_connection(timeout=max(deadline - time.monotonic(), 0))
+        cursor = connection.cursor()
+        try:
+            return task(cursor)
+        finally:
+            cursor.close()
+            connection.close()
+
+    def load(self, connection, tasks, inline_tasks=None):
+        """Run tasks ({name: fn(cursor)}) and return {name: result}.
+
+        With concurrency disabled everything runs serially on `connection`.
+        """
+        inline_tasks = dict(inline_tasks or {})
+        if not self.concurrent:
+            inline_tasks.update(tasks)
+            tasks = {}
+        elif tasks and self.available is not None and self.available() < len(tasks):
+            with self._lock:
+                self._serial_fallbacks += 1
+            inline_tasks.update(tasks)
+            tasks = {}
+
+        executor = self._get_executor() if tasks else None
+        started = time.monotonic()
+        deadline = started + self.timeout
+        # copy_context() carries the request's query profile into the worker thread
+        futures = {name: executor.submit(contextvars.copy_context().run, self._run_task, task, deadline)
+                   for name, task in tasks.items()}
+        results = {}
+        try:
+            cursor = connection.cursor()
+            try:
+                for name, task in inline_tasks.items():
+                    results[name] = task(cursor)
+            finally:
+                cursor.close()
+
+            for name, future in futures.items():
+                remaining = deadline - time.monotonic()
+                try:
+                    results[name] = future.result(timeout=max(remaining, 0))
+                except PoolTimeoutError:
+                    # The pool filled up after the check above; run it here rather than fail the page
+                    with self._lock:
+                        self._serial_fallbacks += 1
+                    cursor = connection.cursor()
+                    try:
+                        results[name] = tasks[name](cursor)
+                    finally:
+                        cursor.close()
+                except FutureTimeoutError:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise DashboardTimeoutError(f"Dashboard query '{name}' timed out after {self.timeout}s")
+        finally:
+            # Queued tasks that have not started yet are dropped; running ones return their connection when done
+            for future in futures.values():
+                future.cancel()
+
+        with self._lock:
+            self._loads += 1
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'timeout': self.timeout,
+                'loads': self._loads,
+                'timeouts': self._timeouts,
+                'serial_fallbacks': self._serial_fallbacks,
+            }
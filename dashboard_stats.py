@@ -0,0 +1,111 @@
+"""Materialized dashboard counters, updated in the same transaction as each order write.
+
+Run `python dashboard_stats.py` periodically to rebuild them from Orders and OrdersArchive.
+"""
+from mysql.connector import Error
+
+from archive import ORDERS_WITH_ARCHIVE
+
+ORDER_STATUSES = ('Pending', 'Preparing', 'Completed')
+
+
+def create_stats_tables(cursor):
+    """Create the summary tables if they don't exist"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS DailyStats (
+            stat_date DATE PRIMARY KEY,
+            order_count INT NOT NULL DEFAULT 0,
+            total_sales DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS OrderStatusCounts (
+            order_status VARCHAR(20) PRIMARY KEY,
+            order_count INT NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def _add_daily(cursor, stat_date_sql, params, count_delta, sales_delta):
+    cursor.execute(f"""
+        INSERT INTO DailyStats (stat_date, order_count, total_sales)
+        VALUES ({stat_date_sql}, %s, %s)
+        ON DUPLICATE KEY UPDATE order_count = order_count + VALUES(order_count),
+                                total_sales = total_sales + VALUES(total_sales)
+    """, (*params, count_delta, sales_delta))
+
+
+def _add_status(cursor, status, delta):
+    cursor.execute("""
+        INSERT INTO OrderStatusCounts (order_status, order_count) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE order_count = order_count + VALUES(order_count)
+    """, (status, delta))
+
+
+def record_order_created(cursor, total_amount, status='Pending'):
+    """Count a new order placed today (call before the order's commit)"""
+    _add_daily(cursor, "CURDATE()", (), 1, total_amount)
+    _add_status(cursor, status, 1)
+
+
+def record_status_change(cursor, old_status, new_status):
+    """Move an order between status counters"""
+    if old_status == new_status:
+        return
+    _add_status(cursor, old_status, -1)
+    _add_status(cursor, new_status, 1)
+
+
+def record_order_deleted(cursor, order_date, total_amount, status):
+    """Remove a deleted order from the counters"""
+    if order_date:
+        _add_daily(cursor, "DATE(%s)", (order_date,), -1, -total_amount)
+    _add_status(cursor, status, -1)
+
+
+def read_dashboard_counters(cursor):
+    """Return (pending_orders, today_sales) with two primary-key lookups"""
+    cursor.execute("""
+        SELECT
+            (SELECT order_count FROM OrderStatusCounts WHERE order_status = 'Pending'),
+            (SELECT total_sales FROM DailyStats WHERE stat_date = CURDATE())
+    """)
+    pending_orders, today_sales = cursor.fetchone()
+    return pending_orders or 0, today_sales or 0
+
+
+def reconcile_stats(cursor):
+    """Rebuild the summary tables from Orders and OrdersArchive (caller commits)"""
+    cursor.execute("DELETE FROM DailyStats")
+    cursor.execute(f"""
+        INSERT INTO DailyStats (stat_date, order_count, total_sales)
+        SELECT DATE(order_date), COUNT(*), COALESCE(SUM(total_amount), 0)
+        FROM {ORDERS_WITH_ARCHIVE} o
+        GROUP BY DATE(order_date)
+    """)
+    cursor.execute("DELETE FROM OrderStatusCounts")
+    cursor.executemany(
+        "INSERT INTO OrderStatusCounts (order_status, order_count) VALUES (%s, 0)",
+        [(status,) for status in ORDER_STATUSES]
+    )
+    cursor.execute(f"""
+        INSERT INTO OrderStatusCounts (order_status, order_count)
+        SELECT order_status, COUNT(*) FROM {ORDERS_WITH_ARCHIVE} o GROUP BY order_status
+        ON DUPLICATE KEY UPDATE order_count = VALUES(order_count)
+    """)
+
+
+if __name__ == "__main__":
+    from db_initializer import connect
+
+    try:
+        connection = connect()
+        cursor = connection.cursor()
+        reconcile_stats(cursor)
+        connection.commit()
+        cursor.close()
+        connection.close()
+        print("✓ Dashboard stats reconciled")
+    except Error as e:
+        print(f"✗ Stats reconciliation failed: {e}")
@@ -0,0 +1,31 @@
+"""Version counters for the data that each worker process caches.
+
+Every write to the menu, the tables or the customers bumps that data's row in DataVersions,
+in the same transaction as the write. A worker reads all the counters with
+one small query per request and reloads a cached value only when its counter
+has moved. A change made through one worker therefore shows up in every
+other worker on its next request, not after the cache TTL.
+"""
+
+
+def create_versions_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS DataVersions (
+            name VARCHAR(20) PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def bump_version(cursor, name):
+    """Count a change to the named data (call before the change's commit)"""
+    cursor.execute("""
+        INSERT INTO DataVersions (name, version) VALUES (%s, 1)
+        ON DUPLICATE KEY UPDATE version = version + 1
+    """, (name,))
+
+
+def read_versions(cursor):
+    """Map of name -> version for every counted data set"""
+    cursor.execute("SELECT name, version FROM DataVersions")
+    return dict(cursor.fetchall())
@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolTimeoutError(Error):
+    """Raised when no connection could be borrowed within the checkout timeout"""
+
+
+class PooledConnection:
+    """Wraps a database connection so that close() hands it back to the pool"""
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = time.monotonic()
+        self._checked_out = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def cursor(self, *args, **kwargs):
+        cursor = self._raw.cursor(*args, **kwargs)
+        if self._pool.cursor_wrapper:
+            cursor = self._pool.cursor_wrapper(cursor)
+        return cursor
+
+    def close(self):
+        if self._checked_out:
+            self._checked_out = False
+            self._pool._release(self)
+
+    def discard(self):
+        """Give the connection's slot back but close it instead of reusing it.
+
+        For a connection abandoned in the middle of an unbuffered result:
+        close() would roll back, and mysql-connector reads the rest of the
+        result before it can.
+        """
+        if self._checked_out:
+            self._checked_out = False
+            self._pool._discard(self)
+
+    def _dispose(self, abort=False):
+        try:
+            if abort and hasattr(self._raw, 'shutdown'):
+                # Drops the socket without reading what the server is still sending
+                self._raw.shutdown()
+            else:
+                self._raw.close()
+        except Error:
+            pass
+
+
+class ConnectionPool:
+    """Thread-safe connection pool with overflow, timeout, pre-ping and recycling.
+
+    Connections are opened with connect(**config): mysql.connector.connect by
+    default, or sqlite_backend.connect for the embedded engine.
+    """
+
+    def __init__(self, config, size=5, max_overflow=10, timeout=30.0, pre_ping=True, recycle=3600,
+                 cursor_wrapper=None, connect=None):
+        self.config = dict(config)
+        self.connect = connect or mysql.connector.connect
+        self.cursor_wrapper = cursor_wrapper
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.pre_ping = pre_ping
+        self.recycle = recycle
+
+        self._idle = deque()
+        self._cond = threading.Condition()
+        self._total = 0
+        self._in_use = 0
+
+        self._created = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_time = 0.0
+        self._max_wait = 0.0
+
+    def _connect(self):
+        raw = self.connect(**self.config)
+        with self._cond:
+            self._created += 1
+        return PooledConnection(self, raw)
+
+    def _is_stale(self, conn):
+        if self.recycle and time.monotonic() - conn.created_at > self.recycle:
+            return True
+        if self.pre_ping:
+            try:
+                conn._raw.ping(reconnect=False)
+            except Error:
+                return True
+        return False
+
+    def get_connection(self, timeout=None):
+        """Borrow a connection, waiting up to `timeout` seconds (default: the pool's) if the pool is exhausted"""
+        if timeout is None:
+            timeout = self.timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._total < self.size + self.max_overflow:
+                    self._total += 1
+                    conn = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Connection pool exhausted: {self._in_use} connections in use, "
+                        f"timed out after {timeout}s"
+                    )
+                self._cond.wait(remaining)
+            self._in_use += 1
+
+        try:
+            if conn is not None and self._is_stale(conn):
+                conn._dispose()
+                conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._checkouts += 1
+            self._wait_time += waited
+            self._max_wait = max(self._max_wait, waited)
+
+        conn._checked_out = True
+        return conn
+
+    def _release(self, conn):
+        # End any open transaction so the next borrower doesn't see a stale snapshot
+        try:
+            conn._raw.rollback()
+            healthy = True
+        except Error:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            if healthy and self._total <= self.size:
+                self._idle.append(conn)
+                conn = None
+            else:
+                self._total -= 1
+            self._cond.notify()
+
+        if conn is not None:
+            conn._dispose()
+
+    def _discard(self, conn):
+        with self._cond:
+            self._in_use -= 1
+            self._total -= 1
+            self._discarded += 1
+            self._cond.notify()
+        conn._dispose(abort=True)
+
+    def available(self):
+        """Connections that can be borrowed right now without waiting"""
+        with self._cond:
+            return len(self._idle) + self.size + self.max_overflow - self._total
+
+    def dispose(self):
+        """Close every idle connection"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._total -= len(idle)
+        for conn in idle:
+            conn._dispose()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'total': self._total,
+                'connections_created': self._created,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'discarded': self._discarded,
+                'wait_time_total': round(self._wait_time, 6),
+                'wait_time_avg': round(self._wait_time / self._checkouts, 6) if self._checkouts else 0.0,
+                'wait_time_max': round(self._max_wait, 6),
+            }
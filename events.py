@@ -0,0 +1,122 @@
+import json
+import queue
+import threading
+import time
+from collections import deque
+
+
+class EventBroker:
+    """In-process fan-out of order/table events to Server-Sent Events subscribers.
+
+    Events are published once per committed write, so the database cost does
+    not depend on how many screens are connected. Recent events are kept in a
+    ring buffer so a reconnecting client can resume from its Last-Event-ID.
+    Ids start at the process start time in milliseconds, so an id from before
+    a restart falls outside the buffer and the client is told to reload.
+    """
+
+    def __init__(self, history_size=500, subscriber_queue_size=100):
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+        self._queue_size = subscriber_queue_size
+        self._last_id = int(time.time() * 1000)
+        self._published = 0
+        self._dropped = 0
+
+    def publish(self, event_type, data):
+        with self._lock:
+            self._last_id += 1
+            event = (self._last_id, event_type, data)
+            self._history.append(event)
+            self._published += 1
+            subscribers = list(self._subscribers)
+
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # Slow consumer: disconnect it, the client resumes via Last-Event-ID
+                self._drop(q)
+        return event[0]
+
+    def _drop(self, q):
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.discard(q)
+                self._dropped += 1
+        # Discard what it hasn't read so the stop marker fits; the client's
+        # Last-Event-ID is older than all of it, so the resume replays it
+        with q.mutex:
+            q.queue.clear()
+        try:
+            q.put_nowait(None)
+        except queue.Full:
+            pass
+
+    def subscribe(self, last_event_id=None):
+        """Register a subscriber; returns (queue, backlog).
+
+        backlog is the list of missed events after last_event_id, or None if
+        they are no longer in the buffer (or the id is from before a restart)
+        and the client must reload.
+        """
+        q = queue.Queue(maxsize=self._queue_size)
+        with self._lock:
+            self._subscribers.add(q)
+            backlog = []
+            if last_event_id is not None and last_event_id > self._last_id:
+                # From a previous process that issued ids faster than the clock: unknown here
+                backlog = None
+            elif last_event_id is not None and last_event_id < self._last_id:
+                oldest = self._history[0][0] if self._history else self._last_id + 1
+                if last_event_id + 1 < oldest:
+                    backlog = None
+                else:
+                    backlog = [e for e in self._history if e[0] > last_event_id]
+        return q, backlog
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def stream(self, last_event_id=None, heartbeat=15.0):
+        """Generator of SSE-formatted messages for one subscriber"""
+        q, backlog = self.subscribe(last_event_id)
+        try:
+            yield "retry: 3000\n\n"
+            if backlog is None:
+                yield format_sse(None, 'reset', {})
+            else:
+                for event in backlog:
+                    yield format_sse(*event)
+            while True:
+                try:
+                    event = q.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield format_sse(*event)
+        finally:
+            self.unsubscribe(q)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'published': self._published,
+                'dropped_subscribers': self._dropped,
+                'last_event_id': self._last_id,
+                'buffered': len(self._history),
+            }
+
+
+def format_sse(event_id, event_type, data):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
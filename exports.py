@@ -0,0 +1,175 @@
+"""Streaming CSV / NDJSON export of orders and customers.
+
+Rows are read with an unbuffered (server-side) cursor in fixed-size batches and
+written out chunk by chunk, so memory use stays flat however many rows match.
+
+Usage: python exports.py orders --start 2026-10-01 --end 2026-10-31 --status Completed -o orders.csv
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from mysql.connector import Error
+
+from archive import orders_with_archive
+
+FETCH_SIZE = 1000
+FORMATS = ('csv', 'ndjson')
+
+ORDER_EXPORT_COLUMNS = ['order_id', 'order_date', 'customer_id', 'customer_name', 'customer_phone',
+                        'order_type', 'table_number', 'payment_method', 'order_status',
+                        'discount', 'total_amount', 'items']
+CUSTOMER_EXPORT_COLUMNS = ['customer_id', 'name', 'phone', 'email', 'address', 'joined_on']
+
+
+def _items_summary(order_items):
+    return f"""
+        (SELECT GROUP_CONCAT(CONCAT(oi.item_name, ' x', oi.quantity) ORDER BY oi.order_item_id SEPARATOR '; ')
+         FROM {order_items} oi WHERE oi.order_id = o.order_id)
+    """
+
+
+def order_export_query(start=None, end=None, status=None, include_archive=False):
+    where = "1=1"
+    params = []
+    if start:
+        where += " AND o.order_date >= %s"
+        params.append(start)
+    if end:
+        where += " AND o.order_date < %s + INTERVAL 1 DAY"
+        params.append(end)
+    if status and status != 'All':
+        where += " AND o.order_status = %s"
+        params.append(status)
+
+    if include_archive:
+        # The filter runs inside each branch of the union, where the date indexes apply
+        orders, params = orders_with_archive(where, params)
+        items = f"COALESCE({_items_summary('OrderItems')}, {_items_summary('OrderItemsArchive')})"
+        where = "1=1"
+    else:
+        orders, items = 'Orders', _items_summary('OrderItems')
+    query = f"""
+        SELECT o.order_id, o.order_date, o.customer_id, c.name, c.phone,
+               o.order_type, o.table_number, o.payment_method, o.order_status,
+               o.discount, o.total_amount, {items}
+        FROM {orders} o
+        JOIN Customers c ON o.customer_id = c.customer_id
+        WHERE {where}
+        ORDER BY o.order_date, o.order_id
+    """
+    return query, params
+
+
+def customer_export_query(start=None, end=None):
+    query = "SELECT customer_id, name, phone, email, address, joined_on FROM Customers WHERE 1=1"
+    params = []
+    if start:
+        query += " AND joined_on >= %s"
+        params.append(start)
+    if end:
+        query += " AND joined_on < %s + INTERVAL 1 DAY"
+        params.append(end)
+    query += " ORDER BY customer_id"
+    return query, params
+
+
+def iter_rows(connection, query, params, fetch_size=FETCH_SIZE):
+    """Yield result rows in batches from an unbuffered cursor"""
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        try:
+            cursor.close()
+        except Error:
+            # Abandoned mid-stream (client went away) with rows still unread; the caller
+            # discards the connection instead of returning it to the pool
+            pass
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(columns, rows, chunk_rows=FETCH_SIZE):
+    """Encode rows as CSV text, yielding one chunk per chunk_rows rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([_plain(v) for v in row])
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(columns, rows, chunk_rows=FETCH_SIZE):
+    """Encode rows as newline-delimited JSON objects, yielding one chunk per chunk_rows rows"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, (_plain(v) for v in row))), ensure_ascii=False))
+        if len(lines) == chunk_rows:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def export_chunks(connection, dataset, fmt='csv', start=None, end=None, status=None, include_archive=False):
+    """Generator of encoded chunks for the orders or customers export"""
+    if dataset == 'orders':
+        columns = ORDER_EXPORT_COLUMNS
+        query, params = order_export_query(start, end, status, include_archive)
+    else:
+        columns = CUSTOMER_EXPORT_COLUMNS
+        query, params = customer_export_query(start, end)
+    encode = ndjson_chunks if fmt == 'ndjson' else csv_chunks
+    return encode(columns, iter_rows(connection, query, params))
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from db_initializer import connect
+
+    parser = argparse.ArgumentParser(description="Export orders or customers")
+    parser.add_argument('dataset', choices=['orders', 'customers'])
+    parser.add_argument('--start', help="first day to include (YYYY-MM-DD)")
+    parser.add_argument('--end', help="last day to include (YYYY-MM-DD)")
+    parser.add_argument('--status', help="order status filter (orders only)")
+    parser.add_argument('--include-archive', action='store_true', help="include archived orders (orders only)")
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('-o', '--output', help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    try:
+        connection = connect()
+        out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+        try:
+            for chunk in export_chunks(connection, args.dataset, args.format, args.start, args.end, args.status,
+                                       args.include_archive):
+                out.write(chunk)
+        finally:
+            if args.output:
+                out.close()
+        connection.close()
+        if args.output:
+            print(f"✓ Exported {args.dataset} to {args.output}")
+    except Error as e:
+        print(f"✗ Export failed: {e}", file=sys.stderr)
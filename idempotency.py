@@ -0,0 +1,201 @@
+"""Idempotency keys for order creation.
+
+The order form and POST /api/orders send a key that is unique to one order
+attempt. The first request with a key places the order and stores the
+result. A resubmission with the same key (a double click, or a retry after a
+slow response) gets the stored result back. Menu and Orders are not read
+again for it.
+
+Results live in a bounded in-memory LRU. With use_db, they are also kept in
+the IdempotencyKeys table, so every worker process sees them. The key row is
+inserted as the first statement of the order's transaction. A concurrent
+duplicate therefore blocks on that row and finds the stored result once the
+first request commits. If the first request rolls back, for example because
+its table was taken, the key is released and can be retried.
+
+Order requests only replace their own key's expired row, so their
+transactions stay short. Run `python idempotency.py` from cron (for example
+hourly) to delete the other expired keys.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from mysql.connector import Error, errorcode
+
+IDEMPOTENCY_TTL = 24 * 3600
+MAX_KEY_LENGTH = 64
+
+
+class IdempotencyConflict(Exception):
+    """The key was already used for a different request"""
+
+
+class IdempotencyInProgress(Exception):
+    """Another request with the same key has not finished yet"""
+
+
+class KeyAlreadyClaimed(Exception):
+    """claim() found a committed row for the key; roll back and look the result up"""
+
+
+def create_idempotency_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS IdempotencyKeys (
+            idem_key VARCHAR(64) PRIMARY KEY,
+            request_hash CHAR(64) NOT NULL,
+            order_id INT NULL,
+            response JSON NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            INDEX idx_idempotency_created (created_at)
+        )
+    """)
+
+
+def request_fingerprint(data):
+    """Stable hash of a request's parameters, to catch a key reused for a different order"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def valid_key(key):
+    return bool(key) and len(key) <= MAX_KEY_LENGTH and key.isprintable()
+
+
+class IdempotencyStore:
+    """Stored results of keyed requests: an LRU in front of the optional IdempotencyKeys table"""
+
+    def __init__(self, max_entries=1000, ttl=IDEMPOTENCY_TTL, use_db=True, wait_timeout=10):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.use_db = use_db
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._claims = 0
+        self._replays = 0
+        self._conflicts = 0
+
+    def _remembered(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[2] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry
+            if entry:
+                del self._entries[key]
+        return None
+
+    def remember(self, key, fingerprint, response):
+        with self._lock:
+            self._entries[key] = (fingerprint, response, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def lookup(self, cursor, key, fingerprint):
+        """The stored response for key, or None; raises IdempotencyConflict for a different request"""
+        entry = self._remembered(key)
+        if entry is None and self.use_db:
+            cursor.execute("""
+                SELECT request_hash, response FROM IdempotencyKeys
+                WHERE idem_key = %s AND response IS NOT NULL AND created_at >= NOW() - INTERVAL %s SECOND
+            """, (key, self.ttl))
+            row = cursor.fetchone()
+            if row:
+                response = json.loads(row[1]) if isinstance(row[1], (str, bytes)) else row[1]
+                self.remember(key, row[0], response)
+                entry = (row[0], response, None)
+        if entry is None:
+            return None
+        if entry[0] != fingerprint:
+            with self._lock:
+                self._conflicts += 1
+            raise IdempotencyConflict("Idempotency key was already used for a different order")
+        with self._lock:
+            self._replays += 1
+        return entry[1]
+
+    def begin(self, key):
+        """Mark key in flight in this process; False (after waiting for it) if it already was"""
+        with self._lock:
+            event = self._inflight.get(key)
+            if event is None:
+                self._inflight[key] = threading.Event()
+                return True
+        event.wait(self.wait_timeout)
+        return False
+
+    def end(self, key):
+        with self._lock:
+            event = self._inflight.pop(key, None)
+        if event:
+            event.set()
+
+    def claim(self, cursor, key, fingerprint):
+        """Insert the key's row; call first thing in the order's transaction"""
+        if not self.use_db:
+            return
+        with self._lock:
+            self._claims += 1
+        # Only this key's expired row, by primary key; the rest are left to the cron purge
+        cursor.execute("DELETE FROM IdempotencyKeys WHERE idem_key = %s AND created_at < NOW() - INTERVAL %s SECOND",
+                       (key, self.ttl))
+        try:
+            cursor.execute("INSERT INTO IdempotencyKeys (idem_key, request_hash) VALUES (%s, %s)", (key, fingerprint))
+        except Error as e:
+            if e.errno == errorcode.ER_DUP_ENTRY:
+                raise KeyAlreadyClaimed(key)
+            raise
+
+    def complete(self, cursor, key, order_id, response):
+        """Store the response with the key's row; call just before the order's commit"""
+        if self.use_db:
+            cursor.execute("UPDATE IdempotencyKeys SET order_id = %s, response = %s WHERE idem_key = %s",
+                           (order_id, json.dumps(response, default=str), key))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'use_db': self.use_db,
+                'ttl': self.ttl,
+                'max_entries': self.max_entries,
+                'entries': len(self._entries),
+                'in_flight': len(self._inflight),
+                'claims': self._claims,
+                'replays': self._replays,
+                'conflicts': self._conflicts,
+            }
+
+
+def purge_expired(cursor, ttl=IDEMPOTENCY_TTL, limit=None):
+    """Delete keys older than ttl seconds; returns the number deleted"""
+    query = "DELETE FROM IdempotencyKeys WHERE created_at < NOW() - INTERVAL %s SECOND"
+    params = [ttl]
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+    cursor.execute(query, params)
+    return cursor.rowcount
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_initializer import connect
+
+    parser = argparse.ArgumentParser(description="Delete expired idempotency keys")
+    parser.add_argument('--ttl', type=int, default=IDEMPOTENCY_TTL, help="keep keys younger than this (seconds)")
+    args = parser.parse_args()
+
+    try:
+        connection = connect()
+        cursor = connection.cursor()
+        deleted = purge_expired(cursor, args.ttl)
+        connection.commit()
+        cursor.close()
+        connection.close()
+        print(f"✓ Deleted {deleted} expired idempotency keys")
+    except Error as e:
+        print(f"✗ Purge failed: {e}")
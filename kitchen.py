@@ -0,0 +1,207 @@
+"""Kitchen display queue: per-station tickets and status history.
+
+Every order line becomes a ticket routed to a station by its menu category.
+Each station works its tickets oldest first, straight off the
+(station, status, queued_at) index. Every order and ticket status change is
+appended to OrderStatusHistory, which the prep-latency report reads.
+
+Usage: python kitchen.py --hours 3
+"""
+from datetime import datetime, timedelta
+
+from mysql.connector import Error
+
+# Menu.category -> station; categories not listed go to DEFAULT_STATION
+STATIONS = {
+    'Starters': 'starters',
+    'Main Course': 'curry',
+    'Rice': 'curry',
+    'Breads': 'tandoor',
+    'Desserts': 'desserts',
+    'Beverages': 'bar',
+}
+DEFAULT_STATION = 'main'
+
+TICKET_STATUSES = ('Queued', 'Preparing', 'Ready', 'Void')
+TICKET_TRANSITIONS = {
+    'Queued': ('Preparing',),
+    'Preparing': ('Ready',),
+}
+OPEN_TICKET_STATUSES = ('Queued', 'Preparing')
+
+
+def all_stations():
+    return sorted(set(STATIONS.values()) | {DEFAULT_STATION})
+
+
+def create_kitchen_tables(cursor):
+    """Create the ticket and status-history tables if they don't exist"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS KitchenTickets (
+            ticket_id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT NOT NULL,
+            order_item_id INT NOT NULL,
+            station VARCHAR(20) NOT NULL,
+            item_name VARCHAR(100) NOT NULL,
+            quantity INT NOT NULL,
+            status ENUM('Queued', 'Preparing', 'Ready', 'Void') NOT NULL DEFAULT 'Queued',
+            queued_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+            FOREIGN KEY (order_id) REFERENCES Orders(order_id) ON DELETE CASCADE,
+            FOREIGN KEY (order_item_id) REFERENCES OrderItems(order_item_id) ON DELETE CASCADE,
+            INDEX idx_tickets_queue (station, status, queued_at),
+            INDEX idx_tickets_order (order_id)
+        )
+    """)
+    # No foreign keys: history outlives deleted orders
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS OrderStatusHistory (
+            history_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT NOT NULL,
+            ticket_id INT NULL,
+            station VARCHAR(20) NULL,
+            item_name VARCHAR(100) NULL,
+            status VARCHAR(20) NOT NULL,
+            changed_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+            INDEX idx_history_order (order_id, changed_at),
+            INDEX idx_history_ticket (ticket_id, status),
+            INDEX idx_history_status_time (status, changed_at, station)
+        )
+    """)
+
+
+def record_order_status(cursor, order_id, status):
+    """Append an order-level status change to the history"""
+    cursor.execute("INSERT INTO OrderStatusHistory (order_id, status) VALUES (%s, %s)", (order_id, status))
+
+
+def _record_ticket_status(cursor, where, params, status):
+    cursor.execute(f"""
+        INSERT INTO OrderStatusHistory (order_id, ticket_id, station, item_name, status)
+        SELECT order_id, ticket_id, station, item_name, %s FROM KitchenTickets WHERE {where}
+    """, (status, *params))
+
+
+def create_tickets(cursor, order_id):
+    """Route an order's line items to stations; call after insert_order_items"""
+    cases = ' '.join(['WHEN %s THEN %s'] * len(STATIONS))
+    cursor.execute(f"""
+        INSERT INTO KitchenTickets (order_id, order_item_id, station, item_name, quantity)
+        SELECT oi.order_id, oi.order_item_id,
+               CASE m.category {cases} ELSE %s END,
+               oi.item_name, oi.quantity
+        FROM OrderItems oi
+        LEFT JOIN Menu m ON m.item_id = oi.item_id
+        WHERE oi.order_id = %s
+        ORDER BY oi.order_item_id
+    """, (*[v for pair in STATIONS.items() for v in pair], DEFAULT_STATION, order_id))
+    _record_ticket_status(cursor, "order_id = %s", (order_id,), 'Queued')
+
+
+def void_open_tickets(cursor, order_id):
+    """Take an order's unfinished tickets off the queue (order completed before the kitchen was)"""
+    _record_ticket_status(cursor, "order_id = %s AND status IN ('Queued', 'Preparing')", (order_id,), 'Void')
+    cursor.execute("""
+        UPDATE KitchenTickets SET status = 'Void'
+        WHERE order_id = %s AND status IN ('Queued', 'Preparing')
+    """, (order_id,))
+    return cursor.rowcount
+
+
+def fetch_queue(cursor, station=None, limit=200):
+    """Open tickets, oldest first: (ticket_id, order_id, station, item_name, quantity, status,
+    queued_at, order_type, table_number, age_seconds)"""
+    query = """
+        SELECT t.ticket_id, t.order_id, t.station, t.item_name, t.quantity, t.status, t.queued_at,
+               o.order_type, o.table_number, TIMESTAMPDIFF(SECOND, t.queued_at, NOW(3))
+        FROM KitchenTickets t
+        JOIN Orders o ON o.order_id = t.order_id
+        WHERE t.status IN ('Queued', 'Preparing')
+    """
+    params = []
+    if station:
+        query += " AND t.station = %s"
+        params.append(station)
+    query += " ORDER BY t.queued_at, t.ticket_id LIMIT %s"
+    params.append(limit)
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+
+def ticket_to_dict(t):
+    return {
+        'ticket_id': t[0],
+        'order_id': t[1],
+        'station': t[2],
+        'item_name': t[3],
+        'quantity': t[4],
+        'status': t[5],
+        'queued_at': t[6].isoformat(timespec='seconds'),
+        'order_type': t[7],
+        'table_number': t[8],
+        'age_seconds': t[9],
+    }
+
+
+def advance_ticket(cursor, ticket_id, status):
+    """Move a ticket along TICKET_TRANSITIONS.
+
+    Returns (order_id, order_ready) where order_ready is True once every ticket
+    of the order is Ready, or None if the ticket doesn't exist. Raises
+    ValueError for a transition that isn't allowed.
+    """
+    cursor.execute("SELECT order_id, status FROM KitchenTickets WHERE ticket_id = %s FOR UPDATE", (ticket_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    order_id, current = row
+    if status not in TICKET_TRANSITIONS.get(current, ()):
+        raise ValueError(f"Cannot move a {current} ticket to {status}")
+
+    cursor.execute("UPDATE KitchenTickets SET status = %s WHERE ticket_id = %s", (status, ticket_id))
+    _record_ticket_status(cursor, "ticket_id = %s", (ticket_id,), status)
+
+    cursor.execute("""
+        SELECT COUNT(*) FROM KitchenTickets
+        WHERE order_id = %s AND status IN ('Queued', 'Preparing')
+    """, (order_id,))
+    return order_id, cursor.fetchone()[0] == 0
+
+
+def prep_latency_report(cursor, start, end):
+    """Per station and item: tickets finished in [start, end) with average/max wait and prep seconds"""
+    cursor.execute("""
+        SELECT r.station, r.item_name, COUNT(*),
+               ROUND(AVG(TIMESTAMPDIFF(MICROSECOND, q.changed_at, COALESCE(p.changed_at, r.changed_at))) / 1000000, 1),
+               ROUND(AVG(TIMESTAMPDIFF(MICROSECOND, COALESCE(p.changed_at, q.changed_at), r.changed_at)) / 1000000, 1),
+               ROUND(MAX(TIMESTAMPDIFF(MICROSECOND, q.changed_at, r.changed_at)) / 1000000, 1)
+        FROM OrderStatusHistory r
+        JOIN OrderStatusHistory q ON q.ticket_id = r.ticket_id AND q.status = 'Queued'
+        LEFT JOIN OrderStatusHistory p ON p.ticket_id = r.ticket_id AND p.status = 'Preparing'
+        WHERE r.status = 'Ready' AND r.changed_at >= %s AND r.changed_at < %s
+        GROUP BY r.station, r.item_name
+        ORDER BY r.station, 5 DESC
+    """, (start, end))
+    columns = ['station', 'item_name', 'tickets', 'avg_wait_seconds', 'avg_prep_seconds', 'max_total_seconds']
+    return columns, cursor.fetchall()
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_initializer import connect
+
+    parser = argparse.ArgumentParser(description="Kitchen prep latency by station and item")
+    parser.add_argument('--hours', type=float, default=3, help="report on tickets finished in the last N hours")
+    args = parser.parse_args()
+
+    try:
+        connection = connect()
+        cursor = connection.cursor()
+        end = datetime.now()
+        columns, rows = prep_latency_report(cursor, end - timedelta(hours=args.hours), end)
+        print(f"{'station':<12}{'item':<28}{'tickets':>8}{'wait s':>10}{'prep s':>10}{'max s':>10}")
+        for station, item, tickets, wait, prep, worst in rows:
+            print(f"{station:<12}{item[:27]:<28}{tickets:>8}{wait:>10}{prep:>10}{worst:>10}")
+        cursor.close()
+        connection.close()
+    except Error as e:
+        print(f"✗ Kitchen report failed: {e}")
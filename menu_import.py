@@ -0,0 +1,372 @@
+"""Bulk import of menu and table sheets (CSV, JSON array or NDJSON).
+
+Sheets are read row by row, validated, and diffed against the current rows.
+The changes are then applied with batched executemany() calls in a single
+transaction. A sheet with any invalid row changes nothing. With dry_run the
+diff is reported and rolled back.
+
+Menu rows need item_name and price. category is required only for new items,
+and is_available is optional, so a price sheet can list just names and prices.
+Table rows need table_number and capacity.
+
+Usage: python menu_import.py menu prices.csv --dry-run
+"""
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from mysql.connector import Error
+
+from data_versions import bump_version
+from schema import CATEGORIES, CATEGORY_ALIASES
+
+BATCH_SIZE = 500
+KINDS = ('menu', 'tables')
+MAX_PRICE = Decimal('99999999.99')
+MAX_CAPACITY = 20
+MAX_ERRORS = 50
+
+_TRUE = ('1', 'true', 'yes', 'y')
+_FALSE = ('0', 'false', 'no', 'n')
+
+
+def _iter_json_array(stream, chunk_size=65536):
+    """Yield the objects of a top-level JSON array without reading it all into memory"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if not started:
+            if buffer.startswith('['):
+                buffer = buffer[1:]
+                started = True
+                continue
+        else:
+            if buffer.startswith(','):
+                buffer = buffer[1:]
+                continue
+            if buffer.startswith(']'):
+                return
+            if buffer:
+                try:
+                    value, end = decoder.raw_decode(buffer)
+                except ValueError:
+                    if eof:
+                        raise
+                else:
+                    yield value
+                    buffer = buffer[end:]
+                    continue
+        if eof:
+            if not started:
+                raise ValueError("Expected a JSON array")
+            raise ValueError("Unterminated JSON array")
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+
+
+def read_rows(stream, fmt):
+    """Yield rows from a text stream as dicts with lower-case keys"""
+    if fmt == 'csv':
+        rows = csv.DictReader(stream)
+    elif fmt == 'ndjson':
+        rows = (json.loads(line) for line in stream if line.strip())
+    elif fmt == 'json':
+        rows = _iter_json_array(stream)
+    else:
+        raise ValueError(f"Unknown format '{fmt}'")
+    for row in rows:
+        if not isinstance(row, dict):
+            raise ValueError("Every row must be an object")
+        yield {str(k).strip().lower(): (v.strip() if isinstance(v, str) else v) for k, v in row.items()}
+
+
+def format_for(filename):
+    """Sheet format from a file name's extension"""
+    name = (filename or '').lower()
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    if name.endswith('.json'):
+        return 'json'
+    return 'csv'
+
+
+def canonical_category(value):
+    if value in CATEGORIES:
+        return value
+    key = str(value).strip().lower()
+    for category in CATEGORIES:
+        if category.lower() == key:
+            return category
+    return CATEGORY_ALIASES.get(key)
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise ValueError
+
+
+def validate_menu_row(row):
+    """Return (item_name, category or None, price, is_available or None), or raise ValueError"""
+    name = str(row.get('item_name') or row.get('name') or '').strip()
+    if not name:
+        raise ValueError("item_name is required")
+    if len(name) > 100:
+        raise ValueError(f"item_name '{name[:20]}...' is longer than 100 characters")
+
+    try:
+        price = Decimal(str(row.get('price', '')).replace(',', '').lstrip('₹').strip())
+    except InvalidOperation:
+        raise ValueError(f"price '{row.get('price')}' is not a number")
+    if not price.is_finite() or price < 0 or price > MAX_PRICE or price != price.quantize(Decimal('0.01')):
+        raise ValueError(f"price '{row.get('price')}' must be between 0 and {MAX_PRICE} with at most 2 decimals")
+    price = price.quantize(Decimal('0.01'))
+
+    category = None
+    if row.get('category'):
+        category = canonical_category(row['category'])
+        if not category:
+            raise ValueError(f"unknown category '{row['category']}' (expected one of {', '.join(CATEGORIES)})")
+
+    available = None
+    value = row.get('is_available', row.get('available'))
+    if value not in (None, ''):
+        try:
+            available = _parse_bool(value)
+        except ValueError:
+            raise ValueError(f"is_available '{value}' is not a yes/no value")
+    return name, category, price, available
+
+
+def validate_table_row(row):
+    """Return (table_number, capacity), or raise ValueError"""
+    table_number = str(row.get('table_number') or '').strip()
+    if not table_number:
+        raise ValueError("table_number is required")
+    if len(table_number) > 10:
+        raise ValueError(f"table_number '{table_number}' is longer than 10 characters")
+    try:
+        capacity = int(row.get('capacity'))
+    except (TypeError, ValueError):
+        raise ValueError(f"capacity '{row.get('capacity')}' is not a whole number")
+    if not 1 <= capacity <= MAX_CAPACITY:
+        raise ValueError(f"capacity must be between 1 and {MAX_CAPACITY}")
+    return table_number, capacity
+
+
+def new_report(kind, dry_run):
+    return {
+        'kind': kind,
+        'dry_run': dry_run,
+        'applied': False,
+        'rows': 0,
+        'inserted': [],
+        'updated': [],
+        'disabled': [],
+        'unchanged': 0,
+        'errors': [],
+    }
+
+
+def _add_error(report, row_number, message):
+    if len(report['errors']) < MAX_ERRORS:
+        report['errors'].append({'row': row_number, 'error': message})
+    report['error_count'] = report.get('error_count', 0) + 1
+
+
+def plan_menu_import(cursor, rows, disable_missing=False, report=None):
+    """Diff menu rows against Menu; returns (report, inserts, updates)"""
+    report = report or new_report('menu', False)
+    # Locks the current rows so a concurrent import or edit can't interleave
+    cursor.execute("SELECT item_id, item_name, category, price, is_available FROM Menu FOR UPDATE")
+    current = {}
+    for item_id, name, category, price, available in cursor.fetchall():
+        current.setdefault(name.lower(), (item_id, name, category, price, bool(available)))
+
+    seen = set()
+    inserts, updates = [], []
+    for row_number, row in enumerate(rows, start=1):
+        report['rows'] += 1
+        try:
+            name, category, price, available = validate_menu_row(row)
+        except ValueError as e:
+            _add_error(report, row_number, str(e))
+            continue
+        key = name.lower()
+        if key in seen:
+            _add_error(report, row_number, f"'{name}' appears more than once")
+            continue
+        seen.add(key)
+
+        existing = current.get(key)
+        if existing is None:
+            if category is None:
+                _add_error(report, row_number, f"category is required for new item '{name}'")
+                continue
+            inserts.append((name, category, price, True if available is None else available))
+            report['inserted'].append({'item_name': name, 'category': category, 'price': float(price)})
+            continue
+
+        item_id, old_name, old_category, old_price, old_available = existing
+        new = (category or old_category, price, old_available if available is None else available)
+        if new == (old_category, old_price, old_available):
+            report['unchanged'] += 1
+            continue
+        updates.append((*new, item_id))
+        change = {'item_name': old_name}
+        for field, old, value in (('category', old_category, new[0]), ('price', old_price, new[1]),
+                                  ('is_available', old_available, new[2])):
+            if old != value:
+                change[field] = [float(old) if isinstance(old, Decimal) else old,
+                                 float(value) if isinstance(value, Decimal) else value]
+        report['updated'].append(change)
+
+    if disable_missing:
+        for key, (item_id, name, category, price, available) in current.items():
+            if key not in seen and available:
+                updates.append((category, price, False, item_id))
+                report['disabled'].append({'item_name': name})
+    return report, inserts, updates
+
+
+def plan_table_import(cursor, rows, report=None):
+    """Diff table rows against Tables; returns (report, inserts, updates)"""
+    report = report or new_report('tables', False)
+    cursor.execute("SELECT table_id, table_number, capacity FROM Tables FOR UPDATE")
+    current = {number: (table_id, capacity) for table_id, number, capacity in cursor.fetchall()}
+
+    seen = set()
+    inserts, updates = [], []
+    for row_number, row in enumerate(rows, start=1):
+        report['rows'] += 1
+        try:
+            table_number, capacity = validate_table_row(row)
+        except ValueError as e:
+            _add_error(report, row_number, str(e))
+            continue
+        if table_number in seen:
+            _add_error(report, row_number, f"table '{table_number}' appears more than once")
+            continue
+        seen.add(table_number)
+
+        existing = current.get(table_number)
+        if existing is None:
+            inserts.append((table_number, capacity))
+            report['inserted'].append({'table_number': table_number, 'capacity': capacity})
+        elif existing[1] != capacity:
+            updates.append((capacity, existing[0]))
+            report['updated'].append({'table_number': table_number, 'capacity': [existing[1], capacity]})
+        else:
+            report['unchanged'] += 1
+    return report, inserts, updates
+
+
+def _executemany_batched(cursor, statement, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        cursor.executemany(statement, rows[start:start + batch_size])
+
+
+def import_sheet(connection, cursor, kind, rows, dry_run=False, disable_missing=False, batch_size=BATCH_SIZE):
+    """Validate, diff and (unless dry_run or invalid) apply a sheet in one transaction; returns the report"""
+    report = new_report(kind, dry_run)
+    try:
+        try:
+            if kind == 'menu':
+                report, inserts, updates = plan_menu_import(cursor, rows, disable_missing, report)
+            else:
+                report, inserts, updates = plan_table_import(cursor, rows, report)
+        except (ValueError, csv.Error) as e:
+            # The sheet itself is unreadable (bad JSON, not an array, ...)
+            _add_error(report, None, str(e))
+            inserts = updates = []
+
+        if dry_run or report['errors']:
+            connection.rollback()
+            return report
+
+        if kind == 'menu':
+            _executemany_batched(cursor, "INSERT INTO Menu (item_name, category, price, is_available) "
+                                         "VALUES (%s, %s, %s, %s)", inserts, batch_size)
+            _executemany_batched(cursor, "UPDATE Menu SET category = %s, price = %s, is_available = %s "
+                                         "WHERE item_id = %s", updates, batch_size)
+        else:
+            _executemany_batched(cursor, "INSERT INTO Tables (table_number, capacity) VALUES (%s, %s)",
+                                 inserts, batch_size)
+            _executemany_batched(cursor, "UPDATE Tables SET capacity = %s WHERE table_id = %s",
+                                 updates, batch_size)
+        if inserts or updates:
+            bump_version(cursor, kind)
+        connection.commit()
+        report['applied'] = True
+        return report
+    except Error:
+        connection.rollback()
+        raise
+
+
+def format_report(report):
+    """Human-readable summary of an import report"""
+    lines = [f"{report['kind']}: {report['rows']} rows, {len(report['inserted'])} new, "
+             f"{len(report['updated'])} changed, {len(report['disabled'])} disabled, {report['unchanged']} unchanged"]
+    for row in report['inserted']:
+        lines.append("  + " + ", ".join(f"{k}={v}" for k, v in row.items()))
+    for row in report['updated']:
+        name = row.get('item_name') or row.get('table_number')
+        changes = ", ".join(f"{k}: {v[0]} -> {v[1]}" for k, v in row.items() if isinstance(v, list))
+        lines.append(f"  ~ {name}: {changes}")
+    for row in report['disabled']:
+        lines.append(f"  - {row['item_name']} (no longer available)")
+    for error in report['errors']:
+        where = f"row {error['row']}: " if error['row'] else ""
+        lines.append(f"  ✗ {where}{error['error']}")
+    if report.get('error_count', 0) > len(report['errors']):
+        lines.append(f"  ✗ ... {report['error_count'] - len(report['errors'])} more errors")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from db_initializer import connect
+
+    parser = argparse.ArgumentParser(description="Import a menu or tables sheet")
+    parser.add_argument('kind', choices=KINDS)
+    parser.add_argument('path', help="CSV, JSON array or NDJSON file ('-' for stdin)")
+    parser.add_argument('--format', choices=['csv', 'json', 'ndjson'], help="default: from the file extension")
+    parser.add_argument('--dry-run', action='store_true', help="report the changes without applying them")
+    parser.add_argument('--disable-missing', action='store_true',
+                        help="mark menu items that are not in the sheet as unavailable")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or format_for(args.path)
+    try:
+        connection = connect()
+        cursor = connection.cursor()
+        stream = sys.stdin if args.path == '-' else open(args.path, newline='', encoding='utf-8-sig')
+        try:
+            report = import_sheet(connection, cursor, args.kind, read_rows(stream, fmt), args.dry_run,
+                                  args.disable_missing, args.batch_size)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        cursor.close()
+        connection.close()
+    except (Error, OSError) as e:
+        print(f"✗ Import failed: {e}")
+        sys.exit(1)
+
+    print(format_report(report))
+    if report['errors']:
+        print("✗ Nothing was imported; fix the errors above")
+        sys.exit(1)
+    print("✓ Dry run, nothing changed" if args.dry_run else "✓ Import applied")
@@ -0,0 +1,232 @@
+"""Versioned schema migrations, recorded in the schema_version table.
+
+Checking the schema is one indexed query (the highest applied version), so it
+is cheap enough for every cold start. Migrations run in order under a
+server-wide lock, so several processes starting at once don't apply them
+twice. MySQL commits DDL implicitly, so every migration must be safe to
+re-run if it is interrupted part way through.
+
+To change the schema, update schema.py and append a migration that makes the
+same change to an existing database.
+
+Usage: python migrations.py [--status]
+"""
+import threading
+import time
+
+from mysql.connector import Error, errorcode
+
+from dashboard_stats import reconcile_stats
+from order_items import backfill_order_items
+from idempotency import create_idempotency_table
+from data_versions import create_versions_table
+from schema import create_index, normalize_categories
+from schema_baseline import create_baseline
+
+LOCK_TIMEOUT = 60
+
+
+def create_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(200) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            duration_ms INT NULL
+        )
+    """)
+
+
+def table_exists(cursor, table):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.tables
+        WHERE table_schema = DATABASE() AND table_name = %s
+    """, (table,))
+    return cursor.fetchone()[0] > 0
+
+
+def baseline(connection, cursor):
+    """Every table and index up to the first versioned release, plus the backfills for new ones"""
+    new_counters = not table_exists(cursor, 'OrderStatusCounts')
+    new_order_items = not table_exists(cursor, 'OrderItems')
+    create_baseline(cursor)
+    # Seed the dashboard summary tables from any existing orders
+    if new_counters:
+        reconcile_stats(cursor)
+    connection.commit()
+    # Backfill normalized order line items from Orders.items
+    if new_order_items:
+        backfill_order_items(connection)
+
+
+def canonical_categories(connection, cursor):
+    normalize_categories(cursor)
+
+
+def idempotency_keys(connection, cursor):
+    create_idempotency_table(cursor)
+
+
+def data_versions(connection, cursor):
+    create_versions_table(cursor)
+
+
+def status_date_index(connection, cursor):
+    create_index(cursor, 'Orders', 'idx_orders_status_date', 'order_status, order_date, order_id')
+
+
+# (version, description, migrate(connection, cursor)); append only, never renumber
+MIGRATIONS = [
+    (1, 'Baseline schema', baseline),
+    (2, 'Canonical menu categories', canonical_categories),
+    (3, 'Idempotency keys for order creation', idempotency_keys),
+    (4, 'Data version counters for worker caches', data_versions),
+    (5, 'Orders index for the status-only dashboard filter', status_date_index),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def applied_version(cursor):
+    """Highest applied migration, or 0 for a database that predates schema_version"""
+    try:
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    except Error as e:
+        if e.errno == errorcode.ER_NO_SUCH_TABLE:
+            return 0
+        raise
+    return cursor.fetchone()[0]
+
+
+def migrate(connection, verbose=True):
+    """Apply pending migrations in order; returns the versions applied"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT GET_LOCK(CONCAT(DATABASE(), '.schema_migrations'), %s)", (LOCK_TIMEOUT,))
+    if cursor.fetchone()[0] != 1:
+        cursor.close()
+        raise Error(msg="Timed out waiting for another process to finish migrating")
+
+    applied = []
+    try:
+        create_version_table(cursor)
+        # Read after taking the lock: another process may have just migrated
+        current = applied_version(cursor)
+        for version, description, apply in MIGRATIONS:
+            if version <= current:
+                continue
+            start = time.monotonic()
+            apply(connection, cursor)
+            duration_ms = int((time.monotonic() - start) * 1000)
+            cursor.execute("INSERT INTO schema_version (version, description, duration_ms) VALUES (%s, %s, %s)",
+                           (version, description, duration_ms))
+            connection.commit()
+            applied.append(version)
+            if verbose:
+                print(f"  Applied migration {version}: {description} ({duration_ms} ms)")
+        return applied
+    except Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.execute("SELECT RELEASE_LOCK(CONCAT(DATABASE(), '.schema_migrations'))")
+        cursor.fetchone()
+        cursor.close()
+
+
+class SchemaInitializer:
+    """Runs a schema check once per process on a background thread.
+
+    check(initializer) returns the schema version, calling
+    initializer.mark_migrating() before it changes the schema. Requests are
+    served while the check runs; only a running migration holds them off. A
+    failed check is retried by the first start() after retry_after seconds.
+    """
+
+    def __init__(self, check, retry_after=30):
+        self.check = check
+        self.retry_after = retry_after
+        self.state = 'idle'
+        self.version = None
+        self.error = None
+        self.seconds = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._failed_at = None
+
+    def start(self):
+        """Start the check unless it is running, done, or failed too recently"""
+        if self.state in ('checking', 'migrating', 'ready'):
+            return
+        with self._lock:
+            if self.state == 'failed' and time.monotonic() - self._failed_at < self.retry_after:
+                return
+            if self.state not in ('idle', 'failed'):
+                return
+            self.state = 'checking'
+            self._done.clear()
+        threading.Thread(target=self._run, name='schema-check', daemon=True).start()
+
+    def mark_migrating(self):
+        self.state = 'migrating'
+
+    def _run(self):
+        start = time.monotonic()
+        try:
+            self.version = self.check(self)
+            self.error = None
+            self.state = 'ready'
+        except Exception as e:
+            self.error = str(e)
+            self._failed_at = time.monotonic()
+            self.state = 'failed'
+        finally:
+            self.seconds = round(time.monotonic() - start, 3)
+            self._done.set()
+
+    def wait(self, timeout=None):
+        """Block until the running check finishes; returns True if the schema is ready"""
+        if self.state in ('checking', 'migrating'):
+            self._done.wait(timeout)
+        return self.state == 'ready'
+
+    @property
+    def ready(self):
+        return self.state == 'ready'
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'version': self.version,
+            'latest_version': LATEST_VERSION,
+            'seconds': self.seconds,
+            'error': self.error,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_initializer import connect
+
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    parser.add_argument('--status', action='store_true', help="list applied migrations without applying any")
+    args = parser.parse_args()
+
+    try:
+        connection = connect()
+        if args.status:
+            cursor = connection.cursor()
+            current = applied_version(cursor)
+            if current:
+                cursor.execute("SELECT version, description, applied_at, duration_ms FROM schema_version ORDER BY version")
+                for version, description, applied_at, duration_ms in cursor.fetchall():
+                    print(f"  {version:>4}  {applied_at}  {description} ({duration_ms} ms)")
+            pending = [m for m in MIGRATIONS if m[0] > current]
+            for version, description, _ in pending:
+                print(f"  {version:>4}  pending              {description}")
+            cursor.close()
+            print(f"✓ Schema at version {current} of {LATEST_VERSION}")
+        else:
+            applied = migrate(connection)
+            print(f"✓ Schema at version {LATEST_VERSION}" + (f" ({len(applied)} migrations applied)" if applied else ""))
+        connection.close()
+    except Error as e:
+        print(f"✗ Migration failed: {e}")
@@ -0,0 +1,132 @@
+"""Order line items, normalized out of the Orders.items JSON column.
+
+Run `python order_items.py` to backfill OrderItems for existing orders.
+"""
+import json
+import time
+
+from mysql.connector import Error
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def create_order_items_table(cursor):
+    """Create the OrderItems table if it doesn't exist"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS OrderItems (
+            order_item_id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT NOT NULL,
+            item_id INT,
+            item_name VARCHAR(100) NOT NULL,
+            unit_price DECIMAL(10, 2) NOT NULL,
+            quantity INT NOT NULL DEFAULT 1,
+            INDEX idx_order_items_order (order_id),
+            INDEX idx_order_items_item (item_id, order_id),
+            FOREIGN KEY (order_id) REFERENCES Orders(order_id) ON DELETE CASCADE
+        )
+    """)
+
+
+def group_lines(lines):
+    """Merge (item_id, item_name, unit_price, quantity) entries for the same item and price"""
+    grouped = {}
+    for item_id, item_name, unit_price, quantity in lines:
+        key = (item_id, item_name, unit_price)
+        grouped[key] = grouped.get(key, 0) + quantity
+    return [(item_id, item_name, unit_price, quantity)
+            for (item_id, item_name, unit_price), quantity in grouped.items()]
+
+
+def parse_items_json(items_json, menu_ids, menu_names):
+    """Decode Orders.items into lines; handles both the per-unit {"item", "price"}
+    format and the compact {"item_id", "qty", "unit_price"} format"""
+    lines = []
+    for item in json.loads(items_json or '[]'):
+        if 'item_id' in item:
+            item_id = item['item_id']
+            lines.append((item_id, menu_names.get(item_id, f"Item #{item_id}"), item['unit_price'], item.get('qty', 1)))
+        else:
+            lines.append((menu_ids.get(item['item']), item['item'], item['price'], 1))
+    return lines
+
+
+def insert_order_items(cursor, order_id, lines):
+    """Insert the line items of one order (caller commits)"""
+    cursor.executemany(
+        "INSERT INTO OrderItems (order_id, item_id, item_name, unit_price, quantity) VALUES (%s, %s, %s, %s, %s)",
+        [(order_id, *row) for row in group_lines(lines)]
+    )
+
+
+def fetch_order_items(cursor, order_id):
+    """Line items of one order as (item_id, item_name, unit_price, quantity)"""
+    cursor.execute("""
+        SELECT item_id, item_name, unit_price, quantity FROM OrderItems
+        WHERE order_id = %s ORDER BY order_item_id
+    """, (order_id,))
+    return cursor.fetchall()
+
+
+def backfill_order_items(connection, batch_size=BACKFILL_BATCH_SIZE):
+    """Copy Orders.items JSON into OrderItems for orders that have no line items yet.
+
+    Walks Orders by primary key in batches and commits after each batch, so it
+    can be interrupted and re-run safely. Returns the number of orders migrated.
+    """
+    cursor = connection.cursor()
+    cursor.execute("SELECT item_name, item_id FROM Menu")
+    menu_ids = dict(cursor.fetchall())
+    menu_names = {item_id: item_name for item_name, item_id in menu_ids.items()}
+
+    last_id = 0
+    migrated = 0
+    start = time.monotonic()
+    while True:
+        cursor.execute("""
+            SELECT o.order_id, o.items FROM Orders o
+            WHERE o.order_id > %s
+              AND NOT EXISTS (SELECT 1 FROM OrderItems oi WHERE oi.order_id = o.order_id)
+            ORDER BY o.order_id
+            LIMIT %s
+        """, (last_id, batch_size))
+        batch = cursor.fetchall()
+        if not batch:
+            break
+
+        rows = []
+        for order_id, items_json in batch:
+            try:
+                lines = parse_items_json(items_json, menu_ids, menu_names)
+            except (TypeError, ValueError, KeyError):
+                continue
+            rows.extend((order_id, *row) for row in group_lines(lines))
+
+        if rows:
+            cursor.executemany(
+                "INSERT INTO OrderItems (order_id, item_id, item_name, unit_price, quantity) VALUES (%s, %s, %s, %s, %s)",
+                rows
+            )
+        connection.commit()
+
+        last_id = batch[-1][0]
+        migrated += len(batch)
+        elapsed = time.monotonic() - start
+        print(f"  {migrated} orders migrated ({migrated / elapsed:.0f}/s)" if elapsed else f"  {migrated} orders migrated")
+
+    cursor.close()
+    return migrated
+
+
+if __name__ == "__main__":
+    from db_initializer import connect
+
+    try:
+        connection = connect()
+        cursor = connection.cursor()
+        create_order_items_table(cursor)
+        cursor.close()
+        migrated = backfill_order_items(connection)
+        connection.close()
+        print(f"✓ Backfilled line items for {migrated} orders")
+    except Error as e:
+        print(f"✗ Order items backfill failed: {e}")
@@ -0,0 +1,221 @@
+"""Per-request query profiling, slow-query logging and Prometheus metrics.
+
+Cursors handed out by the connection pool are wrapped in ProfiledCursor, which
+records every statement into the profile of the request being served.
+"""
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+_current_profile = ContextVar('current_profile', default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def statement_shape(statement):
+    """Normalize a statement so repeated executions with different values compare equal"""
+    if isinstance(statement, bytes):
+        statement = statement.decode('utf-8', 'replace')
+    shape = _WHITESPACE.sub(' ', statement).strip()
+    shape = _STRING_LITERAL.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    return _IN_LIST.sub('IN (...)', shape)
+
+
+class RequestProfile:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.queries = []
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self._render_started = None
+        # Dashboard queries may record from worker threads
+        self._lock = threading.Lock()
+
+    @property
+    def query_count(self):
+        return len(self.queries)
+
+    def record(self, statement, elapsed):
+        shape = statement_shape(statement)
+        with self._lock:
+            self.queries.append((shape, elapsed))
+            self.db_time += elapsed
+
+    def add_fetch_time(self, elapsed):
+        with self._lock:
+            self.db_time += elapsed
+
+    def start_render(self):
+        self._render_started = time.perf_counter()
+
+    def end_render(self):
+        if self._render_started is not None:
+            self.render_time += time.perf_counter() - self._render_started
+            self._render_started = None
+
+    def repeated_shapes(self, threshold):
+        """Statement shapes executed at least `threshold` times (likely N+1 loops)"""
+        counts = {}
+        for shape, _ in self.queries:
+            counts[shape] = counts.get(shape, 0) + 1
+        return {shape: n for shape, n in counts.items() if n >= threshold}
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+class ProfiledCursor:
+    """Cursor proxy that times execute/fetch calls into the current request profile"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def _timed_execute(self, method, statement, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(statement, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            profile = _current_profile.get()
+            if profile is not None:
+                profile.record(statement, elapsed)
+            profiler.observe_query(statement, elapsed)
+
+    def _timed_fetch(self, method, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            profile = _current_profile.get()
+            if profile is not None:
+                profile.add_fetch_time(time.perf_counter() - start)
+
+    def execute(self, statement, *args, **kwargs):
+        return self._timed_execute(self._cursor.execute, statement, *args, **kwargs)
+
+    def executemany(self, statement, *args, **kwargs):
+        return self._timed_execute(self._cursor.executemany, statement, *args, **kwargs)
+
+    def fetchone(self):
+        return self._timed_fetch(self._cursor.fetchone)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._timed_fetch(self._cursor.fetchmany, *args, **kwargs)
+
+    def fetchall(self):
+        return self._timed_fetch(self._cursor.fetchall)
+
+
+class Profiler:
+    """Process-wide profiling settings and counters exported at /metrics"""
+
+    def __init__(self, slow_query_seconds=0.1, n_plus_one_threshold=5, logger=None):
+        self.slow_query_seconds = slow_query_seconds
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.logger = logger
+        self._lock = threading.Lock()
+        self.slow_queries = deque(maxlen=50)
+        self._requests = {}
+        self._db_queries_total = 0
+        self._db_seconds_total = 0.0
+        self._render_seconds_total = 0.0
+        self._slow_queries_total = 0
+        self._n_plus_one_total = 0
+
+    def start_request(self, endpoint):
+        profile = RequestProfile(endpoint)
+        token = _current_profile.set(profile)
+        return profile, token
+
+    def end_request(self, token):
+        _current_profile.reset(token)
+
+    def current(self):
+        return _current_profile.get()
+
+    def observe_query(self, statement, elapsed):
+        if elapsed < self.slow_query_seconds:
+            return
+        shape = statement_shape(statement)
+        with self._lock:
+            self._slow_queries_total += 1
+            self.slow_queries.append((time.time(), round(elapsed * 1000, 2), shape))
+        if self.logger:
+            self.logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, shape)
+
+    def finish_request(self, profile, status_code):
+        """Fold a finished request into the counters; returns its repeated statement shapes"""
+        total = profile.elapsed()
+        repeated = profile.repeated_shapes(self.n_plus_one_threshold)
+        with self._lock:
+            stats = self._requests.setdefault((profile.endpoint or 'unknown', status_code), {
+                'count': 0, 'sum': 0.0, 'buckets': [0] * len(REQUEST_BUCKETS),
+            })
+            stats['count'] += 1
+            stats['sum'] += total
+            for i, bound in enumerate(REQUEST_BUCKETS):
+                if total <= bound:
+                    stats['buckets'][i] += 1
+            self._db_queries_total += profile.query_count
+            self._db_seconds_total += profile.db_time
+            self._render_seconds_total += profile.render_time
+            self._n_plus_one_total += len(repeated)
+        if repeated and self.logger:
+            for shape, count in repeated.items():
+                self.logger.warning("Possible N+1 in %s: %d executions of %s", profile.endpoint, count, shape)
+        return repeated
+
+    def prometheus(self, extra_gauges=None):
+        """Render counters in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            lines.append("# HELP rms_http_request_duration_seconds Request latency by endpoint")
+            lines.append("# TYPE rms_http_request_duration_seconds histogram")
+            for (endpoint, status), stats in sorted(self._requests.items()):
+                labels = f'endpoint="{endpoint}",status="{status}"'
+                for bound, count in zip(REQUEST_BUCKETS, stats['buckets']):
+                    lines.append(f'rms_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'rms_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats["count"]}')
+                lines.append(f'rms_http_request_duration_seconds_sum{{{labels}}} {stats["sum"]:.6f}')
+                lines.append(f'rms_http_request_duration_seconds_count{{{labels}}} {stats["count"]}')
+            counters = [
+                ('rms_db_queries_total', 'Statements executed', self._db_queries_total),
+                ('rms_db_seconds_total', 'Time spent in the database', round(self._db_seconds_total, 6)),
+                ('rms_render_seconds_total', 'Time spent rendering templates', round(self._render_seconds_total, 6)),
+                ('rms_slow_queries_total', 'Statements slower than the slow-query threshold', self._slow_queries_total),
+                ('rms_n_plus_one_total', 'Statement shapes repeated within one request', self._n_plus_one_total),
+            ]
+        for name, help_text, value in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+        for name, help_text, value in extra_gauges or []:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def server_timing(profile):
+    """Server-Timing header value for a finished request profile"""
+    return (f'db;dur={profile.db_time * 1000:.2f};desc="{profile.query_count} queries", '
+            f'render;dur={profile.render_time * 1000:.2f}, '
+            f'total;dur={profile.elapsed() * 1000:.2f}')
+
+
+profiler = Profiler()
@@ -0,0 +1,90 @@
+import threading
+import time
+
+
+class ReferenceCache:
+    """In-process TTL cache for rarely changing reference data (menu, tables).
+
+    Every key carries a version number. invalidate() bumps it, so a load that
+    was already in flight when the data changed is never stored. The generation
+    number also moves on every reload, for caches derived from the value.
+    sync() drops keys whose data changed in another process, going by a
+    version counter stored in the database.
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._versions = {}
+        self._generations = {}
+        self._sources = {}
+        self._hits = {}
+        self._misses = {}
+
+    def get(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions.get(key, 0)
+            entry = self._entries.get(key)
+            if entry and entry[1] == version and now - entry[2] < self.ttl:
+                self._hits[key] = self._hits.get(key, 0) + 1
+                return entry[0]
+            self._misses[key] = self._misses.get(key, 0) + 1
+
+        value = loader()
+
+        with self._lock:
+            if self._versions.get(key, 0) == version:
+                self._entries[key] = (value, version, now)
+                self._generations[key] = self._generations.get(key, 0) + 1
+        return value
+
+    def invalidate(self, *keys):
+        """Drop keys and bump their versions (call after writing the underlying table)"""
+        with self._lock:
+            for key in keys:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self._entries.pop(key, None)
+
+    def sync(self, source, version, *keys):
+        """Invalidate keys if the stored version of their source data differs from the last one seen"""
+        with self._lock:
+            changed = self._sources.get(source) != version
+            self._sources[source] = version
+        if changed:
+            self.invalidate(*keys)
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._versions.keys() | self._entries.keys())
+            self._sources.clear()
+        self.invalidate(*keys)
+
+    def version(self, key):
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def generation(self, key):
+        """Counter that changes whenever the value for key is reloaded or invalidated"""
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def stats(self):
+        with self._lock:
+            keys = sorted(self._hits.keys() | self._misses.keys() | self._versions.keys())
+            return {
+                'ttl': self.ttl,
+                'sources': dict(self._sources),
+                'keys': {
+                    key: {
+                        'hits': self._hits.get(key, 0),
+                        'misses': self._misses.get(key, 0),
+                        'version': self._versions.get(key, 0),
+                        'cached': key in self._entries,
+                    }
+                    for key in keys
+                },
+            }
@@ -0,0 +1,237 @@
+"""Sales reports served from hourly rollup tables.
+
+Rollups are refreshed incrementally from a high-water mark on Orders.order_id,
+so report queries never scan raw orders. Run `python reports.py` from cron to
+keep them current. The report routes also refresh, but at most once per
+ROLLUP_REFRESH_SECONDS in each process. Orders are rolled up before archive.py
+moves them, so reports include archived orders.
+"""
+import threading
+import time
+
+from mysql.connector import Error
+
+from archive import order_sources
+
+# Orders younger than this are left for the next refresh, so a transaction that
+# allocated a lower order_id but committed late is not skipped
+SETTLE_SECONDS = 60
+
+PERIOD_FORMATS = {
+    'daily': "DATE_FORMAT(bucket_start, '%Y-%m-%d')",
+    'weekly': "DATE_FORMAT(bucket_start - INTERVAL WEEKDAY(bucket_start) DAY, '%Y-%m-%d')",
+    'monthly': "DATE_FORMAT(bucket_start, '%Y-%m')",
+    'hourly': "DATE_FORMAT(bucket_start, '%Y-%m-%d %H:00')",
+}
+
+
+def create_report_tables(cursor):
+    """Create the rollup tables if they don't exist"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS SalesHourly (
+            bucket_start DATETIME NOT NULL,
+            payment_method VARCHAR(20) NOT NULL,
+            order_type VARCHAR(20) NOT NULL,
+            order_count INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket_start, payment_method, order_type)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ItemSalesHourly (
+            bucket_start DATETIME NOT NULL,
+            item_name VARCHAR(100) NOT NULL,
+            quantity INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket_start, item_name)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ReportState (
+            name VARCHAR(50) PRIMARY KEY,
+            last_order_id INT NOT NULL DEFAULT 0,
+            refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def refresh_rollups(connection, include_archive=False):
+    """Fold orders placed since the last refresh into the rollups; returns the number of new orders"""
+    orders, order_items = order_sources(include_archive)
+    cursor = connection.cursor()
+    try:
+        cursor.execute("INSERT IGNORE INTO ReportState (name, last_order_id) VALUES ('sales', 0)")
+        # Row lock serializes concurrent refreshes so no order is counted twice
+        cursor.execute("SELECT last_order_id FROM ReportState WHERE name = 'sales' FOR UPDATE")
+        last_id = cursor.fetchone()[0]
+
+        cursor.execute(f"""
+            SELECT COALESCE(MAX(order_id), 0), COUNT(*) FROM {orders} o
+            WHERE order_id > %s AND order_date < NOW() - INTERVAL %s SECOND
+        """, (last_id, SETTLE_SECONDS))
+        high_water, new_orders = cursor.fetchone()
+        if not new_orders:
+            connection.commit()
+            return 0
+
+        cursor.execute(f"""
+            INSERT INTO SalesHourly (bucket_start, payment_method, order_type, order_count, revenue)
+            SELECT DATE_FORMAT(order_date, '%Y-%m-%d %H:00:00'), payment_method, order_type,
+                   COUNT(*), SUM(total_amount)
+            FROM {orders} o
+            WHERE order_id > %s AND order_id <= %s
+            GROUP BY 1, payment_method, order_type
+            ON DUPLICATE KEY UPDATE order_count = order_count + VALUES(order_count),
+                                    revenue = revenue + VALUES(revenue)
+        """, (last_id, high_water))
+        cursor.execute(f"""
+            INSERT INTO ItemSalesHourly (bucket_start, item_name, quantity, revenue)
+            SELECT DATE_FORMAT(o.order_date, '%Y-%m-%d %H:00:00'), oi.item_name,
+                   SUM(oi.quantity), SUM(oi.unit_price * oi.quantity)
+            FROM {orders} o
+            JOIN {order_items} oi ON oi.order_id = o.order_id
+            WHERE o.order_id > %s AND o.order_id <= %s
+            GROUP BY 1, oi.item_name
+            ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity),
+                                    revenue = revenue + VALUES(revenue)
+        """, (last_id, high_water))
+        cursor.execute("UPDATE ReportState SET last_order_id = %s WHERE name = 'sales'", (high_water,))
+        connection.commit()
+        return new_orders
+    except Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def retract_order(cursor, order_id):
+    """Remove an already rolled-up order from the rollups (call before deleting it)"""
+    # Locked like refresh_rollups does, so a refresh folding this order in finishes first
+    cursor.execute("SELECT last_order_id FROM ReportState WHERE name = 'sales' FOR UPDATE")
+    state = cursor.fetchone()
+    if not state or order_id > state[0]:
+        return
+
+    # Look the order's buckets up first, then subtract by primary key: plain UPDATEs that both engines run
+    cursor.execute("""
+        SELECT DATE_FORMAT(order_date, '%Y-%m-%d %H:00:00'), payment_method, order_type, total_amount
+        FROM Orders WHERE order_id = %s
+    """, (order_id,))
+    order = cursor.fetchone()
+    if not order:
+        return
+    bucket_start, payment_method, order_type, total_amount = order
+    cursor.execute("""
+        UPDATE SalesHourly SET order_count = order_count - 1, revenue = revenue - %s
+        WHERE bucket_start = %s AND payment_method = %s AND order_type = %s
+    """, (total_amount, bucket_start, payment_method, order_type))
+    cursor.execute("""
+        SELECT item_name, SUM(quantity), SUM(unit_price * quantity) FROM OrderItems
+        WHERE order_id = %s GROUP BY item_name
+    """, (order_id,))
+    cursor.executemany("""
+        UPDATE ItemSalesHourly SET quantity = quantity - %s, revenue = revenue - %s
+        WHERE bucket_start = %s AND item_name = %s
+    """, [(quantity, revenue, bucket_start, item_name) for item_name, quantity, revenue in cursor.fetchall()])
+
+
+class RollupRefresher:
+    """Refreshes the rollups for the report routes at most once per interval.
+
+    Report views then stay reads: a request finding a refresh under way in
+    this process skips it instead of queueing on the ReportState row lock.
+    """
+
+    def __init__(self, interval=SETTLE_SECONDS):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._refreshed_at = None
+
+    def maybe_refresh(self, connection):
+        """Refresh if the last refresh is older than the interval; returns the number of new orders"""
+        if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < self.interval:
+            return 0
+        if not self._lock.acquire(blocking=False):
+            return 0
+        try:
+            count = refresh_rollups(connection)
+            self._refreshed_at = time.monotonic()
+            return count
+        finally:
+            self._lock.release()
+
+
+def rebuild_rollups(connection):
+    """Discard and recompute every rollup from Orders and OrdersArchive"""
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM SalesHourly")
+    cursor.execute("DELETE FROM ItemSalesHourly")
+    cursor.execute("REPLACE INTO ReportState (name, last_order_id) VALUES ('sales', 0)")
+    connection.commit()
+    cursor.close()
+    return refresh_rollups(connection, include_archive=True)
+
+
+def sales_report(cursor, start, end, period='daily'):
+    period_sql = PERIOD_FORMATS.get(period, PERIOD_FORMATS['daily'])
+    cursor.execute(f"""
+        SELECT {period_sql} AS period, CAST(SUM(order_count) AS SIGNED), SUM(revenue),
+               ROUND(SUM(revenue) / NULLIF(SUM(order_count), 0), 2)
+        FROM SalesHourly
+        WHERE bucket_start >= %s AND bucket_start < %s + INTERVAL 1 DAY
+        GROUP BY period
+        ORDER BY period
+    """, (start, end))
+    return ['period', 'orders', 'revenue', 'average_ticket'], cursor.fetchall()
+
+
+def breakdown_report(cursor, start, end, column):
+    cursor.execute(f"""
+        SELECT {column}, CAST(SUM(order_count) AS SIGNED), SUM(revenue),
+               ROUND(SUM(revenue) / NULLIF(SUM(order_count), 0), 2)
+        FROM SalesHourly
+        WHERE bucket_start >= %s AND bucket_start < %s + INTERVAL 1 DAY
+        GROUP BY {column}
+        ORDER BY SUM(revenue) DESC
+    """, (start, end))
+    return [column, 'orders', 'revenue', 'average_ticket'], cursor.fetchall()
+
+
+def items_report(cursor, start, end, limit=50):
+    cursor.execute("""
+        SELECT item_name, CAST(SUM(quantity) AS SIGNED), SUM(revenue)
+        FROM ItemSalesHourly
+        WHERE bucket_start >= %s AND bucket_start < %s + INTERVAL 1 DAY
+        GROUP BY item_name
+        ORDER BY SUM(quantity) DESC
+        LIMIT %s
+    """, (start, end, limit))
+    return ['item_name', 'quantity', 'revenue'], cursor.fetchall()
+
+
+REPORTS = {
+    'sales': lambda cursor, start, end, period: sales_report(cursor, start, end, period),
+    'payment_methods': lambda cursor, start, end, period: breakdown_report(cursor, start, end, 'payment_method'),
+    'order_types': lambda cursor, start, end, period: breakdown_report(cursor, start, end, 'order_type'),
+    'items': lambda cursor, start, end, period: items_report(cursor, start, end),
+}
+
+
+if __name__ == "__main__":
+    import sys
+    from db_initializer import connect
+
+    try:
+        connection = connect()
+        cursor = connection.cursor()
+        create_report_tables(cursor)
+        cursor.close()
+        if '--rebuild' in sys.argv:
+            count = rebuild_rollups(connection)
+        else:
+            count = refresh_rollups(connection)
+        connection.close()
+        print(f"✓ Report rollups refreshed ({count} new orders)")
+    except Error as e:
+        print(f"✗ Report refresh failed: {e}")
@@ -0,0 +1,219 @@
+"""Data access for orders, customers, menu and tables.
+
+The route handlers in app.py call these functions instead of running SQL
+themselves. Each function takes a cursor from either storage backend (MySQL,
+or SQLite via sqlite_backend), so the statements stay in MySQL syntax that
+both engines run. Writes leave the commit to the caller.
+"""
+import json
+from datetime import datetime
+
+from archive import orders_with_archive
+from data_versions import bump_version
+
+ITEMS_SUMMARY_TEMPLATE = """
+    (SELECT GROUP_CONCAT(CONCAT(oi.item_name, ' (₹', oi.unit_price, ')',
+                                IF(oi.quantity > 1, CONCAT(' x', oi.quantity), ''))
+                         ORDER BY oi.order_item_id SEPARATOR ', ')
+     FROM {order_items} oi WHERE oi.order_id = o.order_id)
+"""
+ORDER_COLUMNS_TEMPLATE = """
+    SELECT o.order_id, c.name, o.order_date, o.total_amount, o.payment_method,
+           o.order_status, o.order_type, o.table_number, {items_summary} AS items_summary
+    FROM {orders} o
+    JOIN Customers c ON o.customer_id = c.customer_id
+"""
+ORDER_COLUMNS = ORDER_COLUMNS_TEMPLATE.format(
+    orders='Orders', items_summary=ITEMS_SUMMARY_TEMPLATE.format(order_items='OrderItems'))
+# An order's items are in exactly one of the two tables; each lookup uses that table's order_id index
+HISTORY_ITEMS_SUMMARY = (f"COALESCE({ITEMS_SUMMARY_TEMPLATE.format(order_items='OrderItems')}, "
+                         f"{ITEMS_SUMMARY_TEMPLATE.format(order_items='OrderItemsArchive')})")
+
+
+def history_order_columns(where, params, order_by=None, limit=None):
+    """ORDER_COLUMNS over live and archived orders, filtered inside each branch; returns (sql, params)"""
+    orders, params = orders_with_archive(where, params, order_by, limit)
+    return ORDER_COLUMNS_TEMPLATE.format(orders=orders, items_summary=HISTORY_ITEMS_SUMMARY), params
+
+
+# Menu and tables
+
+def load_menu(cursor):
+    """Available menu items for the order form"""
+    cursor.execute("SELECT item_id, item_name, category, price FROM Menu WHERE is_available = TRUE ORDER BY category, item_name")
+    return tuple(cursor.fetchall())
+
+
+def load_menu_prices(cursor, item_ids=None):
+    """Map of item_id -> (item_name, price) for every menu item, or only for item_ids"""
+    if item_ids is None:
+        cursor.execute("SELECT item_id, item_name, price FROM Menu")
+    else:
+        placeholders = ", ".join(["%s"] * len(item_ids))
+        cursor.execute(f"SELECT item_id, item_name, price FROM Menu WHERE item_id IN ({placeholders})", list(item_ids))
+    return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
+
+def load_tables(cursor):
+    """All restaurant tables with their current status"""
+    cursor.execute("SELECT table_id, table_number, capacity, status FROM Tables ORDER BY table_number")
+    return tuple(cursor.fetchall())
+
+
+def lock_table(cursor, table_number):
+    """Lock a table's row for the rest of the transaction; returns its status, or None if it doesn't exist"""
+    cursor.execute("SELECT status FROM Tables WHERE table_number = %s FOR UPDATE", (table_number,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+# Orders
+
+def encode_order_cursor(order_date, order_id):
+    """Build a keyset cursor from the last row of a page"""
+    return f"{order_date.strftime('%Y%m%d%H%M%S')}-{order_id}"
+
+
+def decode_order_cursor(value):
+    """Parse a keyset cursor into (order_date, order_id), or None if invalid"""
+    try:
+        date_part, id_part = value.split('-')
+        return datetime.strptime(date_part, '%Y%m%d%H%M%S'), int(id_part)
+    except (AttributeError, ValueError):
+        return None
+
+
+def fetch_orders(cursor, status_filter, order_type_filter, page_cursor, page_size, include_archive=False):
+    """Fetch one page of orders, newest first; returns (rows, next_cursor)"""
+    where = "1=1"
+    params = []
+    if status_filter != 'All':
+        where += " AND o.order_status = %s"
+        params.append(status_filter)
+    if order_type_filter != 'All':
+        where += " AND o.order_type = %s"
+        params.append(order_type_filter)
+    if page_cursor:
+        # Keyset pagination: continue strictly after the last row of the previous page
+        where += " AND (o.order_date < %s OR (o.order_date = %s AND o.order_id < %s))"
+        params.extend([page_cursor[0], page_cursor[0], page_cursor[1]])
+
+    order_by = "o.order_date DESC, o.order_id DESC"
+    if include_archive:
+        # Each table returns at most a page of its own newest rows; the page is the newest of both
+        query, params = history_order_columns(where, params, order_by, page_size + 1)
+    else:
+        query = ORDER_COLUMNS + f" WHERE {where}"
+    query += f" ORDER BY {order_by} LIMIT %s"
+    params.append(page_size + 1)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_order_cursor(last[2], last[0])
+    return rows, next_cursor
+
+
+def fetch_order(cursor, order_id, include_archive=False):
+    """Fetch a single order row, or None"""
+    if include_archive:
+        cursor.execute(*history_order_columns("o.order_id = %s", [order_id]))
+    else:
+        cursor.execute(ORDER_COLUMNS + " WHERE o.order_id = %s", (order_id,))
+    return cursor.fetchone()
+
+
+def fetch_order_state(cursor, order_id):
+    """(table_number, order_type, order_status, order_date, total_amount) of an order, or None"""
+    cursor.execute("""
+        SELECT table_number, order_type, order_status, order_date, total_amount
+        FROM Orders WHERE order_id = %s
+    """, (order_id,))
+    return cursor.fetchone()
+
+
+def insert_order(cursor, customer_id, lines, total_amount, payment_method, order_type, table_number, discount):
+    """Insert an order priced as lines of (item_id, item_name, unit_price, quantity); returns its order_id"""
+    cursor.execute("""
+        INSERT INTO Orders (customer_id, items, total_amount, payment_method, order_type, table_number, discount)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, (customer_id, json.dumps([{"item_id": item_id, "qty": quantity, "unit_price": price}
+                              for item_id, _, price, quantity in lines]),
+          total_amount, payment_method, order_type, table_number or None, discount))
+    return cursor.lastrowid
+
+
+def set_order_status(cursor, order_id, status):
+    cursor.execute("UPDATE Orders SET order_status = %s WHERE order_id = %s", (status, order_id))
+
+
+def remove_order(cursor, order_id):
+    """Delete an order; its line items and kitchen tickets go with it"""
+    cursor.execute("DELETE FROM Orders WHERE order_id = %s", (order_id,))
+
+
+# Customers
+
+def fetch_customers(cursor, before_id, page_size):
+    """One page of customers, newest first; returns (rows, next_cursor)"""
+    query = "SELECT customer_id, name, phone, email, address, joined_on FROM Customers"
+    params = []
+    if before_id:
+        query += " WHERE customer_id < %s"
+        params.append(before_id)
+    query += " ORDER BY customer_id DESC LIMIT %s"
+    params.append(page_size + 1)
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, rows[-1][0]
+    return rows, None
+
+
+def search_customers(cursor, term, limit):
+    """Prefix search on phone (digits) or name, using the phone/name indexes"""
+    # '!' rather than MySQL's default backslash: SQLite LIKE has no default escape character
+    pattern = term.replace('!', '!!').replace('%', '!%').replace('_', '!_') + '%'
+    column = 'phone' if term.isdigit() else 'name'
+    cursor.execute(f"""
+        SELECT customer_id, name, phone FROM Customers
+        WHERE {column} LIKE %s ESCAPE '!'
+        ORDER BY {column}
+        LIMIT %s
+    """, (pattern, limit))
+    return cursor.fetchall()
+
+
+def find_customer_id(cursor, phone):
+    """The customer_id registered with phone, or None"""
+    cursor.execute("SELECT customer_id FROM Customers WHERE phone = %s", (phone,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def insert_customer(cursor, name, phone, email=None, address=None):
+    """Insert a customer; returns the new customer_id"""
+    cursor.execute("INSERT INTO Customers (name, phone, email, address) VALUES (%s, %s, %s, %s)",
+                   (name, phone, email or None, address or None))
+    customer_id = cursor.lastrowid
+    bump_version(cursor, 'customers')
+    return customer_id
+
+
+def customer_has_orders(cursor, customer_id):
+    """True if the customer has live or archived orders"""
+    cursor.execute("""
+        SELECT EXISTS (SELECT 1 FROM Orders WHERE customer_id = %s)
+            OR EXISTS (SELECT 1 FROM OrdersArchive WHERE customer_id = %s)
+    """, (customer_id, customer_id))
+    return bool(cursor.fetchone()[0])
+
+
+def remove_customer(cursor, customer_id):
+    cursor.execute("DELETE FROM Customers WHERE customer_id = %s", (customer_id,))
+    if cursor.rowcount:
+        bump_version(cursor, 'customers')
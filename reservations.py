@@ -0,0 +1,343 @@
+"""Table reservations and party-size aware seating.
+
+A reservation holds a table for a time slot. The database is authoritative:
+booking locks the candidate table row and re-checks for overlapping
+reservations with an indexed range query before inserting. AvailabilityIndex
+keeps upcoming bookings in memory, so lookups such as "which 4-tops are free at
+20:00" never touch Orders or Reservations.
+
+Tables.current_order_id records which dine-in order is sitting at a table, so
+freeing a table no longer needs to count the table's active orders.
+
+Usage: python reservations.py --no-shows 20
+"""
+import bisect
+import threading
+import time
+from datetime import datetime, timedelta
+
+from mysql.connector import Error
+
+from data_versions import bump_version
+
+DEFAULT_DURATION_MINUTES = 90
+# How long a walk-in order is assumed to keep its table when checking for upcoming bookings
+SEATING_MINUTES = 90
+# Bookings further ahead than this are not kept in memory
+INDEX_HORIZON_DAYS = 30
+
+RESERVATION_STATUSES = ('Booked', 'Seated', 'Completed', 'Cancelled', 'NoShow')
+# Reservations in these states keep their slot
+HOLDING_STATUSES = ('Booked', 'Seated')
+TRANSITIONS = {
+    'Booked': ('Seated', 'Cancelled', 'NoShow'),
+    'Seated': ('Completed',),
+}
+
+RESERVATION_COLUMNS = """
+    reservation_id, table_number, guest_name, phone, party_size, starts_at, ends_at, status, customer_id
+"""
+
+
+def create_reservation_tables(cursor):
+    """Create Reservations and add Tables.current_order_id if they don't exist"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Reservations (
+            reservation_id INT AUTO_INCREMENT PRIMARY KEY,
+            table_number VARCHAR(10) NOT NULL,
+            customer_id INT NULL,
+            guest_name VARCHAR(100) NOT NULL,
+            phone VARCHAR(15),
+            party_size INT NOT NULL,
+            starts_at DATETIME NOT NULL,
+            ends_at DATETIME NOT NULL,
+            status ENUM('Booked', 'Seated', 'Completed', 'Cancelled', 'NoShow') DEFAULT 'Booked',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (table_number) REFERENCES Tables(table_number) ON UPDATE CASCADE,
+            FOREIGN KEY (customer_id) REFERENCES Customers(customer_id) ON DELETE SET NULL,
+            INDEX idx_reservations_table_time (table_number, starts_at),
+            INDEX idx_reservations_time (starts_at)
+        )
+    """)
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = 'Tables' AND column_name = 'current_order_id'
+    """)
+    if cursor.fetchone()[0] == 0:
+        cursor.execute("ALTER TABLE Tables ADD COLUMN current_order_id INT NULL")
+
+
+def reservation_to_dict(row):
+    return {
+        'reservation_id': row[0],
+        'table_number': row[1],
+        'guest_name': row[2],
+        'phone': row[3],
+        'party_size': row[4],
+        'starts_at': row[5].isoformat(timespec='minutes'),
+        'ends_at': row[6].isoformat(timespec='minutes'),
+        'status': row[7],
+        'customer_id': row[8],
+    }
+
+
+def fetch_reservation(cursor, reservation_id):
+    cursor.execute(f"SELECT {RESERVATION_COLUMNS} FROM Reservations WHERE reservation_id = %s", (reservation_id,))
+    return cursor.fetchone()
+
+
+def fetch_reservations(cursor, day):
+    """Reservations starting on the given date, in start order"""
+    cursor.execute(f"""
+        SELECT {RESERVATION_COLUMNS} FROM Reservations
+        WHERE starts_at >= %s AND starts_at < %s + INTERVAL 1 DAY
+        ORDER BY starts_at, table_number
+    """, (day, day))
+    return cursor.fetchall()
+
+
+def find_conflict(cursor, table_number, starts_at, ends_at, statuses=HOLDING_STATUSES):
+    """First reservation on table_number overlapping [starts_at, ends_at), or None"""
+    placeholders = ', '.join(['%s'] * len(statuses))
+    cursor.execute(f"""
+        SELECT reservation_id, starts_at FROM Reservations
+        WHERE table_number = %s AND starts_at < %s AND ends_at > %s AND status IN ({placeholders})
+        ORDER BY starts_at
+        LIMIT 1
+    """, (table_number, ends_at, starts_at, *statuses))
+    return cursor.fetchone()
+
+
+def upcoming_booking(cursor, table_number, now=None):
+    """A booked (not yet seated) reservation that a walk-in seated now would run into"""
+    now = now or datetime.now()
+    return find_conflict(cursor, table_number, now, now + timedelta(minutes=SEATING_MINUTES), ('Booked',))
+
+
+def book_table(cursor, candidates, guest_name, phone, party_size, starts_at, ends_at, customer_id=None, now=None):
+    """Book the first candidate table that is still free in the database.
+
+    candidates should be in best-fit order; returns (reservation_id, table_number)
+    or None. Table rows are locked in candidate order, so concurrent bookings
+    cannot deadlock or double-book; the caller commits. Like table_states(), an
+    occupied table is not free for a booking starting within SEATING_MINUTES.
+    """
+    now = now or datetime.now()
+    for table_number in candidates:
+        cursor.execute("SELECT capacity, status FROM Tables WHERE table_number = %s FOR UPDATE", (table_number,))
+        row = cursor.fetchone()
+        if not row or row[0] < party_size:
+            continue
+        if row[1] == 'Occupied' and starts_at < now + timedelta(minutes=SEATING_MINUTES):
+            continue
+        if find_conflict(cursor, table_number, starts_at, ends_at):
+            continue
+        cursor.execute("""
+            INSERT INTO Reservations (table_number, customer_id, guest_name, phone, party_size, starts_at, ends_at)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (table_number, customer_id, guest_name, phone, party_size, starts_at, ends_at))
+        return cursor.lastrowid, table_number
+    return None
+
+
+def change_reservation_status(cursor, reservation_id, status):
+    """Move a reservation along TRANSITIONS; returns the updated row, or None if not found.
+
+    Raises ValueError for a transition that isn't allowed. Completing a seated
+    reservation early releases the rest of its slot.
+    """
+    row = fetch_reservation(cursor, reservation_id)
+    if not row:
+        return None
+    if status not in TRANSITIONS.get(row[7], ()):
+        raise ValueError(f"Cannot change a {row[7]} reservation to {status}")
+    if status == 'Completed':
+        cursor.execute("""
+            UPDATE Reservations SET status = %s, ends_at = LEAST(ends_at, GREATEST(starts_at, NOW()))
+            WHERE reservation_id = %s
+        """, (status, reservation_id))
+    else:
+        cursor.execute("UPDATE Reservations SET status = %s WHERE reservation_id = %s", (status, reservation_id))
+    return fetch_reservation(cursor, reservation_id)
+
+
+def seated_reservation(cursor, table_number):
+    """Id of the reservation currently seated at table_number, or None"""
+    cursor.execute("""
+        SELECT reservation_id FROM Reservations
+        WHERE table_number = %s AND status = 'Seated'
+        ORDER BY starts_at DESC
+        LIMIT 1
+    """, (table_number,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def mark_no_shows(cursor, grace_minutes=20):
+    """Mark booked reservations whose start passed more than grace_minutes ago as NoShow"""
+    cursor.execute("""
+        UPDATE Reservations SET status = 'NoShow'
+        WHERE status = 'Booked' AND starts_at < NOW() - INTERVAL %s MINUTE
+    """, (grace_minutes,))
+    return cursor.rowcount
+
+
+def seat_order(cursor, table_number, order_id):
+    """Mark a table occupied by order_id unless another order already holds it; returns True if it changed"""
+    cursor.execute("""
+        UPDATE Tables SET status = 'Occupied', current_order_id = %s
+        WHERE table_number = %s AND status <> 'Occupied'
+    """, (order_id, table_number))
+    changed = cursor.rowcount > 0
+    if changed:
+        bump_version(cursor, 'tables')
+    return changed
+
+
+def release_table(cursor, table_number, order_id):
+    """Free a table held by order_id (or by an order from before current_order_id existed)"""
+    cursor.execute("""
+        UPDATE Tables SET status = 'Available', current_order_id = NULL
+        WHERE table_number = %s AND status = 'Occupied'
+          AND (current_order_id = %s OR current_order_id IS NULL)
+    """, (table_number, order_id))
+    changed = cursor.rowcount > 0
+    if changed:
+        bump_version(cursor, 'tables')
+    return changed
+
+
+class AvailabilityIndex:
+    """In-memory index of upcoming reservations per table.
+
+    Bookings made by this process are applied right after they commit; the
+    whole index is reloaded every `ttl` seconds to pick up other processes'
+    changes. It answers availability questions only; book_table() re-checks
+    against the database before writing.
+    """
+
+    def __init__(self, ttl=60, horizon_days=INDEX_HORIZON_DAYS):
+        self.ttl = ttl
+        self.horizon_days = horizon_days
+        self._lock = threading.Lock()
+        # table_number -> sorted [(starts_at, ends_at, reservation_id, status)]
+        self._bookings = {}
+        self._loaded_at = None
+        self._version = 0
+        self._loads = 0
+
+    def ensure_loaded(self, cursor):
+        """Reload from the database if the index is empty or older than ttl"""
+        with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+            version = self._version
+
+        cursor.execute(f"""
+            SELECT table_number, starts_at, ends_at, reservation_id, status FROM Reservations
+            WHERE starts_at < NOW() + INTERVAL %s DAY AND ends_at > NOW()
+              AND status IN ({', '.join(['%s'] * len(HOLDING_STATUSES))})
+            ORDER BY table_number, starts_at
+        """, (self.horizon_days, *HOLDING_STATUSES))
+        bookings = {}
+        for table_number, starts_at, ends_at, reservation_id, status in cursor.fetchall():
+            bookings.setdefault(table_number, []).append((starts_at, ends_at, reservation_id, status))
+
+        with self._lock:
+            self._bookings = bookings
+            self._loads += 1
+            # A change applied while loading may be missing from this snapshot; reload next time
+            self._loaded_at = time.monotonic() if self._version == version else None
+
+    def add(self, table_number, starts_at, ends_at, reservation_id, status='Booked'):
+        with self._lock:
+            self._version += 1
+            bisect.insort(self._bookings.setdefault(table_number, []),
+                          (starts_at, ends_at, reservation_id, status))
+
+    def remove(self, reservation_id):
+        with self._lock:
+            self._version += 1
+            for table_number, bookings in self._bookings.items():
+                self._bookings[table_number] = [b for b in bookings if b[2] != reservation_id]
+
+    def update(self, row):
+        """Apply a reservation row (as returned by fetch_reservation) after its change committed"""
+        self.remove(row[0])
+        if row[7] in HOLDING_STATUSES:
+            self.add(row[1], row[5], row[6], row[0], row[7])
+
+    def invalidate(self):
+        with self._lock:
+            self._version += 1
+            self._loaded_at = None
+
+    def conflict(self, table_number, starts_at, ends_at):
+        """The booking on table_number overlapping [starts_at, ends_at), or None"""
+        with self._lock:
+            bookings = self._bookings.get(table_number, [])
+            # Bookings on one table don't overlap, so the last one starting before ends_at
+            # is the only one that can still be running at starts_at
+            i = bisect.bisect_left(bookings, (ends_at,))
+            if i and bookings[i - 1][1] > starts_at:
+                return bookings[i - 1]
+            return None
+
+    def table_states(self, tables, starts_at, ends_at, now=None):
+        """(table_number, capacity, state) for every table over the window.
+
+        tables are (table_id, table_number, capacity, status) rows. A table that
+        is occupied right now counts as busy for windows starting within
+        SEATING_MINUTES.
+        """
+        now = now or datetime.now()
+        states = []
+        for _, table_number, capacity, status in tables:
+            if status == 'Occupied' and starts_at < now + timedelta(minutes=SEATING_MINUTES):
+                state = 'Occupied'
+            elif self.conflict(table_number, starts_at, ends_at):
+                state = 'Reserved'
+            else:
+                state = 'Available'
+            states.append((table_number, capacity, state))
+        return states
+
+    def best_fit(self, tables, party_size, starts_at, ends_at, now=None):
+        """Free tables that seat party_size, smallest adequate capacity first"""
+        free = [(capacity, table_number)
+                for table_number, capacity, state in self.table_states(tables, starts_at, ends_at, now)
+                if state == 'Available' and capacity >= party_size]
+        return [table_number for _, table_number in sorted(free)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'ttl': self.ttl,
+                'horizon_days': self.horizon_days,
+                'tables': len(self._bookings),
+                'bookings': sum(len(b) for b in self._bookings.values()),
+                'loads': self._loads,
+                'fresh': self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl,
+            }
+
+
+if __name__ == "__main__":
+    import argparse
+    from db_initializer import connect
+
+    parser = argparse.ArgumentParser(description="Reservation maintenance")
+    parser.add_argument('--no-shows', type=int, metavar='MINUTES', default=20,
+                        help="mark bookings more than MINUTES past their start as NoShow")
+    args = parser.parse_args()
+
+    try:
+        connection = connect()
+        cursor = connection.cursor()
+        create_reservation_tables(cursor)
+        marked = mark_no_shows(cursor, args.no_shows)
+        connection.commit()
+        cursor.close()
+        connection.close()
+        print(f"✓ Marked {marked} reservation(s) as no-show")
+    except Error as e:
+        print(f"✗ Reservation maintenance failed: {e}")
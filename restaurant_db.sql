@@ -1,100 +1,255 @@
-drop database restaurant_db;
-create database restaurant_db;
-use restaurant_db;
+-- Generated by `python schema.py`; edit schema.py instead.
+DROP DATABASE IF EXISTS restaurant_db;
+CREATE DATABASE restaurant_db;
+USE restaurant_db;
 
--- Create Customers Table
 CREATE TABLE IF NOT EXISTS Customers (
     customer_id INT AUTO_INCREMENT PRIMARY KEY,
-    name VARCHAR(50) NOT NULL,
-    phone VARCHAR(15) UNIQUE NOT NULL,
-    email VARCHAR(50),
+    name VARCHAR(100) NOT NULL,
+    phone VARCHAR(15) NOT NULL UNIQUE,
+    email VARCHAR(100),
     address TEXT,
-    joined_on DATETIME DEFAULT CURRENT_TIMESTAMP
+    joined_on TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create Menu Table
 CREATE TABLE IF NOT EXISTS Menu (
     item_id INT AUTO_INCREMENT PRIMARY KEY,
-    item_name VARCHAR(50) NOT NULL,
-    category VARCHAR(30) NOT NULL,
-    price DECIMAL(10,2) NOT NULL,
-    is_available BOOLEAN DEFAULT TRUE
+    item_name VARCHAR(100) NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    is_available BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create Tables Table
 CREATE TABLE IF NOT EXISTS Tables (
     table_id INT AUTO_INCREMENT PRIMARY KEY,
-    table_number INT UNIQUE NOT NULL,
+    table_number VARCHAR(10) NOT NULL UNIQUE,
     capacity INT NOT NULL,
-    status VARCHAR(20) DEFAULT 'Available'
+    status ENUM('Available', 'Occupied', 'Reserved') DEFAULT 'Available',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- Create Orders Table
 CREATE TABLE IF NOT EXISTS Orders (
     order_id INT AUTO_INCREMENT PRIMARY KEY,
     customer_id INT NOT NULL,
-    order_date DATETIME DEFAULT CURRENT_TIMESTAMP,
     items JSON NOT NULL,
-    total_amount DECIMAL(10,2) NOT NULL,
-    payment_method VARCHAR(20) NOT NULL,
-    order_status VARCHAR(20) DEFAULT 'Pending',
-    order_type VARCHAR(20) DEFAULT 'Dine-in',
-    table_number INT,
-    discount DECIMAL(5,2) DEFAULT 0,
+    total_amount DECIMAL(10, 2) NOT NULL,
+    discount DECIMAL(5, 2) DEFAULT 0,
+    payment_method ENUM('Cash', 'Card', 'UPI', 'Other') NOT NULL,
+    order_status ENUM('Pending', 'Preparing', 'Completed') DEFAULT 'Pending',
+    order_type ENUM('Dine-in', 'Takeaway', 'Delivery') NOT NULL,
+    table_number VARCHAR(10),
+    order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (customer_id) REFERENCES Customers(customer_id)
-        ON DELETE CASCADE ON UPDATE CASCADE
-);
-
-INSERT INTO Menu (item_name, category, price, is_available) VALUES
--- Starters
-('Paneer Tikka', 'Starters', 180.00, TRUE),
-('Veg Spring Roll', 'Starters', 120.00, TRUE),
-('Chicken Wings', 'Starters', 220.00, TRUE),
-('Fish Fingers', 'Starters', 240.00, TRUE),
-('Mushroom Soup', 'Starters', 150.00, TRUE),
-
--- Main Course
-('Butter Chicken', 'Main Course', 320.00, TRUE),
-('Paneer Butter Masala', 'Main Course', 280.00, TRUE),
-('Dal Makhani', 'Main Course', 200.00, TRUE),
-('Veg Biryani', 'Main Course', 250.00, TRUE),
-('Chicken Biryani', 'Main Course', 300.00, TRUE),
-('Mutton Rogan Josh', 'Main Course', 380.00, TRUE),
-('Fish Curry', 'Main Course', 350.00, TRUE),
-
--- Breads
-('Butter Naan', 'Breads', 50.00, TRUE),
-('Garlic Naan', 'Breads', 60.00, TRUE),
-('Tandoori Roti', 'Breads', 30.00, TRUE),
-('Kulcha', 'Breads', 55.00, TRUE),
-
--- Rice
-('Jeera Rice', 'Rice', 120.00, TRUE),
-('Steam Rice', 'Rice', 100.00, TRUE),
-('Veg Fried Rice', 'Rice', 180.00, TRUE),
-
--- Desserts
-('Gulab Jamun', 'Desserts', 80.00, TRUE),
-('Ice Cream', 'Desserts', 100.00, TRUE),
-('Ras Malai', 'Desserts', 120.00, TRUE),
-('Kulfi', 'Desserts', 90.00, TRUE),
-
--- Beverages
-('Lassi', 'Beverages', 70.00, TRUE),
-('Cold Coffee', 'Beverages', 100.00, TRUE),
-('Fresh Lime Soda', 'Beverages', 60.00, TRUE),
-('Masala Chai', 'Beverages', 40.00, TRUE),
-('Mango Juice', 'Beverages', 80.00, TRUE);
-
-
-INSERT INTO Tables (table_number, capacity, status) VALUES
-(1, 2, 'Available'),
-(2, 2, 'Available'),
-(3, 4, 'Available'),
-(4, 4, 'Available'),
-(5, 6, 'Available'),
-(6, 6, 'Available'),
-(7, 8, 'Available'),
-(8, 4, 'Available'),
-(9, 2, 'Available'),
-(10, 4, 'Available');
\ No newline at end of file
+);
+
+CREATE INDEX idx_orders_status_type_date ON Orders (order_status, order_type, order_date, order_id);
+
+CREATE INDEX idx_orders_status_date ON Orders (order_status, order_date, order_id);
+
+CREATE INDEX idx_orders_type_date ON Orders (order_type, order_date, order_id);
+
+CREATE INDEX idx_orders_date ON Orders (order_date, order_id);
+
+CREATE INDEX idx_customers_name ON Customers (name(32));
+
+CREATE INDEX idx_menu_item_name ON Menu (item_name);
+
+CREATE TABLE IF NOT EXISTS DailyStats (
+    stat_date DATE PRIMARY KEY,
+    order_count INT NOT NULL DEFAULT 0,
+    total_sales DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS OrderStatusCounts (
+    order_status VARCHAR(20) PRIMARY KEY,
+    order_count INT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS OrderItems (
+    order_item_id INT AUTO_INCREMENT PRIMARY KEY,
+    order_id INT NOT NULL,
+    item_id INT,
+    item_name VARCHAR(100) NOT NULL,
+    unit_price DECIMAL(10, 2) NOT NULL,
+    quantity INT NOT NULL DEFAULT 1,
+    INDEX idx_order_items_order (order_id),
+    INDEX idx_order_items_item (item_id, order_id),
+    FOREIGN KEY (order_id) REFERENCES Orders(order_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS SalesHourly (
+    bucket_start DATETIME NOT NULL,
+    payment_method VARCHAR(20) NOT NULL,
+    order_type VARCHAR(20) NOT NULL,
+    order_count INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, payment_method, order_type)
+);
+
+CREATE TABLE IF NOT EXISTS ItemSalesHourly (
+    bucket_start DATETIME NOT NULL,
+    item_name VARCHAR(100) NOT NULL,
+    quantity INT NOT NULL DEFAULT 0,
+    revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (bucket_start, item_name)
+);
+
+CREATE TABLE IF NOT EXISTS ReportState (
+    name VARCHAR(50) PRIMARY KEY,
+    last_order_id INT NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS Reservations (
+    reservation_id INT AUTO_INCREMENT PRIMARY KEY,
+    table_number VARCHAR(10) NOT NULL,
+    customer_id INT NULL,
+    guest_name VARCHAR(100) NOT NULL,
+    phone VARCHAR(15),
+    party_size INT NOT NULL,
+    starts_at DATETIME NOT NULL,
+    ends_at DATETIME NOT NULL,
+    status ENUM('Booked', 'Seated', 'Completed', 'Cancelled', 'NoShow') DEFAULT 'Booked',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (table_number) REFERENCES Tables(table_number) ON UPDATE CASCADE,
+    FOREIGN KEY (customer_id) REFERENCES Customers(customer_id) ON DELETE SET NULL,
+    INDEX idx_reservations_table_time (table_number, starts_at),
+    INDEX idx_reservations_time (starts_at)
+);
+
+ALTER TABLE Tables ADD COLUMN current_order_id INT NULL;
+
+CREATE TABLE IF NOT EXISTS KitchenTickets (
+    ticket_id INT AUTO_INCREMENT PRIMARY KEY,
+    order_id INT NOT NULL,
+    order_item_id INT NOT NULL,
+    station VARCHAR(20) NOT NULL,
+    item_name VARCHAR(100) NOT NULL,
+    quantity INT NOT NULL,
+    status ENUM('Queued', 'Preparing', 'Ready', 'Void') NOT NULL DEFAULT 'Queued',
+    queued_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    FOREIGN KEY (order_id) REFERENCES Orders(order_id) ON DELETE CASCADE,
+    FOREIGN KEY (order_item_id) REFERENCES OrderItems(order_item_id) ON DELETE CASCADE,
+    INDEX idx_tickets_queue (station, status, queued_at),
+    INDEX idx_tickets_order (order_id)
+);
+
+CREATE TABLE IF NOT EXISTS OrderStatusHistory (
+    history_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    order_id INT NOT NULL,
+    ticket_id INT NULL,
+    station VARCHAR(20) NULL,
+    item_name VARCHAR(100) NULL,
+    status VARCHAR(20) NOT NULL,
+    changed_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+    INDEX idx_history_order (order_id, changed_at),
+    INDEX idx_history_ticket (ticket_id, status),
+    INDEX idx_history_status_time (status, changed_at, station)
+);
+
+CREATE TABLE IF NOT EXISTS OrdersArchive (
+    order_id INT PRIMARY KEY,
+    customer_id INT NOT NULL,
+    items JSON NOT NULL,
+    total_amount DECIMAL(10, 2) NOT NULL,
+    discount DECIMAL(5, 2) DEFAULT 0,
+    payment_method ENUM('Cash', 'Card', 'UPI', 'Other') NOT NULL,
+    order_status ENUM('Pending', 'Preparing', 'Completed') NOT NULL,
+    order_type ENUM('Dine-in', 'Takeaway', 'Delivery') NOT NULL,
+    table_number VARCHAR(10),
+    order_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (customer_id) REFERENCES Customers(customer_id),
+    INDEX idx_orders_archive_date (order_date, order_id),
+    INDEX idx_orders_archive_type_date (order_type, order_date, order_id)
+);
+
+CREATE TABLE IF NOT EXISTS OrderItemsArchive (
+    order_item_id INT PRIMARY KEY,
+    order_id INT NOT NULL,
+    item_id INT,
+    item_name VARCHAR(100) NOT NULL,
+    unit_price DECIMAL(10, 2) NOT NULL,
+    quantity INT NOT NULL DEFAULT 1,
+    INDEX idx_order_items_archive_order (order_id),
+    FOREIGN KEY (order_id) REFERENCES OrdersArchive(order_id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS ArchiveState (
+    name VARCHAR(50) PRIMARY KEY,
+    last_order_id INT NOT NULL DEFAULT 0,
+    archived_total BIGINT NOT NULL DEFAULT 0,
+    last_run_orders INT NOT NULL DEFAULT 0,
+    last_run_seconds DECIMAL(10, 2) NULL,
+    last_run_at TIMESTAMP NULL
+);
+
+CREATE TABLE IF NOT EXISTS IdempotencyKeys (
+    idem_key VARCHAR(64) PRIMARY KEY,
+    request_hash CHAR(64) NOT NULL,
+    order_id INT NULL,
+    response JSON NULL,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_idempotency_created (created_at)
+);
+
+CREATE TABLE IF NOT EXISTS DataVersions (
+    name VARCHAR(20) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INT PRIMARY KEY,
+    description VARCHAR(200) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duration_ms INT NULL
+);
+
+INSERT INTO Menu (item_name, category, price) VALUES
+('Paneer Tikka', 'Starters', 180.00),
+('Veg Spring Roll', 'Starters', 120.00),
+('Chicken Wings', 'Starters', 220.00),
+('Fish Fingers', 'Starters', 240.00),
+('Mushroom Soup', 'Starters', 150.00),
+('Butter Chicken', 'Main Course', 320.00),
+('Paneer Butter Masala', 'Main Course', 280.00),
+('Dal Makhani', 'Main Course', 200.00),
+('Dal Tadka', 'Main Course', 150.00),
+('Chicken Curry', 'Main Course', 280.00),
+('Mutton Rogan Josh', 'Main Course', 380.00),
+('Fish Curry', 'Main Course', 350.00),
+('Veg Biryani', 'Rice', 250.00),
+('Chicken Biryani', 'Rice', 300.00),
+('Jeera Rice', 'Rice', 120.00),
+('Veg Fried Rice', 'Rice', 180.00),
+('Butter Naan', 'Breads', 50.00),
+('Garlic Naan', 'Breads', 60.00),
+('Tandoori Roti', 'Breads', 30.00),
+('Butter Roti', 'Breads', 25.00),
+('Gulab Jamun', 'Desserts', 80.00),
+('Ice Cream', 'Desserts', 100.00),
+('Ras Malai', 'Desserts', 120.00),
+('Kulfi', 'Desserts', 90.00),
+('Mango Lassi', 'Beverages', 80.00),
+('Cold Coffee', 'Beverages', 100.00),
+('Fresh Lime Soda', 'Beverages', 60.00),
+('Masala Chai', 'Beverages', 40.00);
+
+INSERT INTO Tables (table_number, capacity) VALUES
+('T1', 2),
+('T2', 2),
+('T3', 4),
+('T4', 4),
+('T5', 4),
+('T6', 6),
+('T7', 6),
+('T8', 8);
+
+INSERT INTO schema_version (version, description) VALUES
+(1, 'Baseline schema'),
+(2, 'Canonical menu categories'),
+(3, 'Idempotency keys for order creation'),
+(4, 'Data version counters for worker caches'),
+(5, 'Orders index for the status-only dashboard filter');
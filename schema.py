@@ -0,0 +1,230 @@
+"""The canonical database schema and sample data.
+
+Both initializer paths use this module. migrations.py applies it to a live
+database. restaurant_db.sql is generated from the same calls:
+
+    python schema.py > restaurant_db.sql
+"""
+import textwrap
+
+from dashboard_stats import create_stats_tables
+from order_items import create_order_items_table
+from reports import create_report_tables
+from reservations import create_reservation_tables
+from kitchen import create_kitchen_tables
+from archive import create_archive_tables
+from idempotency import create_idempotency_table
+from data_versions import create_versions_table, bump_version
+
+CORE_TABLES = [
+    ('Customers', """
+        CREATE TABLE IF NOT EXISTS Customers (
+            customer_id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            phone VARCHAR(15) NOT NULL UNIQUE,
+            email VARCHAR(100),
+            address TEXT,
+            joined_on TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    ('Menu', """
+        CREATE TABLE IF NOT EXISTS Menu (
+            item_id INT AUTO_INCREMENT PRIMARY KEY,
+            item_name VARCHAR(100) NOT NULL,
+            category VARCHAR(50) NOT NULL,
+            price DECIMAL(10, 2) NOT NULL,
+            is_available BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    ('Tables', """
+        CREATE TABLE IF NOT EXISTS Tables (
+            table_id INT AUTO_INCREMENT PRIMARY KEY,
+            table_number VARCHAR(10) NOT NULL UNIQUE,
+            capacity INT NOT NULL,
+            status ENUM('Available', 'Occupied', 'Reserved') DEFAULT 'Available',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """),
+    ('Orders', """
+        CREATE TABLE IF NOT EXISTS Orders (
+            order_id INT AUTO_INCREMENT PRIMARY KEY,
+            customer_id INT NOT NULL,
+            items JSON NOT NULL,
+            total_amount DECIMAL(10, 2) NOT NULL,
+            discount DECIMAL(5, 2) DEFAULT 0,
+            payment_method ENUM('Cash', 'Card', 'UPI', 'Other') NOT NULL,
+            order_status ENUM('Pending', 'Preparing', 'Completed') DEFAULT 'Pending',
+            order_type ENUM('Dine-in', 'Takeaway', 'Delivery') NOT NULL,
+            table_number VARCHAR(10),
+            order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES Customers(customer_id)
+        )
+    """),
+]
+
+INDEXES = [
+    # Dashboard order list filtered by status and/or type, newest first
+    ('Orders', 'idx_orders_status_type_date', 'order_status, order_type, order_date, order_id'),
+    # Status-only filter (order_type=All): the index above can't return those rows in date order
+    ('Orders', 'idx_orders_status_date', 'order_status, order_date, order_id'),
+    ('Orders', 'idx_orders_type_date', 'order_type, order_date, order_id'),
+    ('Orders', 'idx_orders_date', 'order_date, order_id'),
+    # Customer typeahead: name prefix search (phone already has a UNIQUE key)
+    ('Customers', 'idx_customers_name', 'name(32)'),
+    # Menu imports match rows by name
+    ('Menu', 'idx_menu_item_name', 'item_name'),
+]
+
+# Menu categories, in display order. Imports map the aliases onto these names.
+CATEGORIES = ('Starters', 'Main Course', 'Rice', 'Breads', 'Desserts', 'Beverages')
+CATEGORY_ALIASES = {
+    'appetizer': 'Starters',
+    'appetizers': 'Starters',
+    'starter': 'Starters',
+    'main': 'Main Course',
+    'mains': 'Main Course',
+    'bread': 'Breads',
+    'dessert': 'Desserts',
+    'beverage': 'Beverages',
+    'drinks': 'Beverages',
+}
+
+SAMPLE_MENU = [
+    ('Paneer Tikka', 'Starters', 180.00),
+    ('Veg Spring Roll', 'Starters', 120.00),
+    ('Chicken Wings', 'Starters', 220.00),
+    ('Fish Fingers', 'Starters', 240.00),
+    ('Mushroom Soup', 'Starters', 150.00),
+    ('Butter Chicken', 'Main Course', 320.00),
+    ('Paneer Butter Masala', 'Main Course', 280.00),
+    ('Dal Makhani', 'Main Course', 200.00),
+    ('Dal Tadka', 'Main Course', 150.00),
+    ('Chicken Curry', 'Main Course', 280.00),
+    ('Mutton Rogan Josh', 'Main Course', 380.00),
+    ('Fish Curry', 'Main Course', 350.00),
+    ('Veg Biryani', 'Rice', 250.00),
+    ('Chicken Biryani', 'Rice', 300.00),
+    ('Jeera Rice', 'Rice', 120.00),
+    ('Veg Fried Rice', 'Rice', 180.00),
+    ('Butter Naan', 'Breads', 50.00),
+    ('Garlic Naan', 'Breads', 60.00),
+    ('Tandoori Roti', 'Breads', 30.00),
+    ('Butter Roti', 'Breads', 25.00),
+    ('Gulab Jamun', 'Desserts', 80.00),
+    ('Ice Cream', 'Desserts', 100.00),
+    ('Ras Malai', 'Desserts', 120.00),
+    ('Kulfi', 'Desserts', 90.00),
+    ('Mango Lassi', 'Beverages', 80.00),
+    ('Cold Coffee', 'Beverages', 100.00),
+    ('Fresh Lime Soda', 'Beverages', 60.00),
+    ('Masala Chai', 'Beverages', 40.00),
+]
+
+SAMPLE_TABLES = [
+    ('T1', 2), ('T2', 2), ('T3', 4), ('T4', 4),
+    ('T5', 4), ('T6', 6), ('T7', 6), ('T8', 8),
+]
+
+
+def create_index(cursor, table, index_name, columns):
+    """Create one secondary index unless it already exists"""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+    """, (table, index_name))
+    if cursor.fetchone()[0] == 0:
+        cursor.execute(f"CREATE INDEX {index_name} ON {table} ({columns})")
+
+
+def create_indexes(cursor):
+    """Create any missing secondary indexes"""
+    for table, index_name, columns in INDEXES:
+        create_index(cursor, table, index_name, columns)
+
+
+def create_schema(cursor):
+    """Create every table and index that is missing (safe to run on an existing database)"""
+    for _, ddl in CORE_TABLES:
+        cursor.execute(ddl)
+    create_indexes(cursor)
+    create_stats_tables(cursor)
+    create_order_items_table(cursor)
+    create_report_tables(cursor)
+    create_reservation_tables(cursor)
+    create_kitchen_tables(cursor)
+    create_archive_tables(cursor)
+    create_idempotency_table(cursor)
+    create_versions_table(cursor)
+
+
+def normalize_categories(cursor):
+    """Rename menu categories that use an alias to their canonical name"""
+    renamed = 0
+    for alias, canonical in CATEGORY_ALIASES.items():
+        # LOWER() because '=' is case-insensitive on MySQL but not on SQLite
+        cursor.execute("UPDATE Menu SET category = %s WHERE LOWER(category) = %s", (canonical, alias))
+        renamed += cursor.rowcount
+    if renamed:
+        bump_version(cursor, 'menu')
+
+
+def insert_sample_data(cursor):
+    """Add the sample menu and tables to an empty database"""
+    cursor.execute("SELECT COUNT(*) FROM Menu")
+    if cursor.fetchone()[0] == 0:
+        cursor.executemany("INSERT INTO Menu (item_name, category, price) VALUES (%s, %s, %s)", SAMPLE_MENU)
+    cursor.execute("SELECT COUNT(*) FROM Tables")
+    if cursor.fetchone()[0] == 0:
+        cursor.executemany("INSERT INTO Tables (table_number, capacity) VALUES (%s, %s)", SAMPLE_TABLES)
+
+
+class _RecordingCursor:
+    """Collects DDL instead of executing it; every existence check reports 'missing'"""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        statement = textwrap.dedent(statement).strip()
+        if not statement.upper().startswith('SELECT'):
+            self.statements.append(statement)
+
+    def fetchone(self):
+        return (0,)
+
+
+def _sql_literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return f"{value:.2f}" if isinstance(value, float) else str(value)
+
+
+def dump_sql(db_name='restaurant_db'):
+    """The schema and sample data as a MySQL script, recorded as fully migrated"""
+    from migrations import MIGRATIONS, create_version_table
+
+    recorder = _RecordingCursor()
+    create_schema(recorder)
+    create_version_table(recorder)
+    lines = [
+        "-- Generated by `python schema.py`; edit schema.py instead.",
+        f"DROP DATABASE IF EXISTS {db_name};",
+        f"CREATE DATABASE {db_name};",
+        f"USE {db_name};",
+        "",
+    ]
+    for statement in recorder.statements:
+        lines += [statement + ";", ""]
+    menu = ",\n".join(f"({', '.join(_sql_literal(v) for v in row)})" for row in SAMPLE_MENU)
+    tables = ",\n".join(f"({', '.join(_sql_literal(v) for v in row)})" for row in SAMPLE_TABLES)
+    lines += [f"INSERT INTO Menu (item_name, category, price) VALUES\n{menu};", ""]
+    lines += [f"INSERT INTO Tables (table_number, capacity) VALUES\n{tables};", ""]
+    versions = ",\n".join(f"({version}, {_sql_literal(description)})" for version, description, _ in MIGRATIONS)
+    lines += [f"INSERT INTO schema_version (version, description) VALUES\n{versions};"]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    from db_initializer import DB_NAME
+    print(dump_sql(DB_NAME), end='')
@@ -0,0 +1,229 @@
+"""The schema as of the first versioned release, frozen for migration 1.
+
+schema.py keeps changing, but what migration 1 creates must not: a database
+at version 1 has exactly these tables, indexes and columns, and every later
+change arrives through its own migration. Never edit this module; change
+schema.py and append a migration instead.
+"""
+
+BASELINE_TABLES = [
+    """
+        CREATE TABLE IF NOT EXISTS Customers (
+            customer_id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            phone VARCHAR(15) NOT NULL UNIQUE,
+            email VARCHAR(100),
+            address TEXT,
+            joined_on TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS Menu (
+            item_id INT AUTO_INCREMENT PRIMARY KEY,
+            item_name VARCHAR(100) NOT NULL,
+            category VARCHAR(50) NOT NULL,
+            price DECIMAL(10, 2) NOT NULL,
+            is_available BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS Tables (
+            table_id INT AUTO_INCREMENT PRIMARY KEY,
+            table_number VARCHAR(10) NOT NULL UNIQUE,
+            capacity INT NOT NULL,
+            status ENUM('Available', 'Occupied', 'Reserved') DEFAULT 'Available',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS Orders (
+            order_id INT AUTO_INCREMENT PRIMARY KEY,
+            customer_id INT NOT NULL,
+            items JSON NOT NULL,
+            total_amount DECIMAL(10, 2) NOT NULL,
+            discount DECIMAL(5, 2) DEFAULT 0,
+            payment_method ENUM('Cash', 'Card', 'UPI', 'Other') NOT NULL,
+            order_status ENUM('Pending', 'Preparing', 'Completed') DEFAULT 'Pending',
+            order_type ENUM('Dine-in', 'Takeaway', 'Delivery') NOT NULL,
+            table_number VARCHAR(10),
+            order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES Customers(customer_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS DailyStats (
+            stat_date DATE PRIMARY KEY,
+            order_count INT NOT NULL DEFAULT 0,
+            total_sales DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS OrderStatusCounts (
+            order_status VARCHAR(20) PRIMARY KEY,
+            order_count INT NOT NULL DEFAULT 0
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS OrderItems (
+            order_item_id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT NOT NULL,
+            item_id INT,
+            item_name VARCHAR(100) NOT NULL,
+            unit_price DECIMAL(10, 2) NOT NULL,
+            quantity INT NOT NULL DEFAULT 1,
+            INDEX idx_order_items_order (order_id),
+            INDEX idx_order_items_item (item_id, order_id),
+            FOREIGN KEY (order_id) REFERENCES Orders(order_id) ON DELETE CASCADE
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS SalesHourly (
+            bucket_start DATETIME NOT NULL,
+            payment_method VARCHAR(20) NOT NULL,
+            order_type VARCHAR(20) NOT NULL,
+            order_count INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket_start, payment_method, order_type)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS ItemSalesHourly (
+            bucket_start DATETIME NOT NULL,
+            item_name VARCHAR(100) NOT NULL,
+            quantity INT NOT NULL DEFAULT 0,
+            revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket_start, item_name)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS ReportState (
+            name VARCHAR(50) PRIMARY KEY,
+            last_order_id INT NOT NULL DEFAULT 0,
+            refreshed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS Reservations (
+            reservation_id INT AUTO_INCREMENT PRIMARY KEY,
+            table_number VARCHAR(10) NOT NULL,
+            customer_id INT NULL,
+            guest_name VARCHAR(100) NOT NULL,
+            phone VARCHAR(15),
+            party_size INT NOT NULL,
+            starts_at DATETIME NOT NULL,
+            ends_at DATETIME NOT NULL,
+            status ENUM('Booked', 'Seated', 'Completed', 'Cancelled', 'NoShow') DEFAULT 'Booked',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (table_number) REFERENCES Tables(table_number) ON UPDATE CASCADE,
+            FOREIGN KEY (customer_id) REFERENCES Customers(customer_id) ON DELETE SET NULL,
+            INDEX idx_reservations_table_time (table_number, starts_at),
+            INDEX idx_reservations_time (starts_at)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS KitchenTickets (
+            ticket_id INT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT NOT NULL,
+            order_item_id INT NOT NULL,
+            station VARCHAR(20) NOT NULL,
+            item_name VARCHAR(100) NOT NULL,
+            quantity INT NOT NULL,
+            status ENUM('Queued', 'Preparing', 'Ready', 'Void') NOT NULL DEFAULT 'Queued',
+            queued_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+            FOREIGN KEY (order_id) REFERENCES Orders(order_id) ON DELETE CASCADE,
+            FOREIGN KEY (order_item_id) REFERENCES OrderItems(order_item_id) ON DELETE CASCADE,
+            INDEX idx_tickets_queue (station, status, queued_at),
+            INDEX idx_tickets_order (order_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS OrderStatusHistory (
+            history_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            order_id INT NOT NULL,
+            ticket_id INT NULL,
+            station VARCHAR(20) NULL,
+            item_name VARCHAR(100) NULL,
+            status VARCHAR(20) NOT NULL,
+            changed_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+            INDEX idx_history_order (order_id, changed_at),
+            INDEX idx_history_ticket (ticket_id, status),
+            INDEX idx_history_status_time (status, changed_at, station)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS OrdersArchive (
+            order_id INT PRIMARY KEY,
+            customer_id INT NOT NULL,
+            items JSON NOT NULL,
+            total_amount DECIMAL(10, 2) NOT NULL,
+            discount DECIMAL(5, 2) DEFAULT 0,
+            payment_method ENUM('Cash', 'Card', 'UPI', 'Other') NOT NULL,
+            order_status ENUM('Pending', 'Preparing', 'Completed') NOT NULL,
+            order_type ENUM('Dine-in', 'Takeaway', 'Delivery') NOT NULL,
+            table_number VARCHAR(10),
+            order_date TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (customer_id) REFERENCES Customers(customer_id),
+            INDEX idx_orders_archive_date (order_date, order_id),
+            INDEX idx_orders_archive_type_date (order_type, order_date, order_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS OrderItemsArchive (
+            order_item_id INT PRIMARY KEY,
+            order_id INT NOT NULL,
+            item_id INT,
+            item_name VARCHAR(100) NOT NULL,
+            unit_price DECIMAL(10, 2) NOT NULL,
+            quantity INT NOT NULL DEFAULT 1,
+            INDEX idx_order_items_archive_order (order_id),
+            FOREIGN KEY (order_id) REFERENCES OrdersArchive(order_id) ON DELETE CASCADE
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS ArchiveState (
+            name VARCHAR(50) PRIMARY KEY,
+            last_order_id INT NOT NULL DEFAULT 0,
+            archived_total BIGINT NOT NULL DEFAULT 0,
+            last_run_orders INT NOT NULL DEFAULT 0,
+            last_run_seconds DECIMAL(10, 2) NULL,
+            last_run_at TIMESTAMP NULL
+        )
+    """,
+]
+
+# (table, index_name, columns) created outside CREATE TABLE
+BASELINE_INDEXES = [
+    ('Orders', 'idx_orders_status_type_date', 'order_status, order_type, order_date, order_id'),
+    ('Orders', 'idx_orders_type_date', 'order_type, order_date, order_id'),
+    ('Orders', 'idx_orders_date', 'order_date, order_id'),
+    ('Customers', 'idx_customers_name', 'name(32)'),
+    ('Menu', 'idx_menu_item_name', 'item_name'),
+]
+
+# (table, column, definition) added to tables that predate the release
+BASELINE_COLUMNS = [
+    ('Tables', 'current_order_id', 'INT NULL'),
+]
+
+
+def create_baseline(cursor):
+    """Create whatever part of the baseline schema is missing (safe on a partly created database)"""
+    for ddl in BASELINE_TABLES:
+        cursor.execute(ddl)
+    for table, column, definition in BASELINE_COLUMNS:
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.columns
+            WHERE table_schema = DATABASE() AND table_name = %s AND column_name = %s
+        """, (table, column))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    for table, index_name, columns in BASELINE_INDEXES:
+        cursor.execute("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+        """, (table, index_name))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(f"CREATE INDEX {index_name} ON {table} ({columns})")
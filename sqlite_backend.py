@@ -0,0 +1,487 @@
+"""Embedded SQLite engine behind the mysql.connector connection/cursor interface.
+
+Selected with DB_BACKEND=sqlite, for local runs, tests and benchmarks that
+have no MySQL server. The modules keep writing MySQL: each distinct statement
+is rewritten for SQLite once and the result cached. A given query therefore
+always reaches sqlite3 as the same text, and its statement cache reuses the
+prepared statement. The rewrites:
+
+- %s placeholders, INSERT IGNORE, ON DUPLICATE KEY UPDATE, DELETE ... LIMIT,
+  `expr +/- INTERVAL n UNIT`, TIMESTAMPDIFF units, GROUP_CONCAT ... SEPARATOR
+  and information_schema lookups
+- FOR UPDATE is dropped; the statement first takes the database write lock
+  (BEGIN IMMEDIATE), which is what the row lock protected
+- CREATE TABLE: AUTO_INCREMENT, ENUM, JSON, DATETIME(3), local-time defaults
+  and inline INDEX clauses (created as separate indexes)
+
+MySQL functions the queries use (NOW, CURDATE, DATE_FORMAT, CONCAT, LEAST,
+GET_LOCK, ...) are registered as SQL functions. The database runs in WAL
+mode, so dashboard reads never wait for an order being written; writers are
+serialized by the database lock. Errors are raised as mysql.connector errors
+with the matching MySQL errno, so callers handle both engines alike.
+"""
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from functools import lru_cache
+
+from mysql.connector import errorcode, errors
+
+STATEMENT_CACHE_SIZE = 256
+# Seconds a writer waits for the database lock before failing
+BUSY_TIMEOUT = 30
+CENT = Decimal('0.01')
+
+# Aggregate ORDER BY arrived in SQLite 3.44; before that group_concat keeps scan order
+AGGREGATE_ORDER_BY = sqlite3.sqlite_version_info >= (3, 44, 0)
+
+# MySQL DATE_FORMAT specifiers that differ from strftime
+DATE_FORMAT_CODES = {'i': '%M', 's': '%S', 'M': '%B', 'W': '%A'}
+INTERVAL_UNITS = {
+    'MICROSECOND': timedelta(microseconds=1),
+    'SECOND': timedelta(seconds=1),
+    'MINUTE': timedelta(minutes=1),
+    'HOUR': timedelta(hours=1),
+    'DAY': timedelta(days=1),
+    'WEEK': timedelta(weeks=1),
+}
+
+# Views standing in for the information_schema lookups that schema setup runs
+CATALOG_VIEWS = [
+    """CREATE TEMP VIEW information_schema_tables AS
+       SELECT 'main' AS table_schema, name AS table_name
+       FROM main.sqlite_master WHERE type = 'table'""",
+    """CREATE TEMP VIEW information_schema_columns AS
+       SELECT 'main' AS table_schema, m.name AS table_name, c.name AS column_name
+       FROM main.sqlite_master m JOIN pragma_table_info(m.name, 'main') c
+       WHERE m.type = 'table'""",
+    """CREATE TEMP VIEW information_schema_statistics AS
+       SELECT 'main' AS table_schema, tbl_name AS table_name, name AS index_name
+       FROM main.sqlite_master WHERE type = 'index'""",
+]
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_MASKED = re.compile(r"\x00(\d+)\x00")
+_OPERAND = r"NOW\(\d*\)|CURDATE\(\)|\?|[\w.]+"
+_INTERVAL = re.compile(rf"({_OPERAND})\s*([-+])\s*INTERVAL\s+(\?|\d+|\w+\([\w.]+\))\s+({'|'.join(INTERVAL_UNITS)})\b",
+                       re.IGNORECASE)
+_DELETE_LIMIT = re.compile(r"^\s*DELETE\s+FROM\s+(\w+)\s+(WHERE\s.*?)\s+LIMIT\s+(\?|\d+)\s*$", re.IGNORECASE | re.S)
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\((.*)\)\s*$", re.IGNORECASE | re.S)
+_CREATE_INDEX = re.compile(r"^\s*CREATE\s+(UNIQUE\s+)?INDEX\s+(\w+)\s+ON\s+(\w+)\s*\((.*)\)\s*$", re.IGNORECASE | re.S)
+_INLINE_INDEX = re.compile(r"^(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*\((.*)\)$", re.IGNORECASE | re.S)
+
+_named_locks = {}
+_named_locks_guard = threading.Lock()
+
+
+def _adapt_datetime(value):
+    return value.isoformat(' ')
+
+
+def _to_datetime(raw):
+    return datetime.fromisoformat(raw.decode())
+
+
+def _to_date(raw):
+    return date.fromisoformat(raw.decode()[:10])
+
+
+def _to_decimal(raw):
+    return Decimal(raw.decode()).quantize(CENT)
+
+
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_converter('TIMESTAMP', _to_datetime)
+sqlite3.register_converter('DATETIME', _to_datetime)
+sqlite3.register_converter('DATE', _to_date)
+sqlite3.register_converter('DECIMAL', _to_decimal)
+
+
+# SQL functions
+
+def _parse_time(value):
+    """A stored date/datetime string as (datetime, is_date_only)"""
+    text = str(value)
+    return datetime.fromisoformat(text), len(text) == 10
+
+
+def _format_time(value, date_only=False):
+    if date_only:
+        return value.date().isoformat()
+    return value.isoformat(' ', 'microseconds' if value.microsecond else 'seconds')
+
+
+def _now(fsp=0):
+    now = datetime.now()
+    return now.isoformat(' ', 'milliseconds' if fsp else 'seconds')
+
+
+def _curdate():
+    return date.today().isoformat()
+
+
+def _date_add(value, amount, unit):
+    if value is None or amount is None:
+        return None
+    moment, date_only = _parse_time(value)
+    moment += INTERVAL_UNITS[unit.upper()] * amount
+    return _format_time(moment, date_only and unit.upper() in ('DAY', 'WEEK'))
+
+
+def _date_format(value, fmt):
+    if value is None:
+        return None
+    moment, _ = _parse_time(value)
+    return moment.strftime(re.sub(r"%(.)", lambda m: DATE_FORMAT_CODES.get(m.group(1), m.group(0)), fmt))
+
+
+def _weekday(value):
+    return None if value is None else _parse_time(value)[0].weekday()
+
+
+def _timestampdiff(unit, start, end):
+    if start is None or end is None:
+        return None
+    delta = _parse_time(end)[0] - _parse_time(start)[0]
+    return int(delta / INTERVAL_UNITS[unit.upper()])
+
+
+def _concat(*values):
+    if any(v is None for v in values):
+        return None
+    # Floats only come from DECIMAL(.., 2) columns, which MySQL prints with two places
+    return ''.join(f"{v:.2f}" if isinstance(v, float) else str(v) for v in values)
+
+
+def _least(*values):
+    return None if any(v is None for v in values) else min(values)
+
+
+def _greatest(*values):
+    return None if any(v is None for v in values) else max(values)
+
+
+def _get_lock(name, timeout):
+    """Named lock shared by the connections of this process (SQLite has no server to hold it)"""
+    with _named_locks_guard:
+        lock = _named_locks.setdefault(name, threading.Lock())
+    return 1 if lock.acquire(timeout=timeout if timeout is not None and timeout >= 0 else -1) else 0
+
+
+def _release_lock(name):
+    lock = _named_locks.get(name)
+    if lock is None or not lock.locked():
+        return None
+    lock.release()
+    return 1
+
+
+FUNCTIONS = [
+    ('NOW', -1, _now, False),
+    ('CURDATE', 0, _curdate, False),
+    ('DATE_ADD', 3, _date_add, True),
+    ('DATE_FORMAT', 2, _date_format, True),
+    ('WEEKDAY', 1, _weekday, True),
+    ('TIMESTAMPDIFF', 3, _timestampdiff, True),
+    ('CONCAT', -1, _concat, True),
+    ('LEAST', -1, _least, True),
+    ('GREATEST', -1, _greatest, True),
+    ('DATABASE', 0, lambda: 'main', True),
+    ('GET_LOCK', 2, _get_lock, False),
+    ('RELEASE_LOCK', 1, _release_lock, False),
+]
+
+
+# Statement translation
+
+def _mask_literals(statement):
+    literals = []
+
+    def mask(match):
+        literals.append(match.group(0))
+        return f"\x00{len(literals) - 1}\x00"
+    return _LITERAL.sub(mask, statement), literals
+
+
+def _unmask_literals(statement, literals):
+    return _MASKED.sub(lambda m: literals[int(m.group(1))], statement)
+
+
+def _closing_paren(text, start):
+    """Index of the parenthesis closing the one opened just before start"""
+    depth = 1
+    for i in range(start, len(text)):
+        if text[i] == '(':
+            depth += 1
+        elif text[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError("Unbalanced parentheses")
+
+
+def _split_top_level(text, separator=','):
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(text):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts]
+
+
+def _top_level_keyword(text, keyword):
+    """Position of keyword outside any parentheses, or -1"""
+    depth = 0
+    for match in re.finditer(rf"[()]|\b{keyword}\b", text, re.IGNORECASE):
+        if match.group(0) == '(':
+            depth += 1
+        elif match.group(0) == ')':
+            depth -= 1
+        elif depth == 0:
+            return match.start()
+    return -1
+
+
+def _rewrite_group_concat(statement):
+    """GROUP_CONCAT(expr ORDER BY ... SEPARATOR 'x') -> group_concat(expr, 'x' [ORDER BY ...])"""
+    pos = 0
+    while True:
+        match = re.compile(r"\bGROUP_CONCAT\s*\(", re.IGNORECASE).search(statement, pos)
+        if not match:
+            return statement
+        end = _closing_paren(statement, match.end())
+        args = statement[match.end():end]
+        separator = "','"
+        cut = _top_level_keyword(args, 'SEPARATOR')
+        if cut >= 0:
+            separator = args[cut + len('SEPARATOR'):].strip()
+            args = args[:cut]
+        order_by = ''
+        cut = _top_level_keyword(args, 'ORDER BY')
+        if cut >= 0:
+            order_by = ' ' + args[cut:].strip() if AGGREGATE_ORDER_BY else ''
+            args = args[:cut]
+        replacement = f"group_concat({args.strip()}, {separator}{order_by})"
+        statement = statement[:match.start()] + replacement + statement[end + 1:]
+        pos = match.start() + len(replacement)
+
+
+def _create_table(statement):
+    """A MySQL CREATE TABLE as SQLite statements: the table, then its inline indexes"""
+    match = _CREATE_TABLE.match(statement)
+    if_not_exists, table, body = match.group(1) or '', match.group(2), match.group(3)
+    columns, indexes = [], []
+    for definition in _split_top_level(body):
+        index = _INLINE_INDEX.match(definition)
+        if index:
+            unique = 'UNIQUE ' if index.group(1) else ''
+            indexes.append(f"CREATE {unique}INDEX IF NOT EXISTS {index.group(2)} ON {table} ({index.group(3)})")
+            continue
+        definition = re.sub(r"\b(?:BIG)?INT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", "INTEGER PRIMARY KEY AUTOINCREMENT",
+                            definition, flags=re.IGNORECASE)
+        definition = re.sub(r"^(\w+)\s+ENUM\s*\((.*?)\)", r"\1 TEXT CHECK (\1 IN (\2))", definition,
+                            flags=re.IGNORECASE)
+        # REAL affinity keeps money as floats; the DECIMAL converter turns them back into Decimals
+        definition = re.sub(r"\bDECIMAL\s*\(\s*\d+\s*,\s*\d+\s*\)", "DECIMAL REAL", definition, flags=re.IGNORECASE)
+        definition = re.sub(r"\bJSON\b", "TEXT", definition, flags=re.IGNORECASE)
+        definition = re.sub(r"\bDATETIME\(\d\)", "DATETIME", definition, flags=re.IGNORECASE)
+        definition = re.sub(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP(\(\d\))?", "", definition, flags=re.IGNORECASE)
+        # MySQL defaults use the session's local time; SQLite's CURRENT_TIMESTAMP is UTC
+        definition = re.sub(r"\bDEFAULT\s+CURRENT_TIMESTAMP\(\d\)",
+                            "DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))", definition,
+                            flags=re.IGNORECASE)
+        definition = re.sub(r"\bDEFAULT\s+CURRENT_TIMESTAMP\b", "DEFAULT (datetime('now', 'localtime'))", definition,
+                            flags=re.IGNORECASE)
+        columns.append(definition)
+    body = ",\n    ".join(columns)
+    return [f"CREATE TABLE {if_not_exists}{table} (\n    {body}\n)"] + indexes
+
+
+@lru_cache(maxsize=1024)
+def translate(statement):
+    """MySQL statement -> (SQLite statements, takes_write_lock)"""
+    masked, literals = _mask_literals(statement)
+
+    if _CREATE_TABLE.match(masked):
+        return tuple(_unmask_literals(s, literals) for s in _create_table(masked)), False
+    index = _CREATE_INDEX.match(masked)
+    if index:
+        # Drop prefix lengths such as name(32)
+        masked = masked[:index.start(4)] + re.sub(r"(\w)\s*\(\d+\)", r"\1", index.group(4)) + masked[index.end(4):]
+
+    masked = masked.replace('%s', '?')
+    takes_lock = bool(re.search(r"\bFOR\s+UPDATE\b", masked, re.IGNORECASE))
+    masked = re.sub(r"\s+FOR\s+UPDATE\b", "", masked, flags=re.IGNORECASE)
+    masked = re.sub(r"\bINSERT\s+IGNORE\b", "INSERT OR IGNORE", masked, flags=re.IGNORECASE)
+    upsert = re.search(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b", masked, re.IGNORECASE)
+    if upsert:
+        assignments = re.sub(r"\bVALUES\s*\((\w+)\)", r"excluded.\1", masked[upsert.end():], flags=re.IGNORECASE)
+        masked = masked[:upsert.start()] + "ON CONFLICT DO UPDATE SET" + assignments
+    masked = _INTERVAL.sub(lambda m: f"DATE_ADD({m.group(1)}, {m.group(2)}({m.group(3)}), '{m.group(4).upper()}')",
+                           masked)
+    masked = re.sub(r"\bTIMESTAMPDIFF\s*\(\s*(\w+)\s*,", r"TIMESTAMPDIFF('\1',", masked, flags=re.IGNORECASE)
+    masked = re.sub(r"\bIF\s*\(", "IIF(", masked, flags=re.IGNORECASE)
+    masked = re.sub(r"\binformation_schema\.(\w+)", r"information_schema_\1", masked, flags=re.IGNORECASE)
+    masked = _rewrite_group_concat(masked)
+    delete = _DELETE_LIMIT.match(masked)
+    if delete:
+        table, where, limit = delete.groups()
+        masked = f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} {where} LIMIT {limit})"
+    return (_unmask_literals(masked, literals),), takes_lock
+
+
+def statement_stats():
+    info = translate.cache_info()
+    return {'translated': info.currsize, 'hits': info.hits, 'misses': info.misses}
+
+
+# Errors
+
+def _mysql_error(e):
+    """The mysql.connector error a MySQL server would have raised for a sqlite3 error"""
+    msg = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        if msg.startswith('UNIQUE') or msg.startswith('PRIMARY KEY'):
+            return errors.IntegrityError(msg=f"Duplicate entry ({msg})", errno=errorcode.ER_DUP_ENTRY)
+        if msg.startswith('FOREIGN KEY'):
+            return errors.IntegrityError(msg=f"Cannot add, update or delete a row: a foreign key constraint fails "
+                                             f"({msg})", errno=errorcode.ER_NO_REFERENCED_ROW_2)
+        if msg.startswith('NOT NULL'):
+            return errors.IntegrityError(msg=msg, errno=errorcode.ER_BAD_NULL_ERROR)
+        return errors.IntegrityError(msg=msg)
+    if isinstance(e, sqlite3.OperationalError):
+        missing = re.match(r"no such table: (\S+)", msg)
+        if missing:
+            return errors.ProgrammingError(msg=f"Table '{missing.group(1)}' doesn't exist",
+                                           errno=errorcode.ER_NO_SUCH_TABLE)
+        if 'database is locked' in msg:
+            return errors.OperationalError(msg=msg, errno=errorcode.ER_LOCK_WAIT_TIMEOUT)
+        return errors.OperationalError(msg=msg)
+    if isinstance(e, sqlite3.ProgrammingError):
+        return errors.ProgrammingError(msg=msg)
+    return errors.DatabaseError(msg=msg)
+
+
+# Connection and cursor
+
+class SqliteCursor:
+    """The parts of the mysql.connector cursor API the app uses, over a sqlite3 cursor"""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._cursor = connection._raw.cursor()
+        self.lastrowid = None
+        self.rowcount = -1
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def execute(self, operation, params=None):
+        statements, takes_lock = translate(operation)
+        try:
+            if takes_lock and not self._connection._raw.in_transaction:
+                self._cursor.execute("BEGIN IMMEDIATE")
+            self._cursor.execute(statements[0], params or ())
+            for statement in statements[1:]:
+                self._cursor.execute(statement)
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+        self.lastrowid = self._cursor.lastrowid
+        self.rowcount = self._cursor.rowcount
+
+    def executemany(self, operation, seq_params):
+        statement = translate(operation)[0][0]
+        rows = list(seq_params)
+        try:
+            self._cursor.executemany(statement, rows)
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+        self.rowcount = self._cursor.rowcount
+        if rows and statement.lstrip().upper().startswith('INSERT'):
+            # As for a MySQL multi-row INSERT: the id of the first row
+            last_id = self._connection._raw.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self.lastrowid = last_id - len(rows) + 1
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def close(self):
+        self._cursor.close()
+
+
+class SqliteConnection:
+    """The parts of the mysql.connector connection API the app uses, over a sqlite3 connection"""
+
+    def __init__(self, raw):
+        self._raw = raw
+
+    def cursor(self, buffered=None, **kwargs):
+        # sqlite3 cursors step through results lazily, so buffered=False needs nothing extra
+        return SqliteCursor(self)
+
+    def commit(self):
+        try:
+            self._raw.commit()
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def rollback(self):
+        try:
+            self._raw.rollback()
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        try:
+            self._raw.execute("SELECT 1").fetchone()
+        except sqlite3.Error as e:
+            raise _mysql_error(e) from e
+
+    def is_connected(self):
+        try:
+            self.ping()
+            return True
+        except errors.Error:
+            return False
+
+    def close(self):
+        self._raw.close()
+
+
+def connect(path, statement_cache=STATEMENT_CACHE_SIZE, busy_timeout=BUSY_TIMEOUT):
+    """Open the SQLite database at path (created if missing) in WAL mode"""
+    try:
+        # IMMEDIATE: a transaction takes the write lock when it starts, instead of
+        # failing to upgrade a read snapshot that another writer has moved past
+        raw = sqlite3.connect(path, timeout=busy_timeout, detect_types=sqlite3.PARSE_DECLTYPES,
+                              isolation_level='IMMEDIATE', check_same_thread=False,
+                              cached_statements=statement_cache)
+        raw.execute("PRAGMA journal_mode = WAL")
+        raw.execute("PRAGMA synchronous = NORMAL")
+        raw.execute("PRAGMA foreign_keys = ON")
+        for name, arity, function, deterministic in FUNCTIONS:
+            raw.create_function(name, arity, function, deterministic=deterministic)
+        for view in CATALOG_VIEWS:
+            raw.execute(view)
+    except sqlite3.Error as e:
+        raise _mysql_error(e) from e
+    return SqliteConnection(raw)
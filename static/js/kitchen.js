@@ -0,0 +1,79 @@
+function escapeHtml(value) {
+  return String(value ?? '').replace(/[&<>"']/g, c => ({
+    '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+  })[c]);
+}
+
+function titleCase(value) {
+  return value.charAt(0).toUpperCase() + value.slice(1);
+}
+
+function renderTicket(t) {
+  const table = t.table_number ? ` &middot; Table ${escapeHtml(t.table_number)}` : '';
+  const action = t.status === 'Queued'
+    ? `<button class="ticket-action" onclick="advanceTicket(${t.ticket_id}, 'Preparing')">Start</button>`
+    : `<button class="ticket-action ready" onclick="advanceTicket(${t.ticket_id}, 'Ready')">Ready</button>`;
+  return `
+    <div class="ticket ${t.status.toLowerCase()}" id="ticket-${t.ticket_id}">
+      <div class="ticket-header">
+        <span class="ticket-order">#${t.order_id}</span>
+        <span class="ticket-age" data-age="${t.age_seconds}">${Math.floor(t.age_seconds / 60)} min</span>
+      </div>
+      <div class="ticket-item">${t.quantity} &times; ${escapeHtml(t.item_name)}</div>
+      <div class="ticket-meta">${escapeHtml(titleCase(t.station))} &middot; ${escapeHtml(t.order_type)}${table}</div>
+      ${action}
+    </div>`;
+}
+
+function renderQueue(tickets) {
+  const grid = document.getElementById('ticketGrid');
+  grid.innerHTML = tickets.length
+    ? tickets.map(renderTicket).join('')
+    : '<p class="ticket-empty">No open tickets</p>';
+  document.getElementById('statQueued').textContent = tickets.filter(t => t.status === 'Queued').length;
+  document.getElementById('statCooking').textContent = tickets.filter(t => t.status === 'Preparing').length;
+}
+
+function refreshQueue() {
+  const station = document.getElementById('ticketGrid').dataset.station;
+  const url = '/api/kitchen/queue' + (station ? '?station=' + encodeURIComponent(station) : '');
+  fetch(url, {cache: 'no-store'})
+    .then(r => r.ok ? r.json() : Promise.reject(r.status))
+    .then(renderQueue)
+    .catch(() => {});
+}
+
+function advanceTicket(ticketId, status) {
+  fetch(`/api/kitchen/tickets/${ticketId}/status`, {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify({status})
+  })
+    .then(r => r.json().then(data => ({ok: r.ok, data})))
+    .then(({ok, data}) => {
+      if (!ok) alert(data.error || 'Could not update the ticket');
+      refreshQueue();
+    })
+    .catch(() => alert('Could not update the ticket'));
+}
+
+// Ages are computed server-side on load; tick them locally between refreshes
+function tickAges() {
+  document.querySelectorAll('.ticket-age').forEach(el => {
+    const age = Number(el.dataset.age) + 30;
+    el.dataset.age = age;
+    el.textContent = `${Math.floor(age / 60)} min`;
+  });
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+  setInterval(tickAges, 30000);
+  if (!window.EventSource) {
+    setInterval(refreshQueue, 15000);
+    return;
+  }
+  const source = new EventSource('/events');
+  ['order-created', 'status-changed', 'order-deleted', 'kitchen-ticket', 'reset'].forEach(name => {
+    source.addEventListener(name, refreshQueue);
+  });
+});
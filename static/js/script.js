@@ -1,8 +1,9 @@
 function switchTab(tabName) {
   document.querySelectorAll('.tab-content').forEach(tab => tab.classList.add('hidden'));
   document.getElementById(tabName).classList.remove('hidden');
-  document.querySelectorAll('.nav-tab').forEach(tab => tab.classList.remove('active'));
-  event.target.classList.add('active');
+  document.querySelectorAll('.nav-tab').forEach(tab => {
+    tab.classList.toggle('active', tab.dataset.tab === tabName);
+  });
 }
 
 function toggleCustomerDetails() {
@@ -24,9 +25,150 @@ function toggleTableDetails() {
   document.getElementById('tableDetails').style.display = dineIn ? 'block' : 'none';
 }
 
+function escapeHtml(value) {
+  const div = document.createElement('div');
+  div.textContent = value == null ? '' : String(value);
+  return div.innerHTML;
+}
+
+function renderOrderRow(order) {
+  const statuses = ['Pending', 'Preparing', 'Completed'];
+  const options = statuses.map(s =>
+    `<option value="${s}" ${order.order_status === s ? 'selected' : ''}>${s}</option>`
+  ).join('');
+  return `<tr id="order-${order.order_id}" data-status="${escapeHtml(order.order_status)}" data-type="${escapeHtml(order.order_type)}">
+    <td><b>#${order.order_id}</b></td>
+    <td>${escapeHtml(order.customer_name)}</td>
+    <td>${escapeHtml(order.order_date_display)}</td>
+    <td><span class="type-badge ${escapeHtml(order.order_type.toLowerCase())}">${escapeHtml(order.order_type)}</span></td>
+    <td>${order.table_number ? 'Table ' + escapeHtml(order.table_number) : '-'}</td>
+    <td class="items-list">${escapeHtml(order.items_summary)}</td>
+    <td><b>₹${order.total_amount.toFixed(2)}</b></td>
+    <td>${escapeHtml(order.payment_method)}</td>
+    <td><span class="status-badge ${escapeHtml(order.order_status.toLowerCase())}">${escapeHtml(order.order_status)}</span></td>
+    <td>
+      <div class="action-buttons">
+        <select class="action-select" onchange="updateStatus(${order.order_id}, this.value)">
+          <option value="">Update</option>
+          ${options}
+        </select>
+        <a href="/delete/${order.order_id}" class="delete" onclick="return confirm('Delete this order?')">Delete</a>
+      </div>
+    </td>
+  </tr>`;
+}
+
+function showFlash(message, category) {
+  let container = document.querySelector('.flash-messages');
+  if (!container) {
+    container = document.createElement('div');
+    container.className = 'flash-messages';
+    document.querySelector('.main').prepend(container);
+  }
+  const flash = document.createElement('div');
+  flash.className = `flash-message flash-${category}`;
+  flash.textContent = message;
+  container.appendChild(flash);
+  setTimeout(() => flash.remove(), 5000);
+}
+
+function updateStats(stats) {
+  document.getElementById('statPending').textContent = stats.pending_orders;
+  document.getElementById('statTables').textContent = stats.available_tables;
+  document.getElementById('statSales').textContent = `₹${stats.today_sales.toFixed(2)}`;
+}
+
+function patchOrderRow(order) {
+  const row = document.getElementById(`order-${order.order_id}`);
+  if (!row) return;
+  const statusFilter = document.getElementById('statusFilter').value;
+  if (statusFilter !== 'All' && statusFilter !== order.order_status) {
+    row.remove();
+  } else {
+    row.outerHTML = renderOrderRow(order);
+  }
+}
+
 function updateStatus(orderId, status) {
-  if (status) {
-    window.location.href = `/update_status/${orderId}/${status}`;
+  if (!status) return;
+  fetch(`/api/orders/${orderId}/status`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ status })
+  })
+    .then(r => {
+      if (!r.ok) throw new Error(r.statusText);
+      return r.json();
+    })
+    .then(data => {
+      patchOrderRow(data.order);
+      updateStats(data.stats);
+      showFlash(`Order status updated to ${status}`, 'success');
+    })
+    .catch(() => {
+      // Fall back to the server-rendered flow, which shows a proper error page
+      window.location.href = `/update_status/${orderId}/${status}`;
+    });
+}
+
+function orderMatchesFilters(order) {
+  const status = document.getElementById('statusFilter').value;
+  const type = document.getElementById('typeFilter').value;
+  return (status === 'All' || status === order.order_status) &&
+         (type === 'All' || type === order.order_type);
+}
+
+function updateTableOption(tableNumber, status) {
+  const option = document.querySelector(`select[name="table_number"] option[value="${tableNumber}"]`);
+  if (!option) return;
+  option.disabled = status === 'Occupied';
+  option.textContent = option.textContent.replace(/- \w+\s*$/, `- ${status}`);
+}
+
+function connectEventStream() {
+  if (!window.EventSource) return;
+  const source = new EventSource('/events');
+  const onFirstPage = !new URL(window.location).searchParams.get('cursor');
+
+  source.addEventListener('order-created', e => {
+    const data = JSON.parse(e.data);
+    updateStats(data.stats);
+    if (onFirstPage && orderMatchesFilters(data.order) && !document.getElementById(`order-${data.order.order_id}`)) {
+      document.getElementById('ordersBody').insertAdjacentHTML('afterbegin', renderOrderRow(data.order));
+    }
+  });
+
+  source.addEventListener('status-changed', e => {
+    const data = JSON.parse(e.data);
+    updateStats(data.stats);
+    patchOrderRow(data.order);
+  });
+
+  source.addEventListener('order-deleted', e => {
+    const data = JSON.parse(e.data);
+    updateStats(data.stats);
+    const row = document.getElementById(`order-${data.order_id}`);
+    if (row) row.remove();
+  });
+
+  source.addEventListener('table-status', e => {
+    const data = JSON.parse(e.data);
+    updateTableOption(data.table_number, data.status);
+  });
+
+  // Missed too many events while disconnected
+  source.addEventListener('reset', () => window.location.reload());
+}
+
+function renderPagination(params, nextCursor) {
+  const pagination = document.getElementById('ordersPagination');
+  if (!pagination) return;
+  if (nextCursor) {
+    const older = new URLSearchParams(params);
+    older.set('cursor', nextCursor);
+    pagination.innerHTML = `<a href="/?${older.toString()}" class="page-link">Older &raquo;</a>`;
+  } else {
+    pagination.innerHTML = '';
   }
 }
 
@@ -36,7 +178,21 @@ function filterOrders() {
   const url = new URL(window.location);
   url.searchParams.set('status', status);
   url.searchParams.set('order_type', type);
-  window.location.href = url.toString();
+  url.searchParams.delete('cursor');
+
+  fetch(`/api/orders?${url.searchParams.toString()}`)
+    .then(r => {
+      if (!r.ok) throw new Error(r.statusText);
+      return r.json();
+    })
+    .then(data => {
+      document.getElementById('ordersBody').innerHTML = data.orders.map(renderOrderRow).join('');
+      renderPagination(url.searchParams, data.next_cursor);
+      history.replaceState(null, '', url.toString());
+    })
+    .catch(() => {
+      window.location.href = url.toString();
+    });
 }
 
 function filterMenu() {
@@ -73,10 +229,11 @@ function updateOrderSummary() {
     const card = cb.closest('.menu-item-card');
     const name = card.querySelector('.menu-item-name').textContent;
     const price = parseFloat(card.querySelector('.menu-item-price').textContent.replace('₹', ''));
-    total += price;
+    const qty = Math.max(1, parseInt(card.querySelector('.menu-item-qty').value, 10) || 1);
+    total += price * qty;
     html += `<div style="display:flex; justify-content:space-between; padding:6px 0; border-bottom:1px solid #f0f0f0; align-items:center;">
-      <span style="font-weight:500; color:#333;">${name}</span>
-      <span style="color:#28a745; font-weight:700;">₹${price.toFixed(2)}</span>
+      <span style="font-weight:500; color:#333;">${name}${qty > 1 ? ` x${qty}` : ''}</span>
+      <span style="color:#28a745; font-weight:700;">₹${(price * qty).toFixed(2)}</span>
     </div>`;
   });
 
@@ -84,17 +241,92 @@ function updateOrderSummary() {
   totalEl.textContent = `₹${total.toFixed(2)}`;
 }
 
+function newIdempotencyKey() {
+  if (window.crypto && crypto.randomUUID) return crypto.randomUUID().replace(/-/g, '');
+  return Date.now().toString(16) + Math.random().toString(16).slice(2);
+}
+
 function resetForm() {
   document.getElementById('orderForm').reset();
-  toggleCustomerDetails();
+  // A cleared form is a new order; resubmitting the same one keeps its key
+  document.getElementById('idempotencyKey').value = newIdempotencyKey();
+  clearCustomer();
   toggleTableDetails();
   updateOrderSummary();
 }
 
+// Customer typeahead: debounced prefix search instead of a <select> of every customer
+let customerSearchTimer = null;
+let customerSearchSeq = 0;
+
+function selectCustomer(customer) {
+  document.getElementById('customerSelect').value = customer.customer_id;
+  document.getElementById('selectedCustomerLabel').textContent = `${customer.name} (${customer.phone})`;
+  document.getElementById('selectedCustomer').classList.remove('hidden');
+  document.getElementById('customerSearch').value = '';
+  document.getElementById('customerResults').classList.add('hidden');
+  toggleCustomerDetails();
+}
+
+function clearCustomer() {
+  document.getElementById('customerSelect').value = 'new';
+  document.getElementById('selectedCustomer').classList.add('hidden');
+  toggleCustomerDetails();
+}
+
+function showCustomerResults(customers) {
+  const results = document.getElementById('customerResults');
+  results.innerHTML = '';
+  if (customers.length === 0) {
+    results.innerHTML = '<div class="customer-result empty">No matching customers</div>';
+  }
+  customers.forEach(c => {
+    const row = document.createElement('div');
+    row.className = 'customer-result';
+    row.innerHTML = `${escapeHtml(c.name)} <span>${escapeHtml(c.phone)}</span>`;
+    row.addEventListener('mousedown', e => {
+      e.preventDefault();
+      selectCustomer(c);
+    });
+    results.appendChild(row);
+  });
+  results.classList.remove('hidden');
+}
+
+function searchCustomers() {
+  const term = document.getElementById('customerSearch').value.trim();
+  clearTimeout(customerSearchTimer);
+  if (term.length < 2) {
+    document.getElementById('customerResults').classList.add('hidden');
+    return;
+  }
+  customerSearchTimer = setTimeout(() => {
+    const seq = ++customerSearchSeq;
+    fetch('/api/customers/search?q=' + encodeURIComponent(term))
+      .then(r => r.ok ? r.json() : [])
+      .then(customers => {
+        // Ignore responses that arrive after a newer keystroke's request
+        if (seq === customerSearchSeq) showCustomerResults(customers);
+      })
+      .catch(() => {});
+  }, 250);
+}
+
 document.addEventListener('DOMContentLoaded', () => {
+  if (location.hash === '#customers') switchTab('customers');
+
+  const customerSearch = document.getElementById('customerSearch');
+  if (customerSearch) {
+    customerSearch.addEventListener('input', searchCustomers);
+    customerSearch.addEventListener('blur', () => {
+      document.getElementById('customerResults').classList.add('hidden');
+    });
+  }
+
   toggleCustomerDetails();
   toggleTableDetails();
   updateOrderSummary();
+  connectEventStream();
 
   const form = document.getElementById('orderForm');
   if (form) {
@@ -103,7 +335,17 @@ document.addEventListener('DOMContentLoaded', () => {
       if (items === 0) {
         alert('Please select at least one item');
         e.preventDefault();
+        return;
       }
+      const submit = form.querySelector('.btn-submit');
+      submit.disabled = true;
+      submit.textContent = 'Placing order...';
+    });
+    // Coming back to the page from the history cache: allow submitting again (same key)
+    window.addEventListener('pageshow', () => {
+      const submit = form.querySelector('.btn-submit');
+      submit.disabled = false;
+      submit.textContent = 'Place Order';
     });
   }
 
@@ -0,0 +1,51 @@
+"""Test fixtures: every test gets a fresh, migrated SQLite database.
+
+The app reads its configuration at import time, so the backend is chosen
+here before anything imports app.py. No MySQL server or .env file is needed.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['SCHEMA_CHECK'] = 'off'
+os.environ['PROFILING_ENABLED'] = 'false'
+
+import app as app_module  # noqa: E402
+import db_initializer  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Path of a new database with the schema and sample data"""
+    path = str(tmp_path / 'restaurant.db')
+    monkeypatch.setattr(db_initializer, 'SQLITE_PATH', path)
+    monkeypatch.setattr(app_module, 'SQLITE_PATH', path)
+    monkeypatch.setattr(app_module, 'ENV_MISSING', False)
+    monkeypatch.setattr(app_module, 'db_pool', None)
+    assert db_initializer.initialize_database()
+
+    app_module.reference_cache.clear()
+    app_module.fragment_cache.clear()
+    app_module.availability_index.invalidate()
+    yield path
+    if app_module.db_pool is not None:
+        app_module.db_pool.dispose()
+
+
+@pytest.fixture
+def client(database):
+    app_module.app.config['TESTING'] = True
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def connection(database):
+    """A direct connection for setting up and checking rows"""
+    connection = db_initializer.connect()
+    yield connection
+    connection.close()
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+
+import pytest
+from mysql.connector import Error
+
+import archive
+from archive import archive_orders, archive_status
+from reports import refresh_rollups
+from tests.test_place_order import order_payload
+
+
+def place_orders(client, connection, count, days_ago=100):
+    """Takeaway orders placed days_ago days back (newest last), Completed; returns their ids"""
+    order_ids = []
+    cursor = connection.cursor()
+    for i in range(count):
+        payload = {**order_payload(i, table_number=None), 'order_type': 'Takeaway'}
+        order_id = client.post('/api/orders', json=payload).get_json()['order']['order_id']
+        placed = datetime.now().replace(microsecond=0) - timedelta(days=days_ago) + timedelta(minutes=i)
+        cursor.execute("UPDATE Orders SET order_status = 'Completed', order_date = %s WHERE order_id = %s",
+                       (placed, order_id))
+        connection.commit()
+        order_ids.append(order_id)
+    return order_ids
+
+
+def page_through(client, query):
+    order_ids, cursor = [], None
+    while True:
+        page = client.get(f'/api/orders?{query}&page_size=3' + (f'&cursor={cursor}' if cursor else '')).get_json()
+        order_ids += [o['order_id'] for o in page['orders']]
+        cursor = page['next_cursor']
+        if not cursor:
+            return order_ids
+
+
+def test_history_pages_merge_live_and_archived_orders(client, connection):
+    before = page_through(client, 'status=All')
+    old = place_orders(client, connection, 5)
+    recent = place_orders(client, connection, 2, days_ago=1)
+    refresh_rollups(connection)
+
+    summary = archive_orders(connection, days=90, batch_size=2, pause=0, verbose=False)
+    assert summary['archived'] == 5
+
+    assert page_through(client, 'status=All') == recent[::-1] + before
+    history = page_through(client, 'status=Completed&include_archive=1')
+    assert history[:7] == recent[::-1] + old[::-1]
+
+    order = client.get(f'/api/orders/{old[0]}?include_archive=1').get_json()
+    assert order['order_id'] == old[0]
+    assert order['items_summary'] and order['items']
+    assert client.get(f'/api/orders/{old[0]}').status_code == 404
+
+
+def archived_ids(connection):
+    cursor = connection.cursor()
+    cursor.execute("SELECT order_id FROM OrdersArchive ORDER BY order_id")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def test_stopped_run_resumes_where_it_left_off(client, connection):
+    old = place_orders(client, connection, 5)
+    refresh_rollups(connection)
+
+    first = archive_orders(connection, days=90, batch_size=2, pause=0, max_batches=1, verbose=False)
+    assert (first['archived'], first['finished']) == (2, False)
+    assert archive_status(connection.cursor())['resume_after_order_id'] == old[1]
+
+    rest = archive_orders(connection, days=90, batch_size=2, pause=0, verbose=False)
+    assert (rest['archived'], rest['finished']) == (3, True)
+    assert archived_ids(connection) == old
+    status = archive_status(connection.cursor())
+    assert (status['archived_total'], status['resume_after_order_id']) == (5, None)
+
+
+def test_failed_batch_is_rolled_back_and_redone_on_the_next_run(client, connection, monkeypatch):
+    old = place_orders(client, connection, 5)
+    refresh_rollups(connection)
+
+    real_batch = archive._archive_batch
+    calls = []
+
+    def failing_second_batch(cursor, *args):
+        calls.append(args)
+        result = real_batch(cursor, *args)
+        if len(calls) == 2:
+            raise Error("connection lost")
+        return result
+
+    monkeypatch.setattr(archive, '_archive_batch', failing_second_batch)
+    with pytest.raises(Error):
+        archive_orders(connection, days=90, batch_size=2, pause=0, verbose=False)
+    assert archived_ids(connection) == old[:2]
+
+    monkeypatch.setattr(archive, '_archive_batch', real_batch)
+    summary = archive_orders(connection, days=90, batch_size=2, pause=0, verbose=False)
+    assert summary['archived'] == 3
+    assert archived_ids(connection) == old
+    cursor = connection.cursor()
+    cursor.execute("SELECT COUNT(*) FROM Orders")
+    assert cursor.fetchone()[0] == 0
@@ -0,0 +1,39 @@
+import time
+
+import app as app_module
+from dashboard_loader import DashboardLoader
+from db_pool import PoolTimeoutError
+
+
+def test_dashboard_renders_serially_when_the_pool_has_no_spare_connection(client, monkeypatch):
+    # The request's own connection is the only one, and a worker would wait 30s for another
+    monkeypatch.setitem(app_module.POOL_CONFIG, 'size', 1)
+    monkeypatch.setitem(app_module.POOL_CONFIG, 'max_overflow', 0)
+    fallbacks = app_module.dashboard_loader.stats()['serial_fallbacks']
+
+    start = time.monotonic()
+    response = client.get('/')
+
+    assert response.status_code == 200
+    assert b'<title>Error' not in response.get_data()
+    assert time.monotonic() - start < app_module.DASHBOARD_QUERY_TIMEOUT
+    assert app_module.dashboard_loader.stats()['serial_fallbacks'] == fallbacks + 1
+    assert app_module.db_pool.stats()['timeouts'] == 0
+
+
+def test_worker_waits_no_longer_than_the_budget_then_runs_inline(connection):
+    timeouts = []
+
+    def exhausted_pool(timeout):
+        timeouts.append(timeout)
+        raise PoolTimeoutError("Connection pool exhausted")
+
+    loader = DashboardLoader(exhausted_pool, max_workers=2, timeout=2.0)
+    try:
+        results = loader.load(connection, {'one': lambda c: 1, 'two': lambda c: 2})
+    finally:
+        loader.shutdown()
+
+    assert results == {'one': 1, 'two': 2}
+    assert len(timeouts) == 2 and all(0 <= t <= 2.0 for t in timeouts)
+    assert loader.stats()['serial_fallbacks'] == 2
@@ -0,0 +1,27 @@
+from dashboard_stats import reconcile_stats
+from tests.test_place_order import order_payload
+
+
+def counters(cursor):
+    cursor.execute("SELECT order_status, order_count FROM OrderStatusCounts ORDER BY order_status")
+    statuses = cursor.fetchall()
+    cursor.execute("SELECT stat_date, order_count, total_sales FROM DailyStats ORDER BY stat_date")
+    return statuses, [(day, count, float(sales)) for day, count, sales in cursor.fetchall()]
+
+
+def test_counters_kept_by_order_changes_match_a_rebuild(client, connection):
+    order_ids = []
+    for i in range(5):
+        payload = {**order_payload(i, table_number=None), 'order_type': 'Takeaway',
+                   'items': [{'item_id': 1 + i, 'qty': 1 + i % 2}]}
+        order_ids.append(client.post('/api/orders', json=payload).get_json()['order']['order_id'])
+    client.post(f'/api/orders/{order_ids[0]}/status', json={'status': 'Preparing'})
+    client.post(f'/api/orders/{order_ids[1]}/status', json={'status': 'Completed'})
+    client.get(f'/delete/{order_ids[2]}')
+
+    cursor = connection.cursor()
+    kept = counters(cursor)
+    assert dict(kept[0]) == {'Pending': 2, 'Preparing': 1, 'Completed': 1}
+    reconcile_stats(cursor)
+    connection.commit()
+    assert counters(cursor) == kept
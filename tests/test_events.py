@@ -0,0 +1,101 @@
+import re
+import time
+
+import app as app_module
+from events import EventBroker
+from tests.test_place_order import order_payload
+
+SUBSCRIBERS = 100
+
+
+def test_publish_reaches_every_subscriber():
+    broker = EventBroker()
+    queues = [broker.subscribe()[0] for _ in range(SUBSCRIBERS)]
+
+    event_id = broker.publish('order-created', {'order_id': 1})
+
+    for q in queues:
+        assert q.get_nowait() == (event_id, 'order-created', {'order_id': 1})
+    assert broker.stats()['subscribers'] == SUBSCRIBERS
+
+
+def test_slow_subscribers_are_dropped_without_blocking_the_rest():
+    broker = EventBroker(subscriber_queue_size=5)
+    slow = [broker.subscribe()[0] for _ in range(10)]
+    fast = [broker.subscribe()[0] for _ in range(SUBSCRIBERS - 10)]
+
+    start = time.monotonic()
+    for i in range(10):
+        broker.publish('status-changed', {'order_id': i})
+        for q in fast:
+            q.get_nowait()
+    assert time.monotonic() - start < 1
+
+    stats = broker.stats()
+    assert stats['subscribers'] == SUBSCRIBERS - 10
+    assert stats['dropped_subscribers'] == 10
+    for q in slow:
+        # The stream stops on this marker and the client resumes via Last-Event-ID
+        assert q.get_nowait() is None
+
+
+def test_reconnect_resumes_from_last_event_id():
+    broker = EventBroker()
+    first = broker.publish('order-created', {'order_id': 1})
+    broker.publish('order-deleted', {'order_id': 1})
+
+    _, backlog = broker.subscribe(first)
+    assert [e[1] for e in backlog] == ['order-deleted']
+
+
+def test_ids_from_before_a_restart_make_the_client_reload():
+    before_restart = EventBroker()
+    old_id = before_restart.publish('order-created', {'order_id': 1})
+    time.sleep(0.01)
+
+    restarted = EventBroker()
+    restarted.publish('order-created', {'order_id': 2})
+    assert restarted.subscribe(old_id)[1] is None
+    assert restarted.subscribe(restarted.stats()['last_event_id'] + 10)[1] is None
+
+
+def open_streams(client, count):
+    """Subscribe count /events streams; returns their chunk iterators"""
+    streams = []
+    for _ in range(count):
+        chunks = iter(client.get('/events', buffered=False).response)
+        assert next(chunks).startswith(b'retry:')  # the generator has subscribed
+        streams.append(chunks)
+    return streams
+
+
+def statements(response):
+    return int(re.search(r'desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+
+def place_and_update(client, index):
+    """Place an order and move it to Preparing; returns (order_id, statements executed)"""
+    payload = {**order_payload(index, table_number=None), 'order_type': 'Takeaway'}
+    placed = client.post('/api/orders', json=payload)
+    order_id = placed.get_json()['order']['order_id']
+    updated = client.post(f'/api/orders/{order_id}/status', json={'status': 'Preparing'})
+    return order_id, statements(placed) + statements(updated)
+
+
+def test_hundred_dashboards_cost_no_more_queries_than_one(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'PROFILING_ENABLED', True)
+    place_and_update(client, 0)  # warm the reference caches
+
+    one = open_streams(client, 1)
+    _, cost_with_one = place_and_update(client, 1)
+    for chunks in one:
+        next(chunks), next(chunks)
+
+    streams = open_streams(client, SUBSCRIBERS)
+    order_id, cost_with_hundred = place_and_update(client, 2)
+
+    assert cost_with_one > 0 and cost_with_hundred == cost_with_one
+    for chunks in streams:
+        created, changed = next(chunks).decode(), next(chunks).decode()
+        assert 'event: order-created' in created and f'"order_id": {order_id}' in created
+        assert 'event: status-changed' in changed
@@ -0,0 +1,28 @@
+import app as app_module
+
+
+def add_customers(connection, count):
+    cursor = connection.cursor()
+    cursor.executemany("INSERT INTO Customers (name, phone) VALUES (%s, %s)",
+                       [(f'Guest {i}', f'71{i:08d}') for i in range(count)])
+    connection.commit()
+
+
+def test_export_streams_every_row(client, connection):
+    add_customers(connection, 2500)
+    body = client.get('/export/customers?format=ndjson').get_data(as_text=True)
+    assert body.count('\n') == 2500
+    assert app_module.get_pool().stats()['discarded'] == 0
+
+
+def test_abandoned_export_discards_its_connection(client, connection):
+    add_customers(connection, 2500)
+    response = client.get('/export/customers', buffered=False)
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b'customer_id,')
+    assert app_module.get_pool().stats()['in_use'] == 1
+
+    response.close()  # the client disconnected
+    stats = app_module.get_pool().stats()
+    assert (stats['in_use'], stats['discarded']) == (0, 1)
+    assert client.get('/api/orders').status_code == 200
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta
+
+from idempotency import purge_expired
+from tests.test_place_order import order_payload
+
+
+def test_retry_with_the_same_key_replays_the_order(client):
+    payload = {**order_payload(1, table_number=None), 'order_type': 'Takeaway'}
+    first = client.post('/api/orders', json=payload, headers={'Idempotency-Key': 'retry-1'})
+    retry = client.post('/api/orders', json=payload, headers={'Idempotency-Key': 'retry-1'})
+
+    assert first.status_code == 201
+    assert retry.headers.get('Idempotent-Replayed') == 'true'
+    assert retry.get_json()['order']['order_id'] == first.get_json()['order']['order_id']
+
+
+def test_orders_leave_other_expired_keys_to_the_purge(client, connection):
+    cursor = connection.cursor()
+    expired = datetime.now() - timedelta(days=2)
+    cursor.executemany("INSERT INTO IdempotencyKeys (idem_key, request_hash, created_at) VALUES (%s, %s, %s)",
+                       [(f'old-{i}', 'x' * 64, expired) for i in range(5)])
+    connection.commit()
+
+    for i in range(3):
+        payload = {**order_payload(i, table_number=None), 'order_type': 'Takeaway'}
+        client.post('/api/orders', json=payload, headers={'Idempotency-Key': f'new-{i}'})
+
+    assert purge_expired(cursor) == 5
+    connection.commit()
+    cursor.execute("SELECT COUNT(*) FROM IdempotencyKeys")
+    assert cursor.fetchone()[0] == 3
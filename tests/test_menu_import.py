@@ -0,0 +1,69 @@
+import io
+
+import pytest
+
+from menu_import import canonical_category
+
+
+def upload(client, sheet, filename='menu.csv', **params):
+    data = {'file': (io.BytesIO(sheet.encode()), filename), **params}
+    return client.post('/api/import/menu', data=data, content_type='multipart/form-data')
+
+
+def menu_rows(connection):
+    cursor = connection.cursor()
+    cursor.execute("SELECT item_name, category, price, is_available FROM Menu ORDER BY item_id")
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+@pytest.mark.parametrize('value', ['appetizers', 'Appetizers', 'APPETIZERS', ' Starter ', 'starters'])
+def test_category_aliases_match_in_any_case(value):
+    assert canonical_category(value) == 'Starters'
+
+
+def test_one_invalid_row_rejects_the_whole_sheet(client, connection):
+    before = menu_rows(connection)
+    sheet = ("item_name,category,price\n"
+             "Paneer Tikka,Starters,199\n"
+             "Masala Fries,Starters,140\n"
+             "Mystery Dish,Starters,not-a-price\n")
+
+    response = upload(client, sheet)
+
+    assert response.status_code == 422
+    report = response.get_json()
+    assert report['applied'] is False
+    assert report['errors'] == [{'row': 3, 'error': "price 'not-a-price' is not a number"}]
+    assert menu_rows(connection) == before
+
+
+def test_dry_run_reports_changes_without_applying_them(client, connection):
+    before = menu_rows(connection)
+    sheet = "item_name,category,price\nPaneer Tikka,Starters,199\nMasala Fries,Starters,140\n"
+
+    response = upload(client, sheet, dry_run='1')
+
+    assert response.status_code == 200
+    report = response.get_json()
+    assert report['dry_run'] is True and report['applied'] is False
+    assert [row['item_name'] for row in report['inserted']] == ['Masala Fries']
+    assert [row['item_name'] for row in report['updated']] == ['Paneer Tikka']
+    assert menu_rows(connection) == before
+
+
+def test_import_stores_the_canonical_category_for_an_alias(client, connection):
+    sheet = '[{"item_name": "Masala Fries", "category": "APPETIZERS", "price": "140"}]'
+
+    response = upload(client, sheet, filename='menu.json')
+
+    assert response.status_code == 200
+    assert response.get_json()['applied'] is True
+    cursor = connection.cursor()
+    cursor.execute("SELECT category, price FROM Menu WHERE item_name = 'Masala Fries'")
+    category, price = cursor.fetchone()
+    assert category == 'Starters'
+    assert float(price) == 140.0
+    menu = client.get('/api/menu').get_json()
+    assert {'Masala Fries': 'Starters'}.items() <= {m['item_name']: m['category'] for m in menu}.items()
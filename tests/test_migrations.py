@@ -0,0 +1,39 @@
+import sqlite_backend
+from schema import create_schema, normalize_categories
+
+
+def schema_of(connection):
+    """{table: (columns, indexes)} as SQLite reports them"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    tables = {}
+    for (table,) in cursor.fetchall():
+        if table == 'schema_version':
+            continue
+        cursor.execute(f"SELECT name, type, \"notnull\" FROM pragma_table_info('{table}')")
+        columns = sorted(cursor.fetchall())
+        cursor.execute(f"SELECT name FROM pragma_index_list('{table}') WHERE origin = 'c'")
+        tables[table] = (columns, sorted(row[0] for row in cursor.fetchall()))
+    return tables
+
+
+def test_migrations_build_the_schema_that_schema_py_describes(connection, tmp_path):
+    fresh = sqlite_backend.connect(str(tmp_path / 'fresh.db'))
+    try:
+        cursor = fresh.cursor()
+        create_schema(cursor)
+        fresh.commit()
+        assert schema_of(connection) == schema_of(fresh)
+    finally:
+        fresh.close()
+
+
+def test_category_aliases_are_renamed_whatever_their_case(connection):
+    cursor = connection.cursor()
+    cursor.executemany("INSERT INTO Menu (item_name, category, price) VALUES (%s, %s, 100)",
+                       [('Samosa', 'Appetizers'), ('Lemonade', 'DRINKS'), ('Kheer', 'dessert')])
+    normalize_categories(cursor)
+    connection.commit()
+
+    cursor.execute("SELECT item_name, category FROM Menu WHERE item_name IN ('Samosa', 'Lemonade', 'Kheer')")
+    assert dict(cursor.fetchall()) == {'Samosa': 'Starters', 'Lemonade': 'Beverages', 'Kheer': 'Desserts'}
@@ -0,0 +1,75 @@
+import threading
+
+import app as app_module
+
+RACERS = 20
+
+
+def order_payload(index, table_number='T1'):
+    return {
+        'name': f'Guest {index}',
+        'phone': f'70000000{index:02d}',
+        'payment_method': 'Cash',
+        'order_type': 'Dine-in',
+        'table_number': table_number,
+        'items': [{'item_id': 1, 'qty': 1}],
+    }
+
+
+def test_orders_racing_for_a_table_seat_exactly_one(client, connection):
+    barrier = threading.Barrier(RACERS)
+    statuses = []
+    lock = threading.Lock()
+
+    def place(index):
+        test_client = app_module.app.test_client()
+        barrier.wait()
+        response = test_client.post('/api/orders', json=order_payload(index))
+        with lock:
+            statuses.append(response.status_code)
+
+    threads = [threading.Thread(target=place, args=(i,)) for i in range(RACERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(statuses) == [201] + [409] * (RACERS - 1)
+    cursor = connection.cursor()
+    cursor.execute("SELECT status FROM Tables WHERE table_number = 'T1'")
+    assert cursor.fetchone()[0] == 'Occupied'
+    cursor.execute("SELECT COUNT(*) FROM Orders WHERE table_number = 'T1'")
+    assert cursor.fetchone()[0] == 1
+
+
+def test_completing_the_order_frees_the_table(client, connection):
+    response = client.post('/api/orders', json=order_payload(1, 'T2'))
+    assert response.status_code == 201
+    order_id = response.get_json()['order']['order_id']
+
+    assert client.post('/api/orders', json=order_payload(2, 'T2')).status_code == 409
+    response = client.post(f'/api/orders/{order_id}/status', json={'status': 'Completed'})
+    assert response.status_code == 200
+    assert client.post('/api/orders', json=order_payload(3, 'T2')).status_code == 201
+
+
+def test_order_is_priced_and_itemized_from_the_menu(client, connection):
+    cursor = connection.cursor()
+    cursor.execute("SELECT item_id, price FROM Menu WHERE item_id IN (1, 2) ORDER BY item_id")
+    prices = dict(cursor.fetchall())
+
+    payload = {**order_payload(1, table_number=None), 'order_type': 'Takeaway', 'discount': 10,
+               'items': [{'item_id': 1, 'qty': 2}, {'item_id': 2, 'qty': 1}]}
+    response = client.post('/api/orders', json=payload)
+    assert response.status_code == 201
+    order = response.get_json()['order']
+    assert order['total_amount'] == float(prices[1] * 2 + prices[2]) * 0.9
+
+    cursor.execute("SELECT item_id, quantity, unit_price FROM OrderItems WHERE order_id = %s ORDER BY item_id",
+                   (order['order_id'],))
+    assert [(i, q, float(p)) for i, q, p in cursor.fetchall()] == [(1, 2, float(prices[1])), (2, 1, float(prices[2]))]
+
+    # The same phone places its next order as the existing customer
+    client.post('/api/orders', json=payload)
+    cursor.execute("SELECT COUNT(*) FROM Customers WHERE phone = %s", (payload['phone'],))
+    assert cursor.fetchone()[0] == 1
@@ -0,0 +1,56 @@
+import re
+
+import app as app_module
+from profiling import RequestProfile, statement_shape
+from tests.test_place_order import order_payload
+
+
+def test_statement_shape_ignores_values():
+    assert statement_shape("SELECT * FROM Orders WHERE order_id = 42 AND order_status = 'Pending'") == \
+        "SELECT * FROM Orders WHERE order_id = ? AND order_status = ?"
+    assert statement_shape("SELECT *\n  FROM Menu\n WHERE item_id IN (%s, %s, %s)") == \
+        "SELECT * FROM Menu WHERE item_id IN (...)"
+    assert statement_shape(b"SELECT 1") == "SELECT ?"
+
+
+def test_repeated_shapes_counts_executions_per_shape():
+    profile = RequestProfile('index')
+    for order_id in range(5):
+        profile.record(f"SELECT * FROM OrderItems WHERE order_id = {order_id}", 0.001)
+    profile.record("SELECT COUNT(*) FROM Orders", 0.001)
+
+    assert profile.repeated_shapes(5) == {"SELECT * FROM OrderItems WHERE order_id = ?": 5}
+    assert profile.repeated_shapes(6) == {}
+
+
+def metric(client, name):
+    body = client.get('/metrics').get_data(as_text=True)
+    return float(re.search(rf'^{name} (\S+)$', body, re.MULTILINE).group(1))
+
+
+def test_profiled_request_sets_server_timing_and_flags_repeats(client, monkeypatch, caplog):
+    monkeypatch.setattr(app_module, 'PROFILING_ENABLED', True)
+    # A status change moves two OrderStatusCounts rows with the same statement
+    monkeypatch.setattr(app_module.profiler, 'n_plus_one_threshold', 2)
+    order_id = client.post('/api/orders', json=order_payload(0)).get_json()['order']['order_id']
+    queries_before = metric(client, 'rms_db_queries_total')
+    flagged_before = metric(client, 'rms_n_plus_one_total')
+
+    response = client.post(f'/api/orders/{order_id}/status', json={'status': 'Preparing'})
+
+    assert response.status_code == 200
+    timing = response.headers['Server-Timing']
+    assert re.match(r'db;dur=[\d.]+;desc="\d+ queries", render;dur=[\d.]+, total;dur=[\d.]+$', timing)
+    executed = int(re.search(r'desc="(\d+) queries"', timing).group(1))
+    assert executed > 0
+    assert metric(client, 'rms_db_queries_total') == queries_before + executed
+    assert metric(client, 'rms_n_plus_one_total') > flagged_before
+    assert any('Possible N+1' in r.getMessage() and 'OrderStatusCounts' in r.getMessage()
+               for r in caplog.records)
+
+
+def test_server_timing_is_off_by_default(client):
+    response = client.get('/api/orders')
+
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
@@ -0,0 +1,45 @@
+from data_versions import bump_version
+
+
+def table_status(client, table_number):
+    return next(t['status'] for t in client.get('/api/tables').get_json() if t['table_number'] == table_number)
+
+
+def test_table_taken_by_another_worker_is_seen_on_the_next_request(client, connection):
+    assert table_status(client, 'T3') == 'Available'
+
+    # Another worker seats an order: it changes the row and bumps the counter in one transaction
+    cursor = connection.cursor()
+    cursor.execute("UPDATE Tables SET status = 'Occupied' WHERE table_number = 'T3'")
+    bump_version(cursor, 'tables')
+    connection.commit()
+
+    assert table_status(client, 'T3') == 'Occupied'
+
+
+def test_menu_price_imported_by_another_worker_is_used_for_pricing(client, connection):
+    client.get('/api/menu')
+    cursor = connection.cursor()
+    cursor.execute("UPDATE Menu SET price = 999 WHERE item_id = 1")
+    bump_version(cursor, 'menu')
+    connection.commit()
+
+    prices = {m['item_id']: m['price'] for m in client.get('/api/menu').get_json()}
+    assert prices[1] == 999
+    response = client.post('/api/orders', json={'name': 'Guest', 'phone': '7000000001', 'payment_method': 'Cash',
+                                                'order_type': 'Takeaway', 'items': [{'item_id': 1, 'qty': 1}]})
+    assert response.get_json()['order']['total_amount'] == 999
+
+
+def test_customer_added_by_another_worker_shows_on_the_dashboard(client, connection):
+    assert b'Grace Hopper' not in client.get('/').data
+
+    cursor = connection.cursor()
+    cursor.execute("INSERT INTO Customers (name, phone) VALUES ('Grace Hopper', '7000000099')")
+    connection.commit()
+    # Without a counter bump the cached rows are served and Customers isn't queried
+    assert b'Grace Hopper' not in client.get('/').data
+
+    bump_version(cursor, 'customers')
+    connection.commit()
+    assert b'Grace Hopper' in client.get('/').data
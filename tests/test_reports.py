@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from reports import refresh_rollups
+from tests.test_place_order import order_payload
+
+PAYMENT_METHODS = ('Cash', 'Card', 'UPI')
+
+
+def place_settled_orders(client, connection, count):
+    """Orders spread over the last few hours, old enough to be rolled up; returns their ids"""
+    order_ids = []
+    cursor = connection.cursor()
+    for i in range(count):
+        payload = {**order_payload(i, table_number=None), 'order_type': ('Takeaway', 'Delivery')[i % 2],
+                   'payment_method': PAYMENT_METHODS[i % 3],
+                   'items': [{'item_id': 1 + i % 4, 'qty': 1 + i % 3}, {'item_id': 10, 'qty': 1}]}
+        order_id = client.post('/api/orders', json=payload).get_json()['order']['order_id']
+        placed = datetime.now().replace(microsecond=0) - timedelta(hours=3) + timedelta(minutes=25 * i)
+        cursor.execute("UPDATE Orders SET order_date = %s WHERE order_id = %s", (placed, order_id))
+        connection.commit()
+        order_ids.append(order_id)
+    return order_ids
+
+
+def rollups_and_raw(cursor):
+    cursor.execute("""
+        SELECT bucket_start, payment_method, order_type, order_count, revenue FROM SalesHourly
+        WHERE order_count > 0 ORDER BY 1, 2, 3
+    """)
+    sales = [(str(b), p, t, c, float(r)) for b, p, t, c, r in cursor.fetchall()]
+    cursor.execute("""
+        SELECT DATE_FORMAT(order_date, '%Y-%m-%d %H:00:00'), payment_method, order_type,
+               COUNT(*), SUM(total_amount)
+        FROM Orders GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+    """)
+    raw_sales = [(str(b), p, t, c, float(r)) for b, p, t, c, r in cursor.fetchall()]
+
+    cursor.execute("""
+        SELECT bucket_start, item_name, quantity, revenue FROM ItemSalesHourly
+        WHERE quantity > 0 ORDER BY 1, 2
+    """)
+    items = [(str(b), n, q, float(r)) for b, n, q, r in cursor.fetchall()]
+    cursor.execute("""
+        SELECT DATE_FORMAT(o.order_date, '%Y-%m-%d %H:00:00'), oi.item_name,
+               SUM(oi.quantity), SUM(oi.unit_price * oi.quantity)
+        FROM Orders o JOIN OrderItems oi ON oi.order_id = o.order_id
+        GROUP BY 1, 2 ORDER BY 1, 2
+    """)
+    raw_items = [(str(b), n, q, float(r)) for b, n, q, r in cursor.fetchall()]
+    return (sales, items), (raw_sales, raw_items)
+
+
+def test_rollups_match_the_orders_they_summarize(client, connection):
+    order_ids = place_settled_orders(client, connection, 8)
+    assert refresh_rollups(connection) == 8
+
+    cursor = connection.cursor()
+    rollups, raw = rollups_and_raw(cursor)
+    assert rollups == raw and len(raw[0]) > 1
+
+    # Deleting a rolled-up order takes it back out of its buckets
+    client.get(f'/delete/{order_ids[3]}')
+    rollups, raw = rollups_and_raw(cursor)
+    assert rollups == raw
+
+    # Nothing new to fold in: a second refresh changes nothing
+    assert refresh_rollups(connection) == 0
+    assert rollups_and_raw(cursor)[0] == rollups
+
+
+def test_orders_younger_than_the_settle_window_wait_for_the_next_refresh(client, connection):
+    place_settled_orders(client, connection, 2)
+    client.post('/api/orders', json={**order_payload(9, table_number=None), 'order_type': 'Takeaway'})
+
+    assert refresh_rollups(connection) == 2
+    cursor = connection.cursor()
+    cursor.execute("SELECT SUM(order_count) FROM SalesHourly")
+    assert cursor.fetchone()[0] == 2
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+from tests.test_place_order import order_payload
+
+
+def book(client, table_number, starts_in_minutes=30):
+    at = (datetime.now() + timedelta(minutes=starts_in_minutes)).isoformat(timespec='minutes')
+    return client.post('/api/reservations', json={'name': 'Booked Guest', 'party_size': 2,
+                                                  'table_number': table_number, 'at': at})
+
+
+def test_placing_the_order_seats_the_booking(client, connection):
+    reservation_id = book(client, 'T1').get_json()['reservation']['reservation_id']
+    assert client.post('/api/orders', json=order_payload(1)).status_code == 409
+
+    payload = {**order_payload(2, table_number=None), 'reservation_id': reservation_id}
+    response = client.post('/api/orders', json=payload)
+    assert response.status_code == 201
+    assert response.get_json()['order']['table_number'] == 'T1'
+
+    cursor = connection.cursor()
+    cursor.execute("SELECT status FROM Reservations WHERE reservation_id = %s", (reservation_id,))
+    assert cursor.fetchone()[0] == 'Seated'
+    cursor.execute("SELECT status FROM Tables WHERE table_number = 'T1'")
+    assert cursor.fetchone()[0] == 'Occupied'
+
+
+def test_reservation_for_another_table_is_refused(client, connection):
+    reservation_id = book(client, 'T1').get_json()['reservation']['reservation_id']
+
+    response = client.post('/api/orders', json={**order_payload(1, 'T2'), 'reservation_id': reservation_id})
+    assert response.status_code == 409
+    cursor = connection.cursor()
+    cursor.execute("SELECT status FROM Reservations WHERE reservation_id = %s", (reservation_id,))
+    assert cursor.fetchone()[0] == 'Booked'
+
+
+def test_occupied_table_cannot_be_booked_for_now(client):
+    assert client.post('/api/orders', json=order_payload(1, 'T2')).status_code == 201
+
+    assert book(client, 'T2', starts_in_minutes=0).status_code == 409
+    assert book(client, 'T2', starts_in_minutes=180).status_code == 201
+
+
+def test_completing_the_order_frees_the_booked_slot(client, connection):
+    reservation_id = book(client, 'T1', starts_in_minutes=0).get_json()['reservation']['reservation_id']
+    payload = {**order_payload(1, table_number=None), 'reservation_id': reservation_id}
+    order_id = client.post('/api/orders', json=payload).get_json()['order']['order_id']
+
+    response = client.post(f'/api/orders/{order_id}/status', json={'status': 'Completed'})
+    assert response.status_code == 200
+
+    cursor = connection.cursor()
+    cursor.execute("SELECT status FROM Reservations WHERE reservation_id = %s", (reservation_id,))
+    assert cursor.fetchone()[0] == 'Completed'
+    rebooked = book(client, 'T1', starts_in_minutes=0)
+    assert rebooked.status_code == 201
+    assert rebooked.get_json()['reservation']['table_number'] == 'T1'